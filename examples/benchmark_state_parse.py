@@ -0,0 +1,154 @@
+"""
+State parse benchmark
+
+A benchmark which times decoding a State sensor payload with the standard
+library `json` module against the JSON codec used by the client, for single
+quoted and valid JSON payloads, and the complete `State` sensor parse.
+
+The payload is a State frame captured from the simulator, given with
+`--sample`, or else one built for a busy scenario. To capture a frame,
+subscribe to the undecoded frames of the State sensor and write out the
+blocks of one of them:
+
+    def capture(raw_frame):
+        with open('state_sample.json', 'wb') as f:
+            for block in raw_frame.blocks:
+                f.write(block)
+
+    simulator.subscribe_raw(state_sensor_id, capture)
+"""
+
+# lib
+import argparse
+import json
+import timeit
+import objectfactory
+
+# src
+from monodrive.common import codec
+# registers the State sensor with the object factory
+import monodrive.sensors.state
+
+
+def make_pose(i: int) -> dict:
+    """Build the pose of an actor"""
+    return {
+        'position': {'x': 100.0 + i * 3.25, 'y': -25.5 + i * 0.125, 'z': 0.35},
+        'orientation': {'x': 0.0, 'y': 0.0, 'z': 0.7071067811865476, 'w': 0.7071067811865476}
+    }
+
+
+def make_odometry(i: int) -> dict:
+    """Build the odometry of an actor"""
+    return {
+        'pose': make_pose(i),
+        'linear_velocity': {'x': 12.5 + i * 0.01, 'y': 0.0, 'z': 0.0},
+        'angular_velocity': {'x': 0.0, 'y': 0.0, 'z': 0.015}
+    }
+
+
+def make_object(i: int, tags: list) -> dict:
+    """Build the state of an actor"""
+    return {
+        'name': 'actor_{}'.format(i),
+        'odometry': make_odometry(i),
+        'tags': tags,
+        'oobbs': [{
+            'name': 'body',
+            'center': make_pose(i),
+            'extents': {'x': 2.4, 'y': 1.0, 'z': 0.8},
+            'scale': {'x': 1.0, 'y': 1.0, 'z': 1.0}
+        }]
+    }
+
+
+def make_payload(vehicles: int, objects: int) -> bytes:
+    """
+    Build a State sensor payload as sent by the simulator
+
+    Args:
+        vehicles: The number of vehicles in the scene
+        objects: The number of other objects in the scene
+
+    Returns:
+        The encoded payload
+    """
+    frame = {
+        'sensor_id': 'State_8700',
+        'time': 1580000000,
+        'game_time': 12.5,
+        'sample_count': 250,
+        'frame': {
+            'objects': [make_object(i, ['static', 'building']) for i in range(objects)],
+            'vehicles': [{
+                'state': make_object(i, ['vehicle', 'dynamic', 'ego' if i == 0 else 'car']),
+                'wheels': [{'id': w, 'speed': 35.0, 'pose': make_pose(w)} for w in range(4)]
+            } for i in range(vehicles)]
+        }
+    }
+    # the simulator sends the JSON with single quotes
+    return json.dumps(frame).replace('"', "'").encode('utf8')
+
+
+def report(name: str, statement, number: int):
+    """Time a statement and print the time per call"""
+    seconds = min(timeit.repeat(statement, number=number, repeat=5)) / number
+    print('{:<30} {:10.1f} us'.format(name, seconds * 1e6))
+    return seconds
+
+
+def main():
+    """main benchmark function"""
+    parser = argparse.ArgumentParser(description='Benchmark State sensor parsing')
+    parser.add_argument('--vehicles', type=int, default=300, help='Number of vehicles in the scene')
+    parser.add_argument('--objects', type=int, default=200, help='Number of static objects in the scene')
+    parser.add_argument('--number', type=int, default=50, help='Number of parses per measurement')
+    parser.add_argument('--sample', help='File with a State frame captured from the simulator, '
+                                         'used instead of the built payload')
+    args = parser.parse_args()
+
+    if args.sample:
+        with open(args.sample, 'rb') as f:
+            payload = f.read()
+        source = args.sample
+    else:
+        payload = make_payload(args.vehicles, args.objects)
+        source = 'built'
+    sensor = objectfactory.Factory.create_object({'_type': 'State', 'type': 'State', 'listen_port': 8700})
+    sensor.configure()
+
+    frame = sensor.parse([memoryview(payload)], len(payload), 0, 0)
+    data = frame.frame
+    print('payload: {}, {} vehicles, {} objects, {} bytes, codec: {}'.format(
+        source,
+        len(data.vehicles) if data is not None and data.vehicles else 0,
+        len(data.objects) if data is not None and data.objects else 0,
+        len(payload),
+        codec.NAME
+    ))
+    baseline = report(
+        'json.loads',
+        lambda: json.loads(str(payload, 'utf8').replace("'", '"')),
+        args.number
+    )
+    fast = report(
+        'codec.decode_relaxed',
+        lambda: codec.decode_relaxed(payload),
+        args.number
+    )
+    strict = payload.replace(b"'", b'"')
+    report(
+        'codec.decode_relaxed (JSON)',
+        lambda: codec.decode_relaxed(memoryview(strict)),
+        args.number
+    )
+    report(
+        'State.parse',
+        lambda: sensor.parse([memoryview(payload)], len(payload), 0, 0),
+        args.number
+    )
+    print('decode speedup: {:.2f}x'.format(baseline / fast))
+
+
+if __name__ == "__main__":
+    main()
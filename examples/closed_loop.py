@@ -6,7 +6,6 @@ import json
 import os
 import time
 import signal
-import threading
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -19,10 +18,9 @@ from monodrive.sensors import *
 # constants
 VERBOSE = True
 DISPLAY = True
+COLLECT_TIMEOUT = 5.0  # 5s
 
 # global
-lock = threading.RLock()
-processing = 0
 running = True
 camera_frame = None
 lidar_frame = None
@@ -36,9 +34,6 @@ def camera_on_update(frame: CameraFrame):
         print("Perception system with image size {0}".format(frame.image.shape))
     global camera_frame
     camera_frame = frame
-    with lock:
-        global processing
-        processing -= 1
 
 
 def lidar_on_update(frame: LidarFrame):
@@ -46,12 +41,9 @@ def lidar_on_update(frame: LidarFrame):
     callback to process parsed lidar data
     """
     if VERBOSE:
-        print("LiDAR point cloud with size {0}".format(len(frame.points)))
+        print("LiDAR point cloud with size {0}".format(len(frame.point_cloud)))
     global lidar_frame
     lidar_frame = frame
-    with lock:
-        global processing
-        processing -= 1
 
 
 def state_on_update(frame: StateFrame):
@@ -63,9 +55,6 @@ def state_on_update(frame: StateFrame):
             len(frame.frame.vehicles),
             len(frame.frame.objects)
         ))
-    with lock:
-        global processing
-        processing -= 1
 
 
 def collision_on_update(frame: CollisionFrame):
@@ -76,9 +65,6 @@ def collision_on_update(frame: CollisionFrame):
         collision = any([t.collision for t in frame.targets])
         nearest = min([t.distance for t in frame.targets], default=-1.0)
         print("Collision sensor: collision {}, nearest: {:.2f}m".format(collision, nearest))
-    with lock:
-        global processing
-        processing -= 1
 
 
 def rpm_on_update(frame: RPMFrame):
@@ -90,10 +76,6 @@ def rpm_on_update(frame: RPMFrame):
             frame.wheel_number, frame.wheel_speed
         ))
 
-    with lock:
-        global processing
-        processing -= 1
-
 
 def perception_and_control():
     # TODO, process sensor data and determine control values to send to ego
@@ -158,11 +140,6 @@ def main():
         while running:
             start_time = time.time()
 
-            # expect 4 sensors to be processed
-            with lock:
-                global processing
-                processing = 5
-
             # compute and send vehicle control command
             forward, right, brake, drive_mode = perception_and_control()
             if VERBOSE:
@@ -174,16 +151,14 @@ def main():
             if VERBOSE:
                 print(response)
 
-            response = simulator.sample_sensors()
-            if VERBOSE:
-                print(response)
-
-            # wait for processing to complete
-            while running:
-                with lock:
-                    if processing == 0:
-                        break
-                time.sleep(0.05)
+            # sample and wait for the sensors to be processed
+            try:
+                simulator.sample_and_collect(
+                    sensor_ids=simulator.sensors_ids,
+                    timeout=COLLECT_TIMEOUT
+                )
+            except TimeoutError as e:
+                print(e)
 
             # plot if needed
             if DISPLAY:
@@ -197,8 +172,7 @@ def main():
                         data_camera.set_data(im)
                 # update with lidar data
                 if lidar_frame:
-                    data = np.array([[pt.x, pt.y, pt.z, pt.intensity] for pt in lidar_frame.points])
-                    data = data[np.any(data != 0, axis=1)]
+                    data = lidar_frame.point_cloud[lidar_frame.valid]
                     if data_lidar is None:
                         data_lidar = ax_lidar.scatter(
                             data[:, 0], data[:, 1], data[:, 2],
@@ -5,7 +5,6 @@ in closed loop mode
 
 # lib
 import time
-import threading
 import argparse
 from monodrive.sensors import *
 from monodrive.jobs import run_job, get_simulator, set_result, Result, ResultMetric
@@ -14,13 +13,12 @@ from monodrive.jobs import run_job, get_simulator, set_result, Result, ResultMet
 AEBS_DIST_MAX = 400.0  # start applying brakes
 AEBS_DIST_MIN = 50.0  # max brakes
 TIMEOUT = 10
+COLLECT_TIMEOUT = 5.0  # 5s
 
 # global
-lock = threading.RLock()
 collision_occurred = None
 collision_predicted = None
 target_distance = None
-processing = 0
 
 
 def ultrasonic_on_update(frame: UltrasonicFrame):
@@ -49,11 +47,6 @@ def ultrasonic_on_update(frame: UltrasonicFrame):
                 nearest, frame.game_time
             ))
 
-    # done processing
-    with lock:
-        global processing
-        processing -= 1
-
 
 def collision_on_update(frame: CollisionFrame):
     """
@@ -71,11 +64,6 @@ def collision_on_update(frame: CollisionFrame):
         collision_occurred = frame.game_time
         print('Collision detected at game time: {}'.format(frame.game_time))
 
-    # done processing
-    with lock:
-        global processing
-        processing -= 1
-
 
 def emergency_braking(distance: float, throttle: float) -> (float, float, float, int):
     """
@@ -121,11 +109,6 @@ def main():
     time_start = time.time()
     while 1:
 
-        # expect 2 sensors to be processed
-        with lock:
-            global processing
-            processing = 2
-
         # get controls
         if collision_predicted and target_distance:
             controls = emergency_braking(target_distance, args['throttle'])
@@ -134,16 +117,15 @@ def main():
         else:
             controls = (args['throttle'], 0, 0, 1)
 
-        # apply control and sample sensors
+        # apply control, sample sensors and wait for processing to complete
         res = simulator.send_control(*controls)
-        res = simulator.sample_sensors()
-
-        # wait for processing to complete
-        while True:
-            with lock:
-                if processing == 0:
-                    break
-            time.sleep(0.05)
+        try:
+            simulator.sample_and_collect(
+                sensor_ids=simulator.sensors_ids,
+                timeout=COLLECT_TIMEOUT
+            )
+        except TimeoutError as e:
+            print(e)
 
         if collision_occurred:
             print('Collision occurred - exiting early.')
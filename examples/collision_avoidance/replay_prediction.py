@@ -5,9 +5,7 @@ in replay step mode
 
 # lib
 import os
-import time
 import json
-import threading
 import argparse
 import numpy as np
 from monodrive.sensors import *
@@ -16,13 +14,12 @@ from monodrive.jobs import run_job, get_simulator, set_result, Result, ResultMet
 # constants
 PREDICT_WINDOW_MIN = 0.01  # 10ms
 PREDICT_WINDOW_MAX = 1.0  # 1s
+COLLECT_TIMEOUT = 5.0  # 5s
 
 # global
-lock = threading.RLock()
 collision_occurred = None
 collision_predicted = None
 prediction_threshold = 200
-processing = 0
 full_frames = []
 
 
@@ -50,11 +47,6 @@ def ultrasonic_on_update(frame: UltrasonicFrame):
             collision_predicted = frame.game_time
         print('Collision predicted, distance: {}, game time: {}'.format(nearest, frame.game_time))
 
-    # done processing
-    with lock:
-        global processing
-        processing -= 1
-
 
 def collision_on_update(frame: CollisionFrame):
     """
@@ -75,11 +67,6 @@ def collision_on_update(frame: CollisionFrame):
     # append for full report
     full_frames.append(frame)
 
-    # done processing
-    with lock:
-        global processing
-        processing -= 1
-
 
 def main():
     """main uut driver function"""
@@ -106,20 +93,14 @@ def main():
         if args['verbose']:
             print("**************************{0}******************************".format(n))
 
-        # expect 2 sensors to be processed
-        with lock:
-            global processing
-            processing = 2
-
-        # send step command
-        res = simulator.step()
-
-        # wait for processing to complete
-        while True:
-            with lock:
-                if processing == 0:
-                    break
-            time.sleep(0.05)
+        # send step command and wait for processing to complete
+        try:
+            simulator.step_and_collect(
+                sensor_ids=simulator.sensors_ids,
+                timeout=COLLECT_TIMEOUT
+            )
+        except TimeoutError as e:
+            print(e)
 
         if collision_occurred:
             print('Collision occurred - exiting early.')
@@ -9,7 +9,6 @@ import json
 import os
 import time
 import signal
-import threading
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -22,10 +21,9 @@ from monodrive.sensors import *
 # constants
 VERBOSE = True
 DISPLAY = True
+COLLECT_TIMEOUT = 5.0  # 5s
 
 # global
-lock = threading.RLock()
-processing = 0
 running = True
 camera_frame = None
 lidar_frame = None
@@ -39,9 +37,6 @@ def camera_on_update(frame: CameraFrame):
         print("Perception system with image size {0}".format(frame.image.shape))
     global camera_frame
     camera_frame = frame
-    with lock:
-        global processing
-        processing -= 1
 
 
 def lidar_on_update(frame: LidarFrame):
@@ -49,12 +44,9 @@ def lidar_on_update(frame: LidarFrame):
     callback to process parsed lidar data
     """
     if VERBOSE:
-        print("LiDAR point cloud with size {0}".format(len(frame.points)))
+        print("LiDAR point cloud with size {0}".format(len(frame.point_cloud)))
     global lidar_frame
     lidar_frame = frame
-    with lock:
-        global processing
-        processing -= 1
 
 
 def state_on_update(frame: StateFrame):
@@ -66,9 +58,6 @@ def state_on_update(frame: StateFrame):
             len(frame.frame.vehicles),
             len(frame.frame.objects)
         ))
-    with lock:
-        global processing
-        processing -= 1
 
 
 def collision_on_update(frame: CollisionFrame):
@@ -79,9 +68,6 @@ def collision_on_update(frame: CollisionFrame):
         collision = any([t.collision for t in frame.targets])
         nearest = min([t.distance for t in frame.targets], default=-1.0)
         print("Collision sensor: collision {}, nearest: {:.2f}m".format(collision, nearest))
-    with lock:
-        global processing
-        processing -= 1
 
 
 def main():
@@ -141,20 +127,14 @@ def main():
         for i in range(simulator.num_steps):
             start_time = time.time()
 
-            # expect 4 sensors to be processed
-            with lock:
-                global processing
-                processing = 4
-
-            # send step command
-            response = simulator.step()
-
-            # wait for processing to complete
-            while running:
-                with lock:
-                    if processing == 0:
-                        break
-                time.sleep(0.05)
+            # send step command and wait for the sensors to be processed
+            try:
+                simulator.step_and_collect(
+                    sensor_ids=simulator.sensors_ids,
+                    timeout=COLLECT_TIMEOUT
+                )
+            except TimeoutError as e:
+                print(e)
 
             # plot if needed
             if DISPLAY:
@@ -168,8 +148,7 @@ def main():
                         data_camera.set_data(im)
                 # update with lidar data
                 if lidar_frame:
-                    data = np.array([[pt.x, pt.y, pt.z, pt.intensity] for pt in lidar_frame.points])
-                    data = data[np.any(data != 0, axis=1)]
+                    data = lidar_frame.point_cloud[lidar_frame.valid]
                     if data_lidar is None:
                         data_lidar = ax_lidar.scatter(
                             data[:, 0], data[:, 1], data[:, 2],
@@ -0,0 +1,58 @@
+"""
+Replay asyncio example
+
+An example which configures the simulator in replay mode from an asyncio
+event loop, steps through frame by frame, and awaits the sensor output.
+"""
+# lib
+import os
+import asyncio
+
+# src
+from monodrive.simulator import AsyncSimulator
+
+# constants
+VERBOSE = False
+
+
+async def main():
+    """
+    main driver coroutine
+    """
+    root = os.path.dirname(__file__)
+
+    # Construct simulator from file
+    simulator = AsyncSimulator.from_file(
+        os.path.join(root, 'configurations', 'simulator.json'),
+        scenario=os.path.join(root, 'scenarios', 'replay_highway_exit.json'),
+        sensors=os.path.join(root, 'configurations', 'sensors.json'),
+        weather=os.path.join(root, 'configurations', 'weather.json'),
+        verbose=VERBOSE
+    )
+
+    # Start the simulation
+    await simulator.start()
+    print('Starting simulator')
+    try:
+        # Open the sensor streams before stepping so no frame is missed
+        camera_frames = simulator.sensor_stream('Camera_8000')
+        state_frames = simulator.sensor_stream('State_8700')
+
+        for i in range(simulator.num_steps):
+            await simulator.step()
+
+            camera_frame = await camera_frames.__anext__()
+            state_frame = await state_frames.__anext__()
+            print("Step = {0}: image {1}, {2} vehicles".format(
+                i, camera_frame.image.shape, len(state_frame.frame.vehicles)
+            ))
+
+    except Exception as e:
+        print(e)
+
+    print("Stopping the simulator.")
+    await simulator.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,15 +8,12 @@ and processes the sensor output.
 
 # lib
 import os
-import time
 import json
-import threading
 from monodrive.simulator.simulator import Simulator
 from monodrive.sensors import *
 
-# global
-lock = threading.RLock()
-processing = 0
+# constants
+COLLECT_TIMEOUT = 5.0  # 5s
 
 
 def camera_on_update(frame: CameraFrame):
@@ -28,24 +25,13 @@ def camera_on_update(frame: CameraFrame):
     """
     print('received image frame: {}'.format(frame.image.shape))
 
-    # done processing
-    with lock:
-        global processing
-        processing -= 1
-
 
 def state_on_update(frame: StateFrame):
     """
     callback to process parsed state sensor data
     """
-    ego_state = None
-    for v in frame.frame.vehicles:
-        if 'ego' in v.state.tags:
-            ego_state = v
+    ego_state = frame.ego
     print('ego pose: {}'.format(ego_state.state.odometry['pose']))
-    with lock:
-        global processing
-        processing -= 1
 
 
 def main():
@@ -100,23 +86,19 @@ def main():
 
     try:
         for n in range(100):
-            with lock:
-                global processing
-                processing = 2
-
             # move vehicle forward
             ego_pose['position']['x'] += 50
 
-            # set state
+            # set state and wait for processing to complete
             print('step: {}'.format(n))
-            res = simulator.send_state(frame)
-
-            # wait for processing to complete
-            while True:
-                with lock:
-                    if processing == 0:
-                        break
-                time.sleep(0.05)
+            try:
+                simulator.send_state_and_collect(
+                    frame,
+                    sensor_ids=simulator.sensors_ids,
+                    timeout=COLLECT_TIMEOUT
+                )
+            except TimeoutError as e:
+                print(e)
 
     except Exception as e:
         print(e)
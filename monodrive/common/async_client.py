@@ -0,0 +1,100 @@
+"""async_client.py
+asyncio client to connect to the monodrive simulator.
+"""
+import asyncio
+
+
+class AsyncClient:
+    """asyncio client to connect to the monodrive simulator"""
+
+    def __init__(self, ip, port):
+        """ Constructor.
+
+        Args:
+            ip(str):  The IP address of the simulator
+            port(str): The port for the simulator
+        """
+        # The IP address of the simulator server
+        self.__ip = ip
+        # The port for the simulator server
+        self.__port = port
+        # The streams used to communicate with the server
+        self.__reader = None
+        self.__writer = None
+
+    @property
+    def ip(self):
+        """Get the IP of the server
+
+        Returns:
+            A string of the current server IP address.
+        """
+        return self.__ip
+
+    @property
+    def port(self):
+        """Get the port of the server
+
+        Returns:
+            An integer with the current server port
+        """
+        return self.__port
+
+    @property
+    def connected(self):
+
+        return self.__writer is not None
+
+    async def connect(self):
+        """ Establish a connection with the server.
+
+        Returns:
+            True if the server successfully connected, False otherwise.
+        """
+        try:
+            self.__reader, self.__writer = await asyncio.open_connection(
+                self.__ip, self.__port
+            )
+        except Exception as e:
+            print("There was an error connecting to the socket at {}:{} - {}".format(
+                self.__ip, self.__port, e))
+            return False
+        return self.connected
+
+    async def disconnect(self):
+        """Disconnect from the server."""
+        if self.__writer is None:
+            return
+        writer = self.__writer
+        self.__reader = None
+        self.__writer = None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def read(self, length):
+        """Read data from the server.
+
+        Args:
+            length(int): The length, in bytes, of data to read
+
+        Returns:
+            The binary data that was read from the server of size `length`
+            or smaller.
+        """
+        try:
+            return await self.__reader.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+
+    async def write(self, message):
+        """Write data to the server.
+
+        Args:
+            message(bytearray): The binary message to write to the server
+
+        """
+        self.__writer.write(message)
+        await self.__writer.drain()
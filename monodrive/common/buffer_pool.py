@@ -0,0 +1,68 @@
+"""buffer_pool.py
+Pools of preallocated, reusable receive buffers.
+"""
+import collections
+
+DEFAULT_MAX_FREE = 8
+"""Default number of released buffers a pool keeps for reuse"""
+
+
+class PooledBuffer(bytearray):
+    """Buffer that belongs to a `BufferPool`"""
+
+    def __init__(self, size, pool):
+        """Constructor.
+
+        Args:
+            size(int): The size, in bytes, of the buffer
+            pool(BufferPool): The pool the buffer returns to
+        """
+        super().__init__(size)
+        self.pool = pool
+
+    def release(self):
+        """Return this buffer to its pool. It must not be used afterwards."""
+        self.pool.release(self)
+
+
+class BufferPool:
+    """Thread safe pool of equally sized buffers. Buffers are allocated on
+    demand when the pool is empty, so acquiring never blocks."""
+
+    def __init__(self, size, max_free=DEFAULT_MAX_FREE):
+        """Constructor.
+
+        Args:
+            size(int): The size, in bytes, of every buffer
+            max_free(int): The number of released buffers kept for reuse
+        """
+        self.__size = size
+        self.__free = collections.deque(maxlen=max_free)
+
+    @property
+    def size(self):
+        """Get the size of the buffers in this pool
+
+        Returns:
+            The size in bytes
+        """
+        return self.__size
+
+    def acquire(self):
+        """Get a buffer from the pool.
+
+        Returns:
+            A released buffer if one is available, otherwise a new one.
+        """
+        try:
+            return self.__free.pop()
+        except IndexError:
+            return PooledBuffer(self.__size, self)
+
+    def release(self, buffer):
+        """Return a buffer to the pool for reuse.
+
+        Args:
+            buffer(PooledBuffer): A buffer acquired from this pool
+        """
+        self.__free.append(buffer)
@@ -48,22 +48,56 @@ class Client:
         return self.__connected
 
     def connect(self):
-        """ Establish a connection with the server.
+        """ Establish a connection with the server. A client that was
+        disconnected, or failed to connect, connects with a new socket.
 
         Returns:
             True if the server successfully connected, False otherwise.
         """
+        if self.__sock.fileno() == -1:
+            self.__sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
             self.__sock.connect((self.__ip, self.__port))
+            # Send small command messages immediately instead of waiting
+            # for the acknowledgement of the previous one
+            self.__sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         except Exception as e:
             print("There was an error connecting to the socket at {}:{} - {}".format(
                 self.__ip, self.__port, e))
+            # a socket that failed to connect cannot be connected again
+            self.__sock.close()
             return False
         self.__connected = True
         return self.connected
 
+    def set_blocking(self, blocking):
+        """Set whether reads from the server block.
+
+        Args:
+            blocking(bool): False to put the socket in non-blocking mode
+        """
+        self.__sock.setblocking(blocking)
+
+    def fileno(self):
+        """Get the file descriptor of the socket, which lets a client be
+        registered directly with a selector.
+
+        Returns:
+            The integer file descriptor
+        """
+        return self.__sock.fileno()
+
     def disconnect(self):
-        """Disconnect from the server."""
+        """Disconnect from the server.
+
+        Shutting the socket down first also wakes any thread that is blocked
+        reading from it.
+        """
+        if self.__connected:
+            try:
+                self.__sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
         self.__sock.close()
         self.__connected = False
 
@@ -77,17 +111,52 @@ class Client:
             The binary data that was read from the server of size `length`
             or smaller.
         """
-        data = b''
-        count = 0
-        while count < length:
-            bytes = self.__sock.recv(length - count)
-            if not bytes or len(bytes) == 0:
-                break
+        data = bytearray(length)
+        count = self.read_into(data)
+        if count < length:
+            del data[count:]
+        return data
 
-            data = data + bytes
-            count = count + len(bytes)
+    def read_into(self, buffer, length=None):
+        """Read data from the server directly into a preallocated buffer.
 
-        return data
+        Args:
+            buffer(bytearray|memoryview): The writable buffer to fill
+            length(int): The length, in bytes, of data to read. Defaults to
+            the size of `buffer`.
+
+        Returns:
+            The number of bytes read into `buffer`, smaller than `length` only
+            if the connection was closed.
+        """
+        with memoryview(buffer) as view:
+            if length is None:
+                length = len(view)
+            count = 0
+            while count < length:
+                received = self.__sock.recv_into(view[count:length])
+                if received == 0:
+                    break
+                count = count + received
+
+        return count
+
+    def read_some(self, buffer):
+        """Read whatever data is available into a buffer with a single
+        receive call.
+
+        Args:
+            buffer(bytearray|memoryview): The writable buffer to fill
+
+        Raises:
+            BlockingIOError if the client is non-blocking and no data is
+            available
+
+        Returns:
+            The number of bytes read into `buffer`, zero if the connection
+            was closed.
+        """
+        return self.__sock.recv_into(buffer)
 
     def write(self, message):
         """Write data to the server.
@@ -98,13 +167,22 @@ class Client:
         """
         self.__sock.sendall(message)
 
-    def data_ready(self):
+    def data_ready(self, timeout=0, interrupt=None):
         """Polls for available data on socket connection.
 
+        Args:
+            timeout(float): The time, in seconds, to block waiting for data.
+            Zero polls without blocking and None blocks until data arrives.
+            interrupt(socket): Optional socket that wakes the wait early
+            when it becomes readable
+
         Returns:
             True if there is available data to read from socket
         """
         if not self.__connected:
             return False
-        ready = select.select([self.__sock], [], [], 0)
-        return len(ready[0]) == 1
+        readers = [self.__sock]
+        if interrupt is not None:
+            readers.append(interrupt)
+        ready = select.select(readers, [], [], timeout)
+        return self.__sock in ready[0]
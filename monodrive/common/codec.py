@@ -0,0 +1,216 @@
+"""codec.py
+JSON codec used for simulator messages and JSON based sensors.
+
+The fastest installed JSON library is used, in the order orjson, simdjson,
+ujson, falling back to the standard library `json` module.
+"""
+import json
+import re
+import numpy as np
+
+try:
+    import orjson as _backend
+    NAME = 'orjson'
+except ImportError:
+    try:
+        import simdjson as _backend
+        NAME = 'simdjson'
+    except ImportError:
+        try:
+            import ujson as _backend
+            NAME = 'ujson'
+        except ImportError:
+            _backend = None
+            NAME = 'json'
+
+
+if NAME == 'orjson':
+    def decode(data):
+        """Decode a JSON document.
+
+        Args:
+            data(bytes|bytearray|memoryview|str): The JSON text
+
+        Returns:
+            The decoded object
+        """
+        try:
+            return _backend.loads(data)
+        except _backend.JSONDecodeError:
+            # orjson rejects NaN and Infinity, which the standard library
+            # accepts, so fall back to it before failing
+            if isinstance(data, memoryview):
+                data = bytes(data)
+            return json.loads(data)
+
+    def encode(obj):
+        """Encode an object as JSON.
+
+        Args:
+            obj: The object to encode
+
+        Returns:
+            The UTF-8 encoded JSON bytes
+        """
+        try:
+            return _backend.dumps(obj, option=_backend.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # types orjson cannot serialize
+            return json.dumps(obj).encode('utf8')
+
+elif NAME == 'simdjson':
+    def decode(data):
+        """Decode a JSON document.
+
+        Args:
+            data(bytes|bytearray|memoryview|str): The JSON text
+
+        Returns:
+            The decoded object
+        """
+        if isinstance(data, str):
+            data = data.encode('utf8')
+        return _backend.loads(bytes(data))
+
+    def encode(obj):
+        """Encode an object as JSON.
+
+        Args:
+            obj: The object to encode
+
+        Returns:
+            The UTF-8 encoded JSON bytes
+        """
+        return json.dumps(obj).encode('utf8')
+
+elif NAME == 'ujson':
+    def decode(data):
+        """Decode a JSON document.
+
+        Args:
+            data(bytes|bytearray|memoryview|str): The JSON text
+
+        Returns:
+            The decoded object
+        """
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        return _backend.loads(data)
+
+    def encode(obj):
+        """Encode an object as JSON.
+
+        Args:
+            obj: The object to encode
+
+        Returns:
+            The UTF-8 encoded JSON bytes
+        """
+        return _backend.dumps(obj, ensure_ascii=False).encode('utf8')
+
+else:
+    def decode(data):
+        """Decode a JSON document.
+
+        Args:
+            data(bytes|bytearray|memoryview|str): The JSON text
+
+        Returns:
+            The decoded object
+        """
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def encode(obj):
+        """Encode an object as JSON.
+
+        Args:
+            obj: The object to encode
+
+        Returns:
+            The UTF-8 encoded JSON bytes
+        """
+        return json.dumps(obj).encode('utf8')
+
+
+# A double quoted string, or a single quoted string with its content captured
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"|\'((?:[^\'\\]|\\.)*)\'', re.DOTALL)
+
+
+def _double_quote(match):
+    """Rewrite a single quoted string matched by `_STRING` with double
+    quotes, leaving double quoted strings untouched"""
+    content = match.group(1)
+    if content is None:
+        return match.group(0)
+    return b'"' + content.replace(b"\\'", b"'").replace(b'"', b'\\"') + b'"'
+
+
+def _first_token(data) -> int:
+    """Get the first byte of a document that is not whitespace or an opening
+    bracket, which is the quote of the first key of an object, -1 if there
+    is none"""
+    for i in range(len(data)):
+        if data[i] not in b' \t\r\n{[':
+            return data[i]
+    return -1
+
+
+def _swap_quotes_in_place(data) -> bool:
+    """Swap every single quote of a writable buffer for a double quote in
+    place, if it has no double quotes or backslashes, which need the string
+    rewrite
+
+    Returns:
+        Whether the quotes were swapped
+    """
+    try:
+        view = np.frombuffer(data, dtype=np.uint8)
+    except (TypeError, ValueError):
+        return False
+    if not view.flags.writeable or (view == ord('"')).any() or (view == ord('\\')).any():
+        return False
+    view[view == ord("'")] = ord('"')
+    return True
+
+
+def _normalize_quotes(data: bytes) -> bytes:
+    """Rewrite the single quoted strings of a document with double quotes"""
+    if b'"' not in data and b"\\'" not in data:
+        return data.replace(b"'", b'"')
+    return _STRING.sub(_double_quote, data)
+
+
+def decode_relaxed(data):
+    """Decode a JSON document whose strings may be single quoted, as sent
+    by some of the simulator sensors.
+
+    The quoting is told from the first quote of the document. A double
+    quoted document is decoded as is, which takes no copy with the orjson
+    backend; the other backends copy a memoryview or bytearray into bytes.
+    Should it have single quoted strings after all, it is decoded again
+    once they are rewritten.
+
+    The single quotes of a single quoted document in a writable buffer,
+    such as a receive buffer, are swapped for double quotes in place, so it
+    is decoded without a copy, unless it also has double quotes or escape
+    sequences. Otherwise the document is copied and only its single quoted
+    strings are rewritten, so apostrophes inside double quoted strings are
+    kept.
+
+    Args:
+        data(bytes|bytearray|memoryview): The JSON text
+
+    Returns:
+        The decoded object
+    """
+    if _first_token(data) == ord("'"):
+        if _swap_quotes_in_place(data):
+            return decode(data)
+        return decode(_normalize_quotes(bytes(data)))
+    try:
+        return decode(data)
+    except ValueError:
+        # single quoted strings later in the document
+        return decode(_normalize_quotes(bytes(data)))
@@ -0,0 +1,179 @@
+"""command_channel.py
+Pipelined command channel to the simulator.
+"""
+import collections
+import threading
+import traceback
+from concurrent.futures import Future
+
+from monodrive.common.messaging import ApiMessage
+
+
+class CommandChannel:
+    """Sends commands over a simulator connection without waiting for the
+    responses of earlier commands.
+
+    Every command gets a `Future` that is resolved by a reader thread when
+    the response carrying the command's `reference` arrives. Responses
+    without a known reference are matched to the oldest outstanding command,
+    since the simulator answers commands in order.
+
+    The channel connects the client with the first command. If the
+    connection is lost, or the channel closed, the outstanding commands
+    fail and the next command connects again.
+    """
+
+    def __init__(self, client, verbose=False):
+        """Constructor.
+
+        Args:
+            client(Client): The client connected to the simulator
+            verbose(bool):
+        """
+        self.__client = client
+        self.__verbose = verbose
+
+        # Futures of the commands waiting for a response, by reference
+        self.__pending = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+        # The thread reading responses of the current connection, started
+        # with its first command
+        self.__reader = None
+        self.__running = False
+
+    def submit(self, command: ApiMessage) -> Future:
+        """Send a command without waiting for its response.
+
+        Args:
+            command(ApiMessage): The command to send to the server.
+
+        Raises:
+            ConnectionError if the simulator cannot be connected to
+
+        Returns:
+            Future resolved with the response message dictionary
+        """
+        return self.submit_all([command])[0]
+
+    def submit_all(self, commands: [ApiMessage]) -> [Future]:
+        """Send several commands back to back, encoded into a single buffer
+        that is written with one send, without waiting for the responses.
+
+        Args:
+            commands([ApiMessage]): The commands to send to the server.
+
+        Raises:
+            ConnectionError if the simulator cannot be connected to
+
+        Returns:
+            List of futures resolved with the response message dictionaries,
+            in the order of `commands`
+        """
+        futures = [Future() for _ in commands]
+        data = b''.join(command.encode() for command in commands)
+        with self.__lock:
+            if not self.__running:
+                if not self.__client.connected and not self.__client.connect():
+                    raise ConnectionError("cannot connect to the simulator at {}:{}".format(
+                        self.__client.ip, self.__client.port
+                    ))
+                self.__running = True
+                self.__reader = threading.Thread(target=self._run, daemon=True)
+                self.__reader.start()
+            for command, future in zip(commands, futures):
+                self.__pending[command.uid] = future
+            try:
+                self.__client.write(data)
+            except Exception:
+                for command in commands:
+                    self.__pending.pop(command.uid, None)
+                raise
+        return futures
+
+    def send(self, command: ApiMessage, timeout=None):
+        """Send a command and wait for its response.
+
+        Args:
+            command(ApiMessage): The command to send to the server.
+            timeout(float): The time, in seconds, to wait for the response.
+            None waits forever.
+
+        Returns:
+            dict: The command response message from the simulator
+        """
+        return self.submit(command).result(timeout)
+
+    def close(self):
+        """Disconnect the client, stop the reader thread and fail the
+        outstanding commands. A later command connects again."""
+        with self.__lock:
+            self.__running = False
+            reader = self.__reader
+            self.__reader = None
+            self.__client.disconnect()
+            futures = self._take_pending()
+        if reader is not None and reader is not threading.current_thread():
+            reader.join()
+        self._fail(futures, ConnectionError("command channel is closed"))
+
+    def _run(self):
+        """Read loop resolving the futures of the outstanding commands of
+        the current connection"""
+        reader = threading.current_thread()
+        while self.__reader is reader:
+            try:
+                response = ApiMessage.read(self.__client)
+            except Exception as e:
+                if self.__reader is reader:
+                    print("command channel: exception {0}".format(str(e)))
+                    if self.__verbose:
+                        traceback.print_exc()
+                break
+            self._resolve(response)
+
+        with self.__lock:
+            if self.__reader is not reader:
+                # closed, the outstanding commands were failed already
+                return
+            # the next command connects again
+            self.__running = False
+            self.__reader = None
+            self.__client.disconnect()
+            futures = self._take_pending()
+        self._fail(futures, ConnectionError("connection closed by server"))
+
+    def _resolve(self, response):
+        """Resolve the future of the command a response answers
+
+        Args:
+            response(dict): The response message dictionary
+        """
+        reference = response.get(u"reference") if isinstance(response, dict) else None
+        with self.__lock:
+            future = self.__pending.pop(reference, None)
+            if future is None and self.__pending:
+                _, future = self.__pending.popitem(last=False)
+        if future is not None:
+            future.set_result(response)
+
+    def _take_pending(self) -> [Future]:
+        """Remove the futures of every outstanding command, called with the
+        lock held
+
+        Returns:
+            The futures
+        """
+        futures = list(self.__pending.values())
+        self.__pending.clear()
+        return futures
+
+    def _fail(self, futures: [Future], error):
+        """Fail the futures of outstanding commands
+
+        Args:
+            futures([Future]): The futures
+            error(Exception): The exception the futures raise
+        """
+        for future in futures:
+            future.set_exception(error)
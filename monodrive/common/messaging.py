@@ -1,10 +1,16 @@
 """messaging.py
 Implementation of API messages for simulator communications.
 """
+import itertools
 import json
+import math
+import numbers
 import random
 import struct
 import sys
+import threading
+
+from monodrive.common import codec
 
 ID_STATUS = u"Status_ID"
 """Message ID for status commands"""
@@ -62,6 +68,13 @@ ID_AUTOPILOT_CONTROL_COMMAND = u"AutopilotControl"
 """Message ID for controlling the autopilot controller"""
 HEADER_CONTROL = 0x6d6f6e6f
 """The message prefix header for control messages to the server"""
+TEMPLATE_FIELD_WIDTH = 24
+"""Number of bytes reserved for each numeric field of a `MessageTemplate`"""
+
+# Monotonic references of the messages built from templates, taken under
+# a lock so they stay ordered without the GIL
+_template_references = itertools.count(1)
+_template_references_lock = threading.Lock()
 
 
 class ApiMessage:
@@ -115,7 +128,7 @@ class ApiMessage:
         Returns:
             String with JSON.
         """
-        return json.dumps(self.to_json())
+        return codec.encode(self.to_json()).decode('utf8')
 
     def to_json(self):
         """Convert the message contents to its JSON representation.
@@ -147,16 +160,224 @@ class ApiMessage:
         if magic == HEADER_CONTROL and size > 0:
             # Read the rest of the message and return
             data = client.read(size - 8)
-            return json.loads(data.decode("utf-8"))
+            return codec.decode(data)
+
+        return {}
+
+    def encode(self):
+        """Encode the message with its header into the wire format.
+
+        Returns:
+            The bytes to send to the simulator.
+        """
+        data = codec.encode(self.to_json())
+        return struct.pack("!II", HEADER_CONTROL, len(data) + 8) + data
+
+    def write(self, client):
+        """Write a message to the connected client.
+
+        Args:
+            client(Client) - The client that is connected to the simulator.
+        """
+        client.write(self.encode())
+
+    @staticmethod
+    async def read_async(client):
+        """Read data from the connected asyncio `client`.
+
+        Args:
+            client(AsyncClient) - The client that is connected to the simulator.
+
+        Returns:
+            The dictionary representation of the message that was read. Empty
+            dictionary if nothing was read.
+        """
+        # Read the first 8 bytes to get the header
+        data = await client.read(8)
+        magic, size = struct.unpack("!II", data)
+        # Only read if the message was a response
+        if magic == HEADER_CONTROL and size > 0:
+            # Read the rest of the message and return
+            data = await client.read(size - 8)
+            return codec.decode(data)
 
         return {}
 
+    async def write_async(self, client):
+        """Write a message to the connected asyncio client.
+
+        Args:
+            client(AsyncClient) - The client that is connected to the simulator.
+        """
+        await client.write(self.encode())
+
+
+def _encode_number(value):
+    """Encode a number the way `json.dumps` does.
+
+    Args:
+        value(int|float): The number
+
+    Returns:
+        The JSON text of the number
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    value = float(value)
+    if math.isfinite(value):
+        return repr(value)
+    if math.isnan(value):
+        return 'NaN'
+    return 'Infinity' if value > 0 else '-Infinity'
+
+
+def _is_plain_number(value):
+    """Check whether a value is an int or finite float, whose `str` is
+    already its JSON text"""
+    value_type = type(value)
+    return value_type is int or (value_type is float and value - value == 0)
+
+
+class TemplateMessage:
+    """Message encoded from a `MessageTemplate`, which can be sent anywhere
+    an `ApiMessage` is"""
+
+    def __init__(self, command, uid, data):
+        """Constructor.
+
+        Args:
+            command(str): The command string for this message.
+            uid(int): The reference of this message.
+            data(bytes): The encoded message with its header.
+        """
+        self.__command = command
+        self.__uid = uid
+        self.__data = data
+
+    @property
+    def command(self):
+        """Get the command this message contains.
+
+        Returns:
+            String of the command.
+        """
+        return self.__command
+
+    @property
+    def uid(self):
+        """Get the unique identifier for this message.
+
+        Returns:
+            Integer of the uid.
+        """
+        return self.__uid
+
+    def __str__(self):
+        """Get the JSON representation of the message.
+
+        Returns:
+            String with JSON.
+        """
+        return self.__data[8:].decode('utf8')
+
+    def encode(self):
+        """Get the message with its header in the wire format.
+
+        Returns:
+            The bytes to send to the simulator.
+        """
+        return self.__data
+
     def write(self, client):
         """Write a message to the connected client.
 
         Args:
             client(Client) - The client that is connected to the simulator.
         """
-        data = str(self)
-        client.write(struct.pack("!II", HEADER_CONTROL, len(data) + 8))
-        client.write(data.encode('utf8'))
+        client.write(self.__data)
+
+
+class MessageTemplate:
+    """Message shape that is encoded once, for commands sent at a high rate.
+
+    The JSON of the message is built when the template is created, with a
+    fixed width slot for each numeric argument and the reference. Building a
+    message only formats the numbers into their slots, padded with
+    whitespace, so the header is encoded once as well:
+
+        control = MessageTemplate(ID_EGO_CONTROL, [u'forward_amount', u'right_amount'])
+        client.write(control.message(0.5, 0.0).encode())
+
+    References are taken from a monotonic counter instead of being random.
+    """
+
+    def __init__(self, command, fields, args=None):
+        """Constructor.
+
+        Args:
+            command(str): The command string for the messages.
+            fields([str]): The names of the numeric arguments set for each
+            message, in the order they are passed to `message`.
+            args(dict): The arguments that are the same in every message.
+        """
+        self.__command = command
+        self.__count = len(fields)
+
+        # Encode with placeholders for the fields and the reference, which
+        # keep their order in the JSON text
+        placeholders = ['\x00{}\x00'.format(i) for i in range(self.__count + 1)]
+        message_args = dict(args or {})
+        message_args.update(zip(fields, placeholders))
+        text = json.dumps({
+            u"type": command,
+            u"message": message_args,
+            u"reference": placeholders[-1]
+        }).replace('%', '%%')
+        slot = '%-{}s'.format(TEMPLATE_FIELD_WIDTH)
+        for placeholder in placeholders:
+            text = text.replace(json.dumps(placeholder), slot)
+        self.__format = text
+
+        # Every message has the same size, so the header never changes
+        self.__size = len((text % ((0,) * len(placeholders))).encode('utf8'))
+        self.__header = struct.pack("!II", HEADER_CONTROL, self.__size + 8)
+
+    @property
+    def command(self):
+        """Get the command of the messages built from this template.
+
+        Returns:
+            String of the command.
+        """
+        return self.__command
+
+    def message(self, *values):
+        """Build a message from this template.
+
+        Args:
+            *values: The numeric arguments, in the order of the template
+            fields.
+
+        Raises:
+            ValueError if the number of values does not match the fields or
+            a value does not fit its slot
+
+        Returns:
+            TemplateMessage with the next reference
+        """
+        if len(values) != self.__count:
+            raise ValueError('Template {} expects {} values, got {}'.format(
+                self.__command, self.__count, len(values)
+            ))
+        if not all(map(_is_plain_number, values)):
+            values = tuple(map(_encode_number, values))
+        with _template_references_lock:
+            uid = next(_template_references)
+        data = (self.__format % (*values, uid)).encode('utf8')
+        if len(data) != self.__size:
+            raise ValueError('Values {} do not fit the fields of template {}'.format(
+                values, self.__command
+            ))
+        return TemplateMessage(self.__command, uid, self.__header + data)
@@ -2,14 +2,19 @@
 Sensors module for monoDrive simulator python client
 """
 
-from .base_sensor import Sensor, SensorLocation, SensorRotation, SensorThread, DataFrame
+from .base_sensor import Sensor, SensorLocation, SensorRotation, SensorStream, SensorThread, DataFrame, RawFrame
+from .dispatcher import FrameDispatcher, Subscription
+from .frame_queue import FrameQueue, QueuePolicy
+from .parse_pool import ParseExecutor
 from .camera import Camera, CameraFrame, SemanticCamera
 from .collision import Collision, CollisionFrame
 from .gps import GPS, GPSFrame
 from .imu import IMU, IMUFrame
 from .lidar import Lidar, LidarFrame, SemanticLidar
-from .radar import Radar, RadarFrame
+from .radar import Radar, RadarFrame, merge_radar_frames
 from .rpm import RPM, RPMFrame
 from .state import State, StateFrame
 from .ultrasonic import Ultrasonic, UltrasonicFrame
 from .viewport_camera import ViewportCamera
+from .reactor import SensorReactor
+from .async_stream import AsyncSensorStream
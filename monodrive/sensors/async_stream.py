@@ -0,0 +1,193 @@
+"""async_stream.py
+asyncio ingestion engine for a single sensor
+"""
+
+# lib
+import asyncio
+import struct
+import traceback
+
+# src
+from monodrive.common.async_client import AsyncClient
+from monodrive.sensors.base_sensor import Sensor, SensorStream, DataFrame, HEADER_SIZE
+from monodrive.sensors.frame_queue import QueuePolicy, DEFAULT_QUEUE_SIZE
+
+
+class AsyncSensorStream(SensorStream):
+    """Sensor stream that reads its connection on an asyncio event loop.
+
+    Parsed frames are delivered to callback subscribers and to every open
+    async iterator returned by `frames()`:
+
+        async for frame in stream.frames():
+            ...
+
+    Without an executor, frames are parsed on the event loop, which blocks
+    it while large Camera and Lidar frames are decoded.
+    """
+
+    def __init__(self, host: str, sensor: Sensor, verbose: bool = False, executor=None):
+        """Constructor.
+
+        Args:
+            host(str): The IP address of the simulator
+            sensor(Sensor): The configured sensor
+            verbose(bool): Do verbose logging
+            executor(concurrent.futures.Executor): The executor frames are
+            parsed on, None to parse them on the event loop. Subscribers and
+            iterators are always called on the event loop.
+        """
+        super().__init__(sensor, verbose=verbose)
+
+        # The client that is connected to the simulator
+        self.__client = AsyncClient(host, sensor.listen_port)
+
+        # Queues of the open frame iterators and their policies
+        self.__queues = dict()
+
+        # Frames waiting for room in the queue of a blocking iterator
+        self.__blocked = []
+
+        # The executor frames are parsed on and the loop they are delivered
+        # on
+        self.__executor = executor
+        self.__loop = None
+
+        # The task running the read loop
+        self.__task = None
+
+    async def start(self):
+        """Connect to the sensor and start reading on the running loop"""
+        if self.verbose:
+            print("Starting {0}".format(self.sensor.id))
+        self.__loop = asyncio.get_event_loop()
+        await self.__client.connect()
+        self.__task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop reading, disconnect and end all frame iterators. Frames not
+        yet taken from an iterator are dropped."""
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+        await self.__client.disconnect()
+        self.__blocked = []
+        for queue in self.__queues:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    def frames(self, size: int = DEFAULT_QUEUE_SIZE, policy: QueuePolicy = QueuePolicy.BLOCK):
+        """Get an async iterator over the frames of this sensor. Frames
+        published after this call are delivered even if iteration starts
+        later, up to `size` frames.
+
+        Args:
+            size(int): The number of frames the iterator queues
+            policy(QueuePolicy): What to do with a new frame when the queue
+            is full. BLOCK stops reading the sensor until the iterator
+            catches up, so every open iterator must be consumed. Dropped
+            frames are not released since other consumers may hold them.
+
+        Returns:
+            Async iterator of parsed frames, which ends when the stream is
+            stopped
+        """
+        policy = QueuePolicy(policy)
+        queue = asyncio.Queue(1 if policy == QueuePolicy.KEEP_LATEST else max(1, size))
+        self.__queues[queue] = policy
+        return self._iterate(queue)
+
+    def __aiter__(self):
+        return self.frames()
+
+    async def _iterate(self, queue: asyncio.Queue):
+        """Yield frames delivered to `queue` until the stream is stopped"""
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.__queues.pop(queue, None)
+            # wake the read loop if it waits for room in this queue
+            while not queue.empty():
+                queue.get_nowait()
+
+    def _parses_frames(self) -> bool:
+        """Get whether received frames have to be parsed, which includes
+        when a frame iterator is open"""
+        return bool(self.__queues) or super()._parses_frames()
+
+    def dispatch(self, frame: DataFrame):
+        """Deliver a parsed frame to callback subscribers and iterators on
+        the event loop.
+
+        Args:
+            frame(DataFrame): The parsed frame
+        """
+        if self.__executor is not None:
+            self.__loop.call_soon_threadsafe(self._deliver, frame)
+        else:
+            self._deliver(frame)
+
+    def _deliver(self, frame: DataFrame):
+        """Deliver a parsed frame, called on the event loop
+
+        Args:
+            frame(DataFrame): The parsed frame
+        """
+        super().dispatch(frame)
+        for queue, policy in list(self.__queues.items()):
+            if not queue.full():
+                queue.put_nowait(frame)
+            elif policy == QueuePolicy.BLOCK:
+                self.__blocked.append((queue, frame))
+            else:
+                queue.get_nowait()
+                queue.put_nowait(frame)
+
+    async def _run(self):
+        """Read loop for this sensor"""
+        while True:
+            try:
+                # Read the header and data of the message
+                header = await self.__client.read(HEADER_SIZE)
+                if len(header) != HEADER_SIZE:
+                    raise ConnectionError("connection closed by server")
+                length, t, game_time, sample_count = struct.unpack("!IIfI", header)
+                package_length = length - HEADER_SIZE
+                data = await self.__client.read(package_length)
+                if len(data) != package_length:
+                    raise ConnectionError("connection closed by server")
+
+                if self.__executor is None:
+                    self.on_block(memoryview(data), package_length, t, game_time, sample_count)
+                else:
+                    await self.__loop.run_in_executor(
+                        self.__executor, self.on_block,
+                        memoryview(data), package_length, t, game_time, sample_count
+                    )
+
+                # wait for blocking iterators to have room, which holds back
+                # reading the sensor
+                while self.__blocked:
+                    queue, frame = self.__blocked.pop(0)
+                    if queue in self.__queues:
+                        await queue.put(frame)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("{0}: exception {1}".format(self.sensor.id, str(e)))
+                traceback.print_exc()
+                break
+
+        # Log that this sensor has stopped running
+        if self.verbose:
+            print("{0}: disconnected".format(self.sensor.id))
@@ -3,21 +3,232 @@ Base sensor class for processing data from the simulator
 """
 
 # lib
+import queue
+import socket
 import struct
 import threading
 import traceback
-import rx
 import objectfactory
 import copy
 
+from monodrive.common import codec
+from monodrive.common.buffer_pool import PooledBuffer
 from monodrive.common.client import Client
+from monodrive.sensors.dispatcher import FrameDispatcher, Subscription
+from monodrive.sensors.frame_queue import FrameQueue, QueuePolicy, DEFAULT_QUEUE_SIZE
+from monodrive.sensors.parse_pool import parse_frame
 
 HEADER_SIZE = 16
+POLL_TIMEOUT = 1.0
+"""Longest time, in seconds, a sensor thread blocks waiting for data before
+re-checking whether it should keep running"""
+STOP_TIMEOUT = 1.0
+"""Time, in seconds, to wait for a sensor thread to finish its current frame
+before its connection is closed under it"""
+MAX_PENDING_PARSES = 8
+"""Number of frames of a sensor that can be parsing in worker processes
+before receiving waits for the oldest"""
 
 
 class DataFrame(object):
     """Base data frame class"""
-    pass
+
+    # The sample count from the sensor header, set when the frame is published
+    sample_count = None
+
+    def release(self):
+        """Return any pooled buffers backing this frame for reuse. The frame
+        must not be used afterwards."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class RawFrame(DataFrame):
+    """Undecoded frame of a sensor: the header fields and the payload of each
+    block as received from the simulator.
+
+    The blocks are views of the receive buffers, which are reused once the
+    raw subscribers return, so copy them, e.g. with `bytes(block)`, to keep
+    the data around.
+    """
+
+    def __init__(self, sensor_id: str, time: int, game_time: float, sample_count: int,
+                 package_length: int, blocks: [memoryview]):
+        """Constructor.
+
+        Args:
+            sensor_id(str): The id of the sensor that sent the frame
+            time(int): The time from the sensor header
+            game_time(float): The game time from the sensor header
+            sample_count(int): The sample count from the sensor header
+            package_length(int): The length, in bytes, of the last block
+            blocks([memoryview]): The payload of each block of the frame
+        """
+        self.sensor_id = sensor_id
+        self.time = time
+        self.game_time = game_time
+        self.sample_count = sample_count
+        self.package_length = package_length
+        self.blocks = blocks
+
+
+# frame builders, keyed by frame class
+_frame_builders = dict()
+
+
+def _get_frame_builder(cls):
+    """
+    Get the function that builds instances of a serializable class from a
+    decoded JSON body, compiling it from the class fields on first use
+
+    Args:
+        cls: The objectfactory.Serializable class
+
+    Returns:
+        Function taking the JSON body and returning the instance
+    """
+    builder = _frame_builders.get(cls)
+    if builder is not None:
+        return builder
+
+    # names in the body and keys in the instance of each kind of field
+    values = []
+    nested = []
+    lists = []
+    for field in cls._fields.values():
+        if isinstance(field, objectfactory.Nested) and field._field_type is not None:
+            nested.append((field._name, field._key, field))
+        elif isinstance(field, objectfactory.List) and field._field_type is not None:
+            lists.append((field._name, field._key, field))
+        else:
+            values.append((field._name, field._key))
+
+    def build(body):
+        if '_type' in body:
+            return objectfactory.Factory.create_object(body)
+        obj = cls.__new__(cls)
+        attributes = obj.__dict__
+        for name, key in values:
+            if name in body:
+                attributes[key] = body[name]
+        for name, key, field in nested:
+            value = body.get(name)
+            if value is not None:
+                attributes[key] = _get_frame_builder(field._field_type)(value)
+        for name, key, field in lists:
+            if name in body:
+                item_builder = _get_frame_builder(field._field_type)
+                attributes[key] = [item_builder(item) for item in body[name]]
+        return obj
+
+    _frame_builders[cls] = build
+    return build
+
+
+def build_frame(cls, body: dict):
+    """
+    Build a serializable frame from its decoded JSON body.
+
+    This is the equivalent of `cls().deserialize(body)` without the per
+    field descriptor calls, deep copies and nested object construction
+    through the factory, which dominate parsing of large frames. The result
+    still serializes with `serialize()`. The body is owned by the frame
+    afterwards.
+
+    Args:
+        cls: The objectfactory.Serializable frame class
+        body(dict): The decoded JSON body
+
+    Returns:
+        The frame instance
+    """
+    return _get_frame_builder(cls)(body)
+
+
+class LazyGroup:
+    """Attribute of a lazy frame that is decoded from the frame's payload on
+    first access, together with the other attributes of its group.
+
+    The decode function takes the frame and returns a dict with the value of
+    every attribute of the group. The values are stored on the frame, so
+    later accesses are plain attribute lookups.
+    """
+
+    def __init__(self, decode):
+        """Constructor.
+
+        Args:
+            decode(func): The function decoding the group, shared by the
+            attributes of the group
+        """
+        self.__decode = decode
+        self.__name = None
+
+    def __set_name__(self, owner, name):
+        self.__name = name
+
+    def __get__(self, frame, owner=None):
+        if frame is None:
+            return self
+        values = self.__decode(frame)
+        frame.__dict__.update(values)
+        return values[self.__name]
+
+
+def keep_blocks(data: [bytes]) -> [bytes]:
+    """
+    Get the blocks of a frame in a form a lazy frame can keep until it is
+    decoded: views of pooled buffers are kept, other blocks are copied since
+    their receive buffers are reused for the next frame
+
+    Args:
+        data([bytes]): The payload of each block of the frame
+
+    Returns:
+        The blocks the frame owns
+    """
+    return [
+        block if isinstance(getattr(block, 'obj', None), PooledBuffer) else bytes(block)
+        for block in data
+    ]
+
+
+def lazy_json_frame(cls, names: [str]):
+    """
+    Create the lazy variant of a serializable frame class, whose fields
+    `names` are decoded from the JSON payload in `_blocks[0]` on first
+    access. The other fields are set when the frame is created.
+
+    Args:
+        cls: The objectfactory.Serializable frame class
+        names([str]): The fields decoded from the payload
+
+    Returns:
+        The subclass of `cls`, instantiated without arguments
+    """
+    fields = [cls._fields[name] for name in names]
+
+    def decode(frame):
+        body = build_frame(cls, codec.decode_relaxed(frame._blocks[0])).__dict__
+        return {field._key: body.get(field._key, field._default) for field in fields}
+
+    def serialize(frame, deserializable=True):
+        # serialized like the eager frame, which the factory can create
+        body = cls.serialize(frame, deserializable)
+        if '_type' in body:
+            body['_type'] = cls.__name__
+        return body
+
+    # the fields read their values from their keys, so the keys are lazy
+    attributes = {field._key: LazyGroup(decode) for field in fields}
+    attributes['serialize'] = serialize
+    attributes['__doc__'] = 'Lazily decoded {}'.format(cls.__name__)
+    return type('Lazy' + cls.__name__, (cls,), attributes)
 
 
 @objectfactory.Factory.register_class
@@ -47,6 +258,10 @@ class Sensor(objectfactory.Serializable):
     location = objectfactory.Nested(field_type=SensorLocation)
     rotation = objectfactory.Nested(field_type=SensorRotation)
 
+    # Whether frames can be parsed in worker processes, which send the
+    # parsed frames back pickled, see `monodrive.sensors.parse_pool`
+    parse_in_process = True
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for base sensor class
@@ -62,10 +277,87 @@ class Sensor(objectfactory.Serializable):
         """Function called after deserializing sensor to do any setup/config"""
         pass
 
+    def allocate_block(self, length: int):
+        """
+        Get the buffer a block of `length` bytes should be received into,
+        which lets a sensor receive payloads straight into its own buffers
+
+        Args:
+            length(int): The length, in bytes, of the block
+
+        Returns:
+            A writable buffer of at least `length` bytes that the sensor
+            takes ownership of, or None to receive into a buffer owned by the
+            ingestion engine
+        """
+        return None
+
+    def begin_frame(self):
+        """
+        Start assembling a new frame from its blocks. By default blocks are
+        collected and handed to `parse` once the frame is complete; sensors
+        override `begin_frame`, `parse_block` and `finish_frame` to decode
+        each block as it arrives instead.
+
+        Returns:
+            Assembly state passed to `parse_block` and `finish_frame`
+        """
+        return []
+
+    def parse_block(self, state, index: int, data: bytes):
+        """
+        Add a received block to the frame being assembled. The block is a
+        view into a receive buffer that is reused for the next block.
+
+        Args:
+            state: The assembly state from `begin_frame`
+            index(int): The index of the block within the frame
+            data(bytes): The payload of the block
+        """
+        state.append(data)
+
+    def finish_frame(self, state, package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Complete the frame once all of its blocks have been added
+
+        Args:
+            state: The assembly state from `begin_frame`
+            package_length(int):
+            time(int):
+            game_time(int):
+
+        Returns:
+            Parsed data frame object
+        """
+        return self.parse(state, package_length, time, game_time)
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Parse raw data into a data frame that keeps the payload and decodes
+        each of its field groups on first access, see `LazyGroup`. Sensors
+        without lazy frames parse eagerly, which is the case of those with
+        small payloads such as GPS and IMU, where deferring the decode costs
+        more than it saves.
+
+        Args:
+            data([bytes]):
+            package_length(int):
+            time(int):
+            game_time(int):
+
+        Returns:
+            Data frame object
+        """
+        return self.parse(data, package_length, time, game_time)
+
     def parse(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
         """
         Parse raw data into data frame object
 
+        The data blocks are views into receive buffers that are reused for
+        the next frame, so anything kept on the frame must be copied or
+        decoded out of them.
+
         Args:
             data([bytes]):
             package_length(int):
@@ -87,33 +379,74 @@ class Sensor(objectfactory.Serializable):
         return self.sensor_type + "_" + str(self.listen_port)
 
 
-class SensorThread(threading.Thread):
-    """Thread for processing sensor data from the simulator"""
-
-    def __init__(self, host: str, sensor: Sensor, verbose: bool = False):
-        super().__init__()
+class SensorStream:
+    """Frame assembly, parsing and publishing for a single sensor, shared by
+    every engine that receives sensor data from the simulator"""
 
-        # The sensor associated with this thread
+    def __init__(self, sensor: Sensor, verbose: bool = False):
+        # The sensor associated with this stream
         self.__sensor = sensor
 
-        # The client that is connected to the simulator
-        self.__client = Client(host, sensor.listen_port)
-
         # The event that is fired off when the sensor data arrives
-        self.__source = rx.Observable.create(self._init_rx).publish().auto_connect(0)
-
-        # Flag to determine if the sensor should be connected
-        self.__running = False
+        self.__source = FrameDispatcher(sensor.id)
 
         self.__verbose = verbose
 
-        self.data_buffer = []
+        # Assembly state and number of blocks received for the current frame
+        self.__frame_state = None
+        self.__block_count = 0
+
+        # Subscribers to raw frames and the blocks of the current frame for
+        # them
+        self.__raw_subscribers = []
+        self.__raw_blocks = []
+
+        # Whether the current frame is parsed, delivered raw and parsed
+        # lazily
+        self.__parse = True
+        self.__raw = False
+        self.__lazy = False
+
+        # Shared memory ring frames are also published to, if any
+        self.shared_ring = None
+
+        # Called with each frame once all subscribers returned, including
+        # those run on executors, see `FrameDispatcher.publish`
+        self.on_delivered = None
+
+        # Whether frames are parsed lazily, see `Sensor.parse_lazy`. Frames
+        # parsed in a process pool are parsed eagerly.
+        self.lazy_frames = False
+
+        # Queue of frames waiting for delivery and the thread delivering
+        # them, if frames are not delivered on the receiving thread
+        self.__queue = None
+        self.__dispatcher = None
+
+        # Process pool frames are parsed in, the futures of the frames being
+        # parsed in order, and the thread publishing their results
+        self.__parse_pool = None
+        self.__parses = None
+        self.__parse_publisher = None
+        # Whether the sensor is sent with each frame to parse, since it was
+        # reconfigured after the pool was created
+        self.__send_sensor = False
 
-    def _init_rx(self, observer):
-        """Initialize the reactive publisher"""
-        self.observer = observer
+    @property
+    def sensor(self) -> Sensor:
+        """Get the sensor configuration currently used for parsing
+
+        Returns:
+            The sensor associated with this stream
+        """
+        return self.__sensor
+
+    @property
+    def verbose(self) -> bool:
+        """Get whether this stream does verbose logging"""
+        return self.__verbose
 
-    def subscribe(self, callback):
+    def subscribe(self, callback, executor=None) -> Subscription:
         """Subscribe to the output of this sensor.
 
         Args:
@@ -123,75 +456,366 @@ class SensorThread(threading.Thread):
             The data will be a tuple of size 3. The first element is the time
             the data arrived, the second element is the game time the data
             occurred, and the third element is the data message.
+            executor(concurrent.futures.Executor): The executor the callback
+            is run on, None to call it on the thread delivering frames
+
+        Returns:
+            The Subscription, which can be disposed to unsubscribe, None if
+            the sensor does not stream
         """
         if not self.__sensor.enable_streaming:
             print('Error: cannot subscribe to sensor of type: {}'.format(self.__sensor.sensor_type))
+            return None
+        return self.__source.subscribe(callback, executor)
+
+    def as_observable(self):
+        """Get an Rx observable of the frames of this sensor, which requires
+        an Rx library to be installed, see `FrameDispatcher.as_observable`
+
+        Returns:
+            The Observable
+        """
+        return self.__source.as_observable()
+
+    def subscribe_raw(self, callback):
+        """Subscribe to the undecoded frames of this sensor. Raw subscribers
+        are called on the receiving thread, before the frame is parsed, and
+        the frame is not parsed at all while a sensor only has raw
+        subscribers.
+
+        Args:
+            callback(func): The function that will be called with each
+            `RawFrame`. Should be of the format:
+                def my_callback(raw_frame):
+        """
+        if not self.__sensor.enable_streaming:
+            print('Error: cannot subscribe to sensor of type: {}'.format(self.__sensor.sensor_type))
+            return
+        self.__raw_subscribers.append(callback)
+
+    def _parses_frames(self) -> bool:
+        """Get whether received frames have to be parsed, which is the case
+        unless the sensor only has raw subscribers"""
+        return (
+            not self.__raw_subscribers
+            or len(self.__source) > 0
+            or self.shared_ring is not None
+        )
+
+    @property
+    def queue(self) -> FrameQueue:
+        """Get the queue of frames waiting for delivery, which holds the
+        depth and drop counters
+
+        Returns:
+            The FrameQueue, None if frames are delivered on the receiving
+            thread
+        """
+        return self.__queue
+
+    def start_queue(self, size: int = DEFAULT_QUEUE_SIZE, policy: QueuePolicy = QueuePolicy.BLOCK):
+        """Deliver frames to subscribers from a separate thread through a
+        bounded queue, so slow subscribers do not hold up receiving.
+
+        Args:
+            size(int): The number of frames the queue holds
+            policy(QueuePolicy): What to do with a new frame when the queue
+            is full
+        """
+        if self.__queue is not None:
+            raise RuntimeError('Frame queue of {} is already started'.format(self.__sensor.id))
+        self.__queue = FrameQueue(size, policy)
+        self.__dispatcher = threading.Thread(target=self._run_dispatch, daemon=True)
+        self.__dispatcher.start()
+
+    def stop_queue(self):
+        """Stop delivering queued frames, dropping those not yet delivered"""
+        if self.__queue is None:
+            return
+        self.__queue.close()
+        if self.__dispatcher is not threading.current_thread():
+            self.__dispatcher.join()
+
+    def _run_dispatch(self):
+        """Deliver queued frames until the queue is closed"""
+        while True:
+            frame = self.__queue.get()
+            if frame is None:
+                break
+            try:
+                self.dispatch(frame)
+            except Exception as e:
+                print("{0}: exception {1}".format(self.__sensor.id, str(e)))
+                traceback.print_exc()
+
+    def start_parse_pool(self, pool, max_pending: int = MAX_PENDING_PARSES):
+        """Parse frames in a pool of worker processes instead of on the
+        receiving thread. Frames are still published in the order they
+        were received.
+
+        Args:
+            pool(concurrent.futures.Executor): The process pool, created
+            with this sensor by `monodrive.sensors.parse_pool.create_parse_pool`
+            max_pending(int): The number of frames that can be parsing at
+            once before receiving waits
+
+        Raises:
+            ValueError if the frames of the sensor cannot be parsed in a
+            worker process, see `Sensor.parse_in_process`
+        """
+        if self.__parse_pool is not None:
+            raise RuntimeError('Parse pool of {} is already started'.format(self.__sensor.id))
+        if not self.__sensor.parse_in_process:
+            raise ValueError('Frames of {} cannot be parsed in worker processes'.format(self.__sensor.id))
+        self.__parse_pool = pool
+        self.__send_sensor = False
+        self.__parses = queue.Queue(max_pending)
+        self.__parse_publisher = threading.Thread(target=self._run_parse_results, daemon=True)
+        self.__parse_publisher.start()
+
+    def stop_parse_pool(self):
+        """Publish the frames still parsing and stop using the parse pool.
+        No more blocks may be received afterwards."""
+        if self.__parse_pool is None:
             return
-        self.__source.subscribe(lambda data: callback(data))
+        self.__parses.put(None)
+        self.__parse_publisher.join()
+        self.__parse_pool = None
+
+    def _run_parse_results(self):
+        """Publish the frames parsed in worker processes in order"""
+        while True:
+            item = self.__parses.get()
+            if item is None:
+                break
+            future, sample_count = item
+            try:
+                self._publish(future.result(), sample_count)
+            except Exception as e:
+                print("{0}: exception {1}".format(self.__sensor.id, str(e)))
+                traceback.print_exc()
+
+    @property
+    def block_index(self) -> int:
+        """Get the index, within the current frame, of the next block"""
+        return self.__block_count
+
+    def on_block(self, data, package_length: int, time: int, game_time: float, sample_count: int):
+        """Handle a received block: add it to the frame being assembled and
+        publish the frame to subscribers once all of its blocks arrived.
+
+        Args:
+            data(memoryview): The payload of the block
+            package_length(int): The length, in bytes, of the payload
+            time(int): The time from the sensor header
+            game_time(float): The game time from the sensor header
+            sample_count(int): The sample count from the sensor header
+        """
+        sensor = self.__sensor
+        pool = self.__parse_pool
+        if self.__block_count == 0:
+            # subscribers added mid frame see the next frame
+            self.__parse = self._parses_frames()
+            self.__raw = bool(self.__raw_subscribers)
+            self.__lazy = self.lazy_frames
+        parse = self.__parse
+        if self.__raw:
+            self.__raw_blocks.append(data)
+        if parse and pool is not None:
+            if self.__block_count == 0:
+                self.__frame_state = []
+            # the receive buffer is reused, so worker processes get a copy
+            self.__frame_state.append(bytes(data))
+            if not self.__raw and isinstance(getattr(data, 'obj', None), PooledBuffer):
+                data.obj.release()
+        elif parse and self.__lazy:
+            if self.__block_count == 0:
+                self.__frame_state = []
+            self.__frame_state.append(data)
+        elif parse:
+            if self.__block_count == 0:
+                self.__frame_state = sensor.begin_frame()
+            sensor.parse_block(self.__frame_state, self.__block_count, data)
+        self.__block_count += 1
+
+        if sensor.blocks_per_frame != 1 and sensor.blocks_per_frame != self.__block_count:
+            return
+        state = self.__frame_state
+        self.__frame_state = None
+        self.__block_count = 0
+
+        # Publish to raw data subscribers
+        if self.__raw:
+            raw = RawFrame(sensor.id, time, game_time, sample_count, package_length, self.__raw_blocks)
+            self.__raw_blocks = []
+            for callback in self.__raw_subscribers:
+                try:
+                    callback(raw)
+                except Exception as e:
+                    print("{0}: exception {1}".format(sensor.id, str(e)))
+                    traceback.print_exc()
+            if not parse or pool is not None:
+                # nothing holds on to the blocks, return pooled buffers
+                for block in raw.blocks:
+                    if isinstance(block.obj, PooledBuffer):
+                        block.obj.release()
+            if not parse:
+                if self.on_delivered is not None:
+                    self.on_delivered(raw)
+                return
+
+        # Parse and publish to subscribers
+        if pool is not None:
+            future = pool.submit(
+                parse_frame, sensor.id, state, package_length, time, game_time,
+                sensor if self.__send_sensor else None
+            )
+            self.__parses.put((future, sample_count))
+        elif self.__lazy:
+            frame = sensor.parse_lazy(state, package_length, time, game_time)
+            self._publish(frame, sample_count)
+        else:
+            frame = sensor.finish_frame(state, package_length, time, game_time)
+            self._publish(frame, sample_count)
+
+    def _publish(self, frame: DataFrame, sample_count: int):
+        """Stamp a parsed frame and deliver it, through the frame queue if
+        there is one
+
+        Args:
+            frame(DataFrame): The parsed frame
+            sample_count(int): The sample count from the sensor header
+        """
+        frame.sample_count = sample_count
+        if self.__queue is not None:
+            self.__queue.put(frame)
+        else:
+            self.dispatch(frame)
+
+    def dispatch(self, frame: DataFrame):
+        """Deliver a parsed frame to subscribers.
+
+        Args:
+            frame(DataFrame): The parsed frame
+        """
+        if self.shared_ring is not None:
+            self.shared_ring.publish(frame)
+        self.__source.publish(frame, self.on_delivered)
+
+    def get_sensor(self) -> Sensor:
+        """Get copy of sensor configuration"""
+        return copy.deepcopy(self.__sensor)
+
+    def set_sensor(self, sensor: Sensor):
+        """Set sensor config for this stream"""
+        if sensor.sensor_type != self.__sensor.sensor_type:
+            raise ValueError('Sensor type cannot be updated {} -> {}'.format(
+                self.__sensor.sensor_type, sensor.sensor_type
+            ))
+        if sensor.listen_port != self.__sensor.listen_port:
+            raise ValueError('Sensor listen port cannot be updated {} -> {}'.format(
+                self.__sensor.listen_port, sensor.listen_port
+            ))
+        self.__sensor = copy.deepcopy(sensor)
+        # the workers of the parse pool have the previous configuration
+        self.__send_sensor = self.__parse_pool is not None
+
+
+class SensorThread(SensorStream, threading.Thread):
+    """Thread for processing sensor data from the simulator"""
+
+    def __init__(self, host: str, sensor: Sensor, verbose: bool = False):
+        threading.Thread.__init__(self)
+        SensorStream.__init__(self, sensor, verbose=verbose)
+
+        # The client that is connected to the simulator
+        self.__client = Client(host, sensor.listen_port)
+
+        # Flag to determine if the sensor should be connected
+        self.__running = False
+
+        # Socket pair used to wake the read loop when the thread is stopped
+        self.__wakeup_reader, self.__wakeup_writer = socket.socketpair()
+
+        # Receive buffers reused across frames, one per block of a frame
+        self.__header = bytearray(HEADER_SIZE)
+        self.__buffers = []
 
     def start(self):
         """Start the client connection for this sensor"""
-        if self.__verbose:
-            print("Starting {0} on {1}".format(self.__sensor.id, self.name))
+        if self.verbose:
+            print("Starting {0} on {1}".format(self.sensor.id, self.name))
         self.__running = True
         self.__client.connect()
-        super().start()
+        threading.Thread.start(self)
 
     def stop(self):
         """Stop the client connection for this sensor"""
         self.__running = False
+        self.__wakeup_writer.send(b'\0')
+        self.stop_queue()
+        # the thread may never have been started if starting the sensors
+        # failed partway
+        if self.ident is not None:
+            self.join(STOP_TIMEOUT)
         self.__client.disconnect()
-        self.join()
+        if self.ident is not None:
+            self.join()
+        self.stop_parse_pool()
+        self.__wakeup_reader.close()
+        self.__wakeup_writer.close()
 
     def run(self):
         """Overwrite the base Thread run to start the main read loop for this
         sensor"""
-        if self.__verbose:
-            print("Running main sensor thread: {} - {}".format(self.__sensor.id, self.name))
+        if self.verbose:
+            print("Running main sensor thread: {} - {}".format(self.sensor.id, self.name))
 
         while self.__running:
             try:
-                # Check socket for data available
-                if not self.__client.data_ready():
+                # Block until data is available or the thread is stopped
+                if not self.__client.data_ready(POLL_TIMEOUT, self.__wakeup_reader):
                     continue
                 # Read the header and data of the message
-                header = self.__client.read(HEADER_SIZE)
-                length, t, game_time, sample_count = struct.unpack("!IIfI", header)
-                data = self.__client.read(length - HEADER_SIZE)
+                if self.__client.read_into(self.__header) != HEADER_SIZE:
+                    raise ConnectionError("connection closed by server")
+                length, t, game_time, sample_count = struct.unpack("!IIfI", self.__header)
                 package_length = length - HEADER_SIZE
-                self.data_buffer.append(data)
-
-                # TODO: publish to raw data subscribers
-
-                # Parse and publish to subscribers
-                if (self.__sensor.blocks_per_frame == 1
-                        or self.__sensor.blocks_per_frame == len(self.data_buffer)):
-                    frame = self.__sensor.parse(self.data_buffer, package_length, t, game_time)
-
-                    self.observer.on_next(frame)
-                    self.data_buffer = []
+                data = self._read_block(self.block_index, package_length)
+                self.on_block(data, package_length, t, game_time, sample_count)
 
             except Exception as e:
-                print("{0}: exception {1}".format(self.__sensor.id, str(e)))
+                if not self.__running:
+                    break
+                print("{0}: exception {1}".format(self.sensor.id, str(e)))
                 traceback.print_exc()
                 break
 
         # Log that this sensor has stopped running
-        if self.__verbose:
-            print("{0}: disconnected".format(self.__sensor.id))
+        if self.verbose:
+            print("{0}: disconnected".format(self.sensor.id))
 
-    def get_sensor(self) -> Sensor:
-        """Get copy of sensor configuration"""
-        return copy.deepcopy(self.__sensor)
+    def _read_block(self, index: int, length: int) -> memoryview:
+        """Read one block of a frame into the buffer provided by the sensor
+        or else into the block's reusable receive buffer.
 
-    def set_sensor(self, sensor: Sensor):
-        """Set sensor config for this thread"""
-        if sensor.sensor_type != self.__sensor.sensor_type:
-            raise ValueError('Sensor type cannot be updated {} -> {}'.format(
-                self.__sensor.sensor_type, sensor.sensor_type
-            ))
-        if sensor.listen_port != self.__sensor.listen_port:
-            raise ValueError('Sensor listen port cannot be updated {} -> {}'.format(
-                self.__sensor.listen_port, sensor.listen_port
-            ))
-        self.__sensor = copy.deepcopy(sensor)
+        Args:
+            index(int): The index of the block within the current frame
+            length(int): The length, in bytes, of the block
+
+        Returns:
+            A view of the received block
+        """
+        buffer = self.sensor.allocate_block(length)
+        if buffer is None:
+            # blocks received into sensor buffers leave gaps in the list
+            if index >= len(self.__buffers):
+                self.__buffers.extend([None] * (index + 1 - len(self.__buffers)))
+            buffer = self.__buffers[index]
+            if buffer is None or len(buffer) < length:
+                buffer = self.__buffers[index] = bytearray(length)
+
+        view = memoryview(buffer)[:length]
+        if self.__client.read_into(view) != length:
+            raise ConnectionError("connection closed by server")
+        return view
@@ -4,11 +4,24 @@ Camera module for monoDrive simulator python client
 
 # lib
 import numpy as np
-import json
 import objectfactory
 
 # src
+from monodrive.common import codec
+from monodrive.common.buffer_pool import BufferPool, PooledBuffer
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import LazyGroup, keep_blocks
+
+# image buffer pools shared by all cameras, keyed by image size in bytes
+_buffer_pools = {}
+
+
+def _get_buffer_pool(size: int) -> BufferPool:
+    """Get the pool of image buffers of a given size, creating it on first use"""
+    pool = _buffer_pools.get(size)
+    if pool is None:
+        pool = _buffer_pools.setdefault(size, BufferPool(size))
+    return pool
 
 
 class CameraFrame(DataFrame):
@@ -18,6 +31,59 @@ class CameraFrame(DataFrame):
         self.game_time = None
         self.image = None
         self.annotation = None
+        # pooled buffer the image is a view of
+        self.buffer = None
+
+    def release(self):
+        """Return the image buffer to its pool so a later frame is received
+        into it. The image must not be used afterwards."""
+        if self.buffer is not None:
+            self.buffer.release()
+        self.buffer = None
+        self.image = None
+
+
+def _decode_image(frame: 'LazyCameraFrame') -> dict:
+    """Decode the image group of a lazy camera frame"""
+    image, buffer = frame._sensor._decode_image(frame._blocks[0])
+    return {'image': image, 'buffer': buffer}
+
+
+def _decode_annotation(frame: 'LazyCameraFrame') -> dict:
+    """Decode the annotation group of a lazy camera frame"""
+    if len(frame._blocks) != 2:
+        return {'annotation': None}
+    return {'annotation': codec.decode_relaxed(frame._blocks[1])}
+
+
+class LazyCameraFrame(CameraFrame):
+    """Camera frame whose image and annotation are decoded on first access"""
+    image = LazyGroup(_decode_image)
+    buffer = LazyGroup(_decode_image)
+    annotation = LazyGroup(_decode_annotation)
+
+    def __init__(self, sensor: 'Camera', blocks: [bytes]):
+        """Constructor.
+
+        Args:
+            sensor(Camera): The camera that decodes the payload
+            blocks([bytes]): The payload of each block of the frame
+        """
+        self.sensor_id = None
+        self.timestamp = None
+        self.game_time = None
+        self._sensor = sensor
+        self._blocks = blocks
+
+    def release(self):
+        """Return the image buffer to its pool, also if the image was never
+        decoded. The image must not be used afterwards."""
+        if 'buffer' not in self.__dict__:
+            buffer = getattr(self._blocks[0], 'obj', None)
+            if isinstance(buffer, PooledBuffer):
+                buffer.release()
+            self.buffer = None
+        super().release()
 
 
 @objectfactory.Factory.register_class
@@ -40,6 +106,10 @@ class Camera(Sensor):
     annotation = objectfactory.Nested(field_type=AnnotationDetails, default=None)
     channels = objectfactory.Field()
 
+    # images are views of pooled buffers, which are not sent between
+    # processes
+    parse_in_process = False
+
     def parse(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
         """
         Parse data from camera sensor
@@ -58,35 +128,99 @@ class Camera(Sensor):
         frame.sensor_id = self.id
         frame.time_stamp = time
         frame.game_time = game_time
+        frame.image, frame.buffer = self._decode_image(data[0])
+
+        if len(data) == 2:
+            frame.annotation = codec.decode_relaxed(data[1])
+
+        return frame
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from camera sensor in a frame that decodes the image and
+        the annotation on first access
+
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
+
+        Returns:
+            LazyCameraFrame object
+        """
+        frame = LazyCameraFrame(self, keep_blocks(data))
+        frame.sensor_id = self.id
+        frame.time_stamp = time
+        frame.game_time = game_time
+        return frame
+
+    def _decode_image(self, data: bytes):
+        """
+        Decode the image block of a frame
 
+        Args:
+            data: The image block
+
+        Returns:
+            The image and the pooled buffer it is a view of, both None if
+            the block is not a complete image
+        """
         # get num channels
-        num_channels = {
-            'rgba': 4,
-            'bgra': 4,
-            'gray': 1
-        }.get(self.channels, None)
+        num_channels = self._num_channels()
         if num_channels is None:
             raise ValueError('Camera channels type: {} not supported'.format(self.channels))
+        image_size = self.stream_dimensions.y * self.stream_dimensions.x * num_channels
 
         # validate complete data
-        if len(data[0]) != self.stream_dimensions.y * self.stream_dimensions.x * num_channels:
-            print('sensor: {}, received wrong image size: {}'.format(self.id, len(data[0])))
-            return frame
+        buffer = getattr(data, 'obj', data)
+        if len(data) != image_size:
+            print('sensor: {}, received wrong image size: {}'.format(self.id, len(data)))
+            if isinstance(buffer, PooledBuffer):
+                buffer.release()
+            return None, None
 
-        # do parse
-        im = np.array(bytearray(data[0]), dtype=np.uint8)
+        # the image is a view of a pooled buffer, copied into one only if
+        # the payload was not received straight into the pool
+        if not isinstance(buffer, PooledBuffer):
+            buffer = _get_buffer_pool(len(data)).acquire()
+            buffer[:] = data
+        im = np.frombuffer(buffer, dtype=np.uint8)
         im = np.reshape(
             im,
             (int(self.stream_dimensions.y), int(self.stream_dimensions.x), num_channels)
         )
-        im = im[:, :, :3]
-        frame.image = im
+        return im[:, :, :3], buffer
 
-        if len(data) == 2:
-            json_raw = data[1].decode('utf8').replace("'", '"')
-            frame.annotation = json.loads(json_raw)
+    def allocate_block(self, length: int):
+        """
+        Receive images straight into pooled buffers
 
-        return frame
+        Args:
+            length: The length, in bytes, of the block
+
+        Returns:
+            A pooled buffer if the block is an image, otherwise None
+        """
+        num_channels = self._num_channels()
+        if num_channels is None:
+            return None
+        if length != self.stream_dimensions.y * self.stream_dimensions.x * num_channels:
+            return None
+        return _get_buffer_pool(length).acquire()
+
+    def _num_channels(self):
+        """
+        Get the number of channels of the image
+
+        Returns:
+            The number of channels, None if the channels type is not supported
+        """
+        return {
+            'rgba': 4,
+            'bgra': 4,
+            'gray': 1
+        }.get(self.channels, None)
 
     def configure(self):
         if self.annotation is None:
@@ -3,11 +3,12 @@ Collision sensor module for monoDrive simulator python client
 """
 
 # lib
-import json
 import objectfactory
 
 # src
+from monodrive.common import codec
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import build_frame, keep_blocks, lazy_json_frame
 
 
 @objectfactory.Factory.register_class
@@ -36,6 +37,13 @@ class CollisionFrame(DataFrame, CollisionFrameTarget):
     targets = objectfactory.List(field_type=CollisionFrameTarget)
 
 
+# collision frame whose body is decoded on first access
+LazyCollisionFrame = lazy_json_frame(
+    CollisionFrame,
+    [name for name in CollisionFrame._fields if name != 'sensor_id']
+)
+
+
 @objectfactory.Factory.register_class
 class Collision(Sensor):
     """Collision sensor"""
@@ -54,9 +62,26 @@ class Collision(Sensor):
             parsed CollisionFrame object
         """
         data = data[0]
-        json_raw = data.decode('utf8').replace("'", '"')
-        parsed_json = json.loads(json_raw)
-        frame = CollisionFrame()
-        frame.deserialize(parsed_json)
+        parsed_json = codec.decode_relaxed(data)
+        frame = build_frame(CollisionFrame, parsed_json)
+        frame.sensor_id = self.id
+        return frame
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from collision sensor in a frame that decodes the collision
+        data on first access
+
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
+
+        Returns:
+            LazyCollisionFrame object
+        """
+        frame = LazyCollisionFrame()
+        frame._blocks = keep_blocks(data)
         frame.sensor_id = self.id
         return frame
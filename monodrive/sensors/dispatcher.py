@@ -0,0 +1,176 @@
+"""dispatcher.py
+In-process fan-out of parsed frames to subscriber callbacks
+"""
+
+# lib
+import threading
+import traceback
+
+
+class Subscription:
+    """Handle of a callback subscribed to a `FrameDispatcher`"""
+
+    def __init__(self, dispatcher: 'FrameDispatcher', callback, executor=None):
+        """Constructor.
+
+        Args:
+            dispatcher(FrameDispatcher): The dispatcher subscribed to
+            callback(func): The function called with each frame
+            executor(concurrent.futures.Executor): The executor the callback
+            is run on, None to call it on the publishing thread
+        """
+        self.__dispatcher = dispatcher
+        self.callback = callback
+        self.executor = executor
+
+    def dispose(self):
+        """Unsubscribe the callback, it is not called with later frames"""
+        self.__dispatcher.unsubscribe(self)
+
+
+class _Delivery:
+    """Delivery of a frame to subscribers, some of which may run on
+    executors, that calls back once all of them returned"""
+
+    def __init__(self, frame, callback):
+        """Constructor.
+
+        Args:
+            frame: The frame delivered
+            callback(func): The function called with the frame once every
+            subscriber returned
+        """
+        self.__frame = frame
+        self.__callback = callback
+        # the publisher counts as pending until it submitted the frame to
+        # every subscriber
+        self.__pending = 1
+        self.__lock = threading.Lock()
+
+    def add(self):
+        """Count a subscriber the frame is submitted to"""
+        with self.__lock:
+            self.__pending += 1
+
+    def done(self, future=None):
+        """Count a subscriber, or the publisher, as done
+
+        Args:
+            future(concurrent.futures.Future): The future of the subscriber
+        """
+        with self.__lock:
+            self.__pending -= 1
+            finished = self.__pending == 0
+        if finished:
+            self.__callback(self.__frame)
+
+
+class FrameDispatcher:
+    """Delivers each published frame to every subscriber.
+
+    The subscribers are held in a tuple that is replaced when subscribing or
+    unsubscribing, so publishing takes no lock. A subscriber that raises is
+    logged and does not keep the frame from the other subscribers.
+    """
+
+    def __init__(self, name: str = 'dispatcher'):
+        """Constructor.
+
+        Args:
+            name(str): The name errors of subscribers are logged with
+        """
+        self.__name = name
+        self.__subscriptions = ()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__subscriptions)
+
+    def subscribe(self, callback, executor=None) -> Subscription:
+        """Subscribe a callback to the published frames.
+
+        Args:
+            callback(func): The function called with each frame. Should be
+            of the format:
+                def my_callback(frame):
+            executor(concurrent.futures.Executor): The executor the callback
+            is submitted to, so a slow subscriber does not hold up the
+            publishing thread or the other subscribers. None calls the
+            callback on the publishing thread.
+
+        Returns:
+            The Subscription, which can be disposed to unsubscribe
+        """
+        subscription = Subscription(self, callback, executor)
+        with self.__lock:
+            self.__subscriptions = self.__subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Unsubscribe a subscription, does nothing if it was already
+
+        Args:
+            subscription(Subscription): The subscription from `subscribe`
+        """
+        with self.__lock:
+            self.__subscriptions = tuple(s for s in self.__subscriptions if s is not subscription)
+
+    def publish(self, frame, on_delivered=None):
+        """Deliver a frame to every subscriber.
+
+        Args:
+            frame: The frame
+            on_delivered(func): The function called with the frame once
+            every subscriber returned: before `publish` returns if none of
+            them runs on an executor, otherwise on the thread of the last
+            one to return
+        """
+        delivery = _Delivery(frame, on_delivered) if on_delivered is not None else None
+        for subscription in self.__subscriptions:
+            try:
+                if subscription.executor is None:
+                    subscription.callback(frame)
+                else:
+                    future = subscription.executor.submit(subscription.callback, frame)
+                    future.add_done_callback(self._check_result)
+                    if delivery is not None:
+                        delivery.add()
+                        future.add_done_callback(delivery.done)
+            except Exception as e:
+                print("{0}: exception in callback {1}".format(self.__name, str(e)))
+                traceback.print_exc()
+        if delivery is not None:
+            delivery.done()
+
+    def _check_result(self, future):
+        """Log the exception of a callback run on an executor"""
+        if future.cancelled() or future.exception() is None:
+            return
+        e = future.exception()
+        print("{0}: exception in callback {1}".format(self.__name, str(e)))
+        traceback.print_exception(type(e), e, e.__traceback__)
+
+    def as_observable(self):
+        """Get an Rx observable of the published frames, for use with Rx 1.x,
+        RxPY 3 or reactivex, whichever is installed. Each subscription to the
+        observable subscribes to this dispatcher.
+
+        Raises:
+            ImportError if no Rx library is installed
+
+        Returns:
+            The Observable
+        """
+        def subscribe(observer, scheduler=None):
+            return self.subscribe(observer.on_next).dispose
+
+        try:
+            import reactivex
+            return reactivex.create(subscribe)
+        except ImportError:
+            pass
+        import rx
+        if hasattr(rx, 'Observable') and hasattr(rx.Observable, 'create'):
+            # Rx 1.x
+            return rx.Observable.create(subscribe)
+        return rx.create(subscribe)
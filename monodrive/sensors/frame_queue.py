@@ -0,0 +1,110 @@
+"""frame_queue.py
+Bounded queue of parsed frames between a sensor's receive loop and the
+delivery to its subscribers
+"""
+
+# lib
+import collections
+import threading
+from enum import Enum
+
+DEFAULT_QUEUE_SIZE = 4
+"""Default number of parsed frames a sensor queues for delivery"""
+
+
+class QueuePolicy(Enum):
+    """Enumeration of what a full frame queue does with a new frame"""
+    # Wait for the subscribers to catch up, which holds back the receive
+    # loop and the simulator behind it
+    BLOCK = 'block'
+    # Drop the oldest queued frame
+    DROP_OLDEST = 'drop_oldest'
+    # Only ever hold the newest frame, dropping any frame not yet delivered
+    KEEP_LATEST = 'keep_latest'
+
+
+class FrameQueue:
+    """Thread safe bounded queue of parsed frames. Dropped frames are
+    released so their pooled buffers are reused."""
+
+    def __init__(self, size: int = DEFAULT_QUEUE_SIZE, policy: QueuePolicy = QueuePolicy.BLOCK):
+        """Constructor.
+
+        Args:
+            size(int): The number of frames the queue holds
+            policy(QueuePolicy): What to do with a new frame when the queue
+            is full
+        """
+        self.__policy = QueuePolicy(policy)
+        self.__size = 1 if self.__policy == QueuePolicy.KEEP_LATEST else max(1, size)
+        self.__frames = collections.deque()
+        self.__condition = threading.Condition()
+        self.__closed = False
+
+        # Number of frames dropped and the largest depth reached
+        self.dropped = 0
+        self.high_water = 0
+
+    @property
+    def policy(self) -> QueuePolicy:
+        """Get the policy of this queue"""
+        return self.__policy
+
+    @property
+    def size(self) -> int:
+        """Get the number of frames this queue holds"""
+        return self.__size
+
+    @property
+    def depth(self) -> int:
+        """Get the number of frames waiting for delivery"""
+        return len(self.__frames)
+
+    def put(self, frame):
+        """Queue a frame for delivery, applying the policy if the queue is
+        full. Frames put after the queue was closed are dropped.
+
+        Args:
+            frame(DataFrame): The parsed frame
+        """
+        with self.__condition:
+            if self.__policy == QueuePolicy.BLOCK:
+                self.__condition.wait_for(
+                    lambda: self.__closed or len(self.__frames) < self.__size
+                )
+            if self.__closed:
+                self._drop(frame)
+                return
+            while len(self.__frames) >= self.__size:
+                self._drop(self.__frames.popleft())
+            self.__frames.append(frame)
+            self.high_water = max(self.high_water, len(self.__frames))
+            self.__condition.notify_all()
+
+    def get(self):
+        """Wait for the next frame to deliver
+
+        Returns:
+            The oldest queued frame, None once the queue is closed
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__closed or self.__frames)
+            if self.__closed:
+                return None
+            frame = self.__frames.popleft()
+            self.__condition.notify_all()
+            return frame
+
+    def close(self):
+        """Close the queue, dropping the frames that were not delivered and
+        waking any thread blocked on it"""
+        with self.__condition:
+            self.__closed = True
+            while self.__frames:
+                self._drop(self.__frames.popleft())
+            self.__condition.notify_all()
+
+    def _drop(self, frame):
+        """Count and release a frame that will not be delivered"""
+        self.dropped += 1
+        frame.release()
@@ -5,24 +5,68 @@ Lidar module for monoDrive simulator python client
 # lib
 import math
 import numpy as np
-import struct
 import objectfactory
 
 # src
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import LazyGroup, keep_blocks
 
 # constants
 CHANNELS_PER_BLOCK = 32
 BLOCKS_PER_PACKET = 12
 PACKET_SIZE = 1206
+AZIMUTH_STEPS = 36000
+"""Number of azimuth values in a sweep, which are quantized to 0.01 degree"""
+
+# packet layout, decoded directly from the received buffers
+POINT_DTYPE = np.dtype([('distance', '<u2'), ('intensity', 'u1')])
+BLOCK_DTYPE = np.dtype([
+    ('flag', '<u2'),
+    ('azimuth', '<u2'),
+    ('points', POINT_DTYPE, (CHANNELS_PER_BLOCK,))
+])
+PACKET_DTYPE = np.dtype([
+    ('blocks', BLOCK_DTYPE, (BLOCKS_PER_PACKET,)),
+    ('timestamp', '<u4'),
+    ('flag', '<u2')
+])
 
 
 class LidarFrame(DataFrame):
+    """Data frame for lidar sensor, with the point cloud stored as columns"""
+
     def __init__(self):
         self.sensor_id = None
         self.timestamp = None
         self.game_time = None
-        self.points: [LidarPoint] = []
+        # (N, 4) float32 array of x, y, z, intensity for every point
+        self.point_cloud = np.empty((0, 4), dtype=np.float32)
+        # azimuth in degrees, laser index and return flag for every point
+        self.azimuth = np.empty(0, dtype=np.float32)
+        self.laser = np.empty(0, dtype=np.uint8)
+        self.valid = np.empty(0, dtype=bool)
+
+    @property
+    def points(self) -> 'LidarPointView':
+        """Get a sequence view of the point cloud that yields `LidarPoint`
+        objects on access
+
+        Returns:
+            LidarPointView over the point cloud
+        """
+        return LidarPointView(self.point_cloud)
+
+    @points.setter
+    def points(self, points: ['LidarPoint']):
+        """Set the point cloud from a list of `LidarPoint` objects
+
+        Args:
+            points: list of LidarPoint
+        """
+        self.point_cloud = np.array(
+            [[pt.x, pt.y, pt.z, pt.intensity] for pt in points],
+            dtype=np.float32
+        ).reshape(-1, 4)
 
 
 class LidarPoint:
@@ -35,30 +79,136 @@ class LidarPoint:
         self.intensity = intensity
 
 
-class LidarDataBlockPoint:
-    """Class for a single data point from LiDAR"""
+class LidarPointView:
+    """Read-only sequence of `LidarPoint` objects created lazily from an
+    (N, 4) point cloud array"""
 
-    def __init__(self, d: int, i: int):
-        self.d = d
-        self.i = i
+    def __init__(self, point_cloud: np.ndarray):
+        self.__point_cloud = point_cloud
 
+    def __len__(self):
+        return len(self.__point_cloud)
 
-class LidarDataBlock:
-    """Class for a block of 16 data points from LiDAR"""
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LidarPointView(self.__point_cloud[index])
+        return LidarPoint(*self.__point_cloud[index].tolist())
 
-    def __init__(self):
-        self.points = []
-        self.flag = None
-        self.azimuth = None
+    def __iter__(self):
+        for point in self.__point_cloud.tolist():
+            yield LidarPoint(*point)
 
 
-class LidarPacket:
-    """Class for an entire packet of 12 data blocks from LiDAR"""
+class _LidarFrameBuilder:
+    """Point columns of a lidar frame being assembled packet by packet"""
 
-    def __init__(self):
-        self.blocks = []
+    def __init__(self, capacity: int):
+        """Constructor.
+
+        Args:
+            capacity(int): The maximum number of points in the frame
+        """
+        self.point_cloud = np.empty((capacity, 4), dtype=np.float32)
+        self.azimuth = np.empty(capacity, dtype=np.float32)
+        self.laser = np.empty(capacity, dtype=np.uint8)
+        self.valid = np.empty(capacity, dtype=bool)
+        self.count = 0
+
+    def take(self, count: int) -> slice:
+        """Reserve the next rows of the columns, growing them if more points
+        arrive than expected
+
+        Args:
+            count(int): The number of rows to reserve
+
+        Returns:
+            The slice of the reserved rows
+        """
+        needed = self.count + count
+        if needed > len(self.valid):
+            capacity = max(needed, 2 * len(self.valid))
+            self.point_cloud = np.resize(self.point_cloud, (capacity, 4))
+            self.azimuth = np.resize(self.azimuth, capacity)
+            self.laser = np.resize(self.laser, capacity)
+            self.valid = np.resize(self.valid, capacity)
+        rows = slice(self.count, needed)
+        self.count = needed
+        return rows
+
+    def fill(self, frame: LidarFrame):
+        """Set the columns of a frame to the assembled points
+
+        Args:
+            frame(LidarFrame): The frame to fill
+        """
+        frame.point_cloud = self.point_cloud[:self.count]
+        frame.azimuth = self.azimuth[:self.count]
+        frame.laser = self.laser[:self.count]
+        frame.valid = self.valid[:self.count]
+
+
+def _decode_points(frame: 'LazyLidarFrame') -> dict:
+    """Decode the point columns of a lazy lidar frame"""
+    state = frame._sensor._decode_frame(frame._blocks)
+    return {
+        'point_cloud': state.point_cloud[:state.count],
+        'azimuth': state.azimuth[:state.count],
+        'laser': state.laser[:state.count],
+        'valid': state.valid[:state.count]
+    }
+
+
+class LazyLidarFrame(LidarFrame):
+    """Lidar frame whose point columns are decoded on first access"""
+    point_cloud = LazyGroup(_decode_points)
+    azimuth = LazyGroup(_decode_points)
+    laser = LazyGroup(_decode_points)
+    valid = LazyGroup(_decode_points)
+
+    def __init__(self, sensor: 'Lidar', blocks: [bytes]):
+        """Constructor.
+
+        Args:
+            sensor(Lidar): The lidar that decodes the packets
+            blocks([bytes]): The packets of the sweep
+        """
+        self.sensor_id = None
         self.timestamp = None
-        self.flag = None
+        self.game_time = None
+        self._sensor = sensor
+        self._blocks = blocks
+
+
+class LidarTrigTables:
+    """Sine and cosine lookup tables for the elevation of every channel and
+    every quantized azimuth of a lidar configuration"""
+
+    def __init__(self, laser_angles: [float], horizontal_resolution: float):
+        """Constructor.
+
+        Args:
+            laser_angles([float]): The pitch, in degrees, of each laser
+            horizontal_resolution(float): The azimuth step, in degrees,
+            between the two rows of a block
+        """
+        channel = np.arange(CHANNELS_PER_BLOCK)
+        self.laser = (channel % len(laser_angles)).astype(np.uint8)
+        omega = np.radians(np.array(laser_angles)[self.laser])
+        self.cos_elevation = np.cos(omega)
+        self.sin_elevation = np.sin(omega)
+
+        # two rows of data per block, the first one step further around
+        self.row = (channel >= CHANNELS_PER_BLOCK // 2).astype(np.intp)
+        azimuth = np.arange(AZIMUTH_STEPS) / 100.0
+        azimuth = np.stack([azimuth + horizontal_resolution, azimuth])
+        alpha = np.radians(azimuth)
+        self.azimuth = azimuth.astype(np.float32)
+        self.cos_azimuth = np.cos(alpha)
+        self.sin_azimuth = np.sin(alpha)
+
+
+# lookup tables shared by all lidars, keyed by (n_lasers, horizontal_resolution)
+_trig_tables = {}
 
 
 @objectfactory.Factory.register_class
@@ -79,13 +229,36 @@ class Lidar(Sensor):
                 float(rotations_per_scan) / \
                 (BLOCKS_PER_PACKET * packet_coeff)))
         self.blocks_per_frame = math.ceil(number_packets)
+        self._get_trig_tables()
 
-    def parse(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+    def begin_frame(self) -> '_LidarFrameBuilder':
         """
-        Parse data from lidar sensor
+        Start assembling a frame into point columns preallocated for a full
+        sweep
+
+        Returns:
+            The frame builder that packets are decoded into
+        """
+        return _LidarFrameBuilder(self.blocks_per_frame * BLOCKS_PER_PACKET * CHANNELS_PER_BLOCK)
+
+    def parse_block(self, state: '_LidarFrameBuilder', index: int, data: bytes):
+        """
+        Decode a packet into the frame as soon as it arrives
 
         Args:
-            data:
+            state: The frame builder from `begin_frame`
+            index: The index of the packet within the sweep
+            data: The raw packet
+        """
+        self._decode_packets(state, np.frombuffer(data, dtype=PACKET_DTYPE))
+
+    def finish_frame(self, state: '_LidarFrameBuilder', package_length: int, time: int,
+                     game_time: int) -> DataFrame:
+        """
+        Complete the frame from the decoded packets
+
+        Args:
+            state: The frame builder from `begin_frame`
             package_length:
             time:
             game_time:
@@ -97,61 +270,104 @@ class Lidar(Sensor):
         frame.sensor_id = self.id
         frame.timestamp = time
         frame.game_time = game_time
+        state.fill(frame)
+        return frame
 
-        laser_angles = self._get_laser_angles()
-
-        # parse each received packet
-        for chunk in data:
-            packet = self._parse_packet_data(chunk)
+    def parse(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Parse data from lidar sensor
 
-            for block in packet.blocks:
-                # indicates null end of sweep from simulator
-                if block.azimuth >= 36000:
-                    continue
-                for i, point in enumerate(block.points):
-                    pitch = laser_angles[i % self.n_lasers]
-                    distance = point.d * 2.0
-                    intensity = point.i
-                    azimuth = block.azimuth / 100.0
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
 
-                    # two rows of data per packet
-                    if i < len(block.points) / 2:
-                        azimuth += self.horizontal_resolution
+        Returns:
+            parsed LidarFrame object
+        """
+        return self.finish_frame(self._decode_frame(data), package_length, time, game_time)
 
-                    # convert to cartesian
-                    x, y, z = self._spherical_to_cartesian(azimuth, pitch, distance)
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from lidar sensor in a frame that decodes the point cloud
+        on first access
 
-                    # add to final point set for frame
-                    frame.points.append(
-                        LidarPoint(x, y, z, intensity)
-                    )
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
 
+        Returns:
+            LazyLidarFrame object
+        """
+        frame = LazyLidarFrame(self, keep_blocks(data))
+        frame.sensor_id = self.id
+        frame.timestamp = time
+        frame.game_time = game_time
         return frame
 
-    def _parse_packet_data(self, packet_data):
+    def _decode_frame(self, data: [bytes]) -> '_LidarFrameBuilder':
+        """
+        Decode every block of every packet of a sweep at once
+
+        Args:
+            data: The packets of the sweep
+
+        Returns:
+            The frame builder holding the points
+        """
+        state = _LidarFrameBuilder(len(data) * BLOCKS_PER_PACKET * CHANNELS_PER_BLOCK)
+        packets = np.concatenate([np.frombuffer(chunk, dtype=PACKET_DTYPE) for chunk in data])
+        self._decode_packets(state, packets)
+        return state
+
+    def _decode_packets(self, state: '_LidarFrameBuilder', packets: np.ndarray):
         """
-        Parse a 1206 byte packet from LiDAR into a `LidarPacket`.
+        Decode packets into the next rows of the frame being assembled
+
         Args:
-            packet_data:
+            state: The frame builder to write the points to
+            packets: Array of PACKET_DTYPE
+        """
+        blocks = packets['blocks'].reshape(-1)
+
+        # indicates null end of sweep from simulator
+        blocks = blocks[blocks['azimuth'] < AZIMUTH_STEPS]
+
+        distance = blocks['points']['distance'] * 2.0
+        intensity = blocks['points']['intensity']
+        rows = state.take(distance.size)
+
+        # convert to cartesian with table lookups, straight into the
+        # columns of the frame
+        tables = self._get_trig_tables()
+        index = blocks['azimuth'][:, np.newaxis]
+        state.point_cloud[rows, 0] = (distance * tables.cos_elevation
+                                      * tables.sin_azimuth[tables.row, index]).ravel()
+        state.point_cloud[rows, 1] = (distance * tables.cos_elevation
+                                      * tables.cos_azimuth[tables.row, index]).ravel()
+        state.point_cloud[rows, 2] = (distance * tables.sin_elevation).ravel()
+        state.point_cloud[rows, 3] = intensity.ravel()
+        state.azimuth[rows] = tables.azimuth[tables.row, index].ravel()
+        state.laser[rows] = np.broadcast_to(tables.laser, distance.shape).ravel()
+        state.valid[rows] = (distance != 0).ravel()
+
+    def _get_trig_tables(self) -> LidarTrigTables:
+        """
+        Helper function to get the lookup tables for this configuration,
+        building them on first use
 
         Returns:
-            Parsed lidar packet object
-        """
-        lidar_data = struct.unpack("<" + 12 * ("HH" + 32 * "HB") + "IH", packet_data)
-        lp = LidarPacket()
-        lp.flag = lidar_data[-1]
-        lp.timestamp = lidar_data[-2]
-
-        stride = 2 + 32 * 2
-        for i in range(12):
-            lp.blocks.append(LidarDataBlock())
-            lp.blocks[-1].flag = lidar_data[i * stride]
-            lp.blocks[-1].azimuth = lidar_data[i * stride + 1]
-            for j in range(i * stride + 2, i * stride + 65, 2):
-                lp.blocks[-1].points.append(
-                    LidarDataBlockPoint(lidar_data[j], lidar_data[j + 1])
-                )
-        return lp
+            LidarTrigTables shared with every lidar of the same configuration
+        """
+        key = (self.n_lasers, self.horizontal_resolution)
+        tables = _trig_tables.get(key)
+        if tables is None:
+            tables = LidarTrigTables(self._get_laser_angles(), self.horizontal_resolution)
+            _trig_tables[key] = tables
+        return tables
 
     def _get_laser_angles(self):
         """
@@ -189,29 +405,6 @@ class Lidar(Sensor):
 
         return laser_angles
 
-    @staticmethod
-    def _spherical_to_cartesian(azimuth: float, elevation: float, distance: float):
-        """Convert a LiDAR point from azimuth, elevation, distance into x, y, z
-        Cartesian coordinates.
-
-        Args:
-            azimuth(float): The azimuth angle associated with this point.
-            elevation(float): The elevation angle associated with this point.
-            distance(float): The distance (radius) for this point
-        Returns:
-            A tuple of the point in x, y, z Cartesian coordinates.
-        """
-        # If the distance was 0, then there was no return for this point
-        if distance == 0:
-            return 0, 0, 0
-
-        omega = np.radians(elevation)
-        alpha = np.radians(azimuth)
-        x = distance * math.cos(omega) * math.sin(alpha)
-        y = distance * math.cos(omega) * math.cos(alpha)
-        z = distance * math.sin(omega)
-        return x, y, z
-
 
 @objectfactory.Factory.register_class
 class SemanticLidar(Lidar):
@@ -0,0 +1,81 @@
+"""parse_pool.py
+Parsing of sensor frames in worker processes
+"""
+
+# lib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+
+# The configured sensors of a worker process keyed by sensor id, set when
+# the worker starts
+_sensors = {}
+
+
+class ParseExecutor(Enum):
+    """Enumeration of where the frames of a sensor are parsed"""
+    # On the thread receiving the sensor data
+    INLINE = 'inline'
+    # In a pool of worker processes, for CPU heavy sensors such as Lidar
+    # and State
+    PROCESS = 'process'
+
+
+def _init_worker(sensors: dict):
+    """Keep the sensors a worker process parses frames of"""
+    _sensors.update(sensors)
+
+
+def create_parse_pool(sensors: list, workers: int = None) -> ProcessPoolExecutor:
+    """
+    Create a pool of processes to parse the frames of sensors in
+
+    The sensors are sent to each worker once, when it starts, so only the
+    payload of a frame is sent with it. Workers are spawned rather than
+    forked, since the client has sensor threads running that a forked child
+    would inherit locks from.
+
+    Args:
+        sensors([Sensor]): The configured sensors whose frames are parsed
+        in the pool
+        workers(int): The number of worker processes, the number of CPUs
+        by default
+
+    Raises:
+        ValueError if the frames of a sensor cannot be parsed in a worker
+        process, see `Sensor.parse_in_process`
+
+    Returns:
+        The process pool
+    """
+    for sensor in sensors:
+        if not sensor.parse_in_process:
+            raise ValueError('Frames of {} cannot be parsed in worker processes'.format(sensor.id))
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=({sensor.id: sensor for sensor in sensors},)
+    )
+
+
+def parse_frame(sensor_id: str, blocks: [bytes], package_length: int, time: int, game_time: float,
+                sensor=None):
+    """
+    Parse the blocks of a frame, run in a worker process
+
+    Args:
+        sensor_id(str): The id of the sensor the pool was created with
+        blocks([bytes]): The payload of each block of the frame
+        package_length(int): The length, in bytes, of the last block
+        time(int): The time from the sensor header
+        game_time(float): The game time from the sensor header
+        sensor(Sensor): The configured sensor, when its configuration
+        changed since the pool was created
+
+    Returns:
+        The parsed frame
+    """
+    if sensor is None:
+        sensor = _sensors[sensor_id]
+    return sensor.parse(blocks, package_length, time, game_time)
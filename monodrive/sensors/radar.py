@@ -3,11 +3,13 @@ Radar module for monoDrive simulator python client
 """
 
 # lib
-import json
+import numpy as np
 import objectfactory
 
 # src
+from monodrive.common import codec
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import build_frame, keep_blocks, lazy_json_frame
 
 
 @objectfactory.Factory.register_class
@@ -19,6 +21,33 @@ class RadarFrameTarget(objectfactory.Serializable):
     target_ids = objectfactory.Field()
 
 
+RADAR_COLUMNS = ('range', 'aoa', 'velocity', 'rcs')
+"""Names of the radar target column arrays"""
+
+
+class RadarTargetArrays:
+    """Radar targets as column arrays, one entry per target in the order of
+    the target list"""
+
+    def __init__(self, targets: [RadarFrameTarget]):
+        """Constructor.
+
+        Args:
+            targets: The radar targets
+        """
+        columns = np.array(
+            [(t.range, t.aoa, t.velocity, t.rcs) for t in targets],
+            dtype=np.float64
+        ).reshape(-1, len(RADAR_COLUMNS))
+        self.range = columns[:, 0]
+        self.aoa = columns[:, 1]
+        self.velocity = columns[:, 2]
+        self.rcs = columns[:, 3]
+
+    def __len__(self):
+        return len(self.range)
+
+
 @objectfactory.Factory.register_class
 class RadarFrame(DataFrame, objectfactory.Serializable):
     sensor_id = objectfactory.Field()
@@ -33,6 +62,55 @@ class RadarFrame(DataFrame, objectfactory.Serializable):
         field_type=RadarFrameTarget
     )
 
+    # column arrays, built on first access since frames are not modified
+    # after they are parsed
+    _target_arrays = None
+    _groundtruth_arrays = None
+
+    @property
+    def target_arrays(self) -> RadarTargetArrays:
+        """Get the range, aoa, velocity and rcs of the targets as arrays"""
+        if self._target_arrays is None:
+            self._target_arrays = RadarTargetArrays(self.targets)
+        return self._target_arrays
+
+    @property
+    def groundtruth_arrays(self) -> RadarTargetArrays:
+        """Get the range, aoa, velocity and rcs of the ground truth targets
+        as arrays"""
+        if self._groundtruth_arrays is None:
+            self._groundtruth_arrays = RadarTargetArrays(self.groundtruth_targets)
+        return self._groundtruth_arrays
+
+
+# radar frame whose targets are decoded on first access
+LazyRadarFrame = lazy_json_frame(RadarFrame, ['targets', 'groundtruth_targets'])
+
+
+def merge_radar_frames(frames: [RadarFrame], groundtruth: bool = False) -> np.ndarray:
+    """
+    Merge the targets of several radars into one table
+
+    Args:
+        frames: The frames of the radars, e.g. for one sample
+        groundtruth: Merge the ground truth targets instead of the targets
+
+    Returns:
+        Structured array with a `sensor_id` field and one field per
+        `RADAR_COLUMNS` entry, with the targets of each frame in turn
+    """
+    columns = [f.groundtruth_arrays if groundtruth else f.target_arrays for f in frames]
+    sensor_ids = [str(f.sensor_id) for f in frames]
+    counts = [len(c) for c in columns]
+    dtype = [('sensor_id', 'U{}'.format(max([len(i) for i in sensor_ids], default=1)))]
+    dtype += [(name, np.float64) for name in RADAR_COLUMNS]
+
+    table = np.empty(sum(counts), dtype=dtype)
+    table['sensor_id'] = np.repeat(sensor_ids, counts)
+    for name in RADAR_COLUMNS:
+        table[name] = np.concatenate([getattr(c, name) for c in columns]) if columns else []
+    return table
+
 
 @objectfactory.Factory.register_class
 class Radar(Sensor):
@@ -52,11 +130,31 @@ class Radar(Sensor):
             parsed RadarFrame object
         """
         data = data[0]
-        json_raw = data.decode('utf8').replace("'", '"')
-        parsed_json = json.loads(json_raw)
+        parsed_json = codec.decode_relaxed(data)
+
+        frame = build_frame(RadarFrame, parsed_json)
+        frame.time = time
+        frame.game_time = game_time
+        frame.sensor_id = self.id
+
+        return frame
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from radar sensor in a frame that decodes the targets on
+        first access
 
-        frame = RadarFrame()
-        frame.deserialize(parsed_json)
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
+
+        Returns:
+            LazyRadarFrame object
+        """
+        frame = LazyRadarFrame()
+        frame._blocks = keep_blocks(data)
         frame.time = time
         frame.game_time = game_time
         frame.sensor_id = self.id
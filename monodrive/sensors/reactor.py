@@ -0,0 +1,278 @@
+"""reactor.py
+Single threaded ingestion engine that reads every sensor connection through
+one selector
+"""
+
+# lib
+import collections
+import queue
+import selectors
+import socket
+import struct
+import threading
+import traceback
+
+# src
+from monodrive.common.client import Client
+from monodrive.sensors.base_sensor import Sensor, SensorStream, HEADER_SIZE, POLL_TIMEOUT
+
+DEFAULT_PARSE_WORKERS = 2
+"""Default number of threads parsing complete frames for a reactor"""
+DEFAULT_WORKER_QUEUE_SIZE = 256
+"""Default number of received blocks a parse worker holds before the reactor
+stops reading the connections of its sensors"""
+
+
+class _Connection:
+    """Non-blocking framed reader for a single sensor connection"""
+
+    def __init__(self, client: Client, stream: SensorStream, worker):
+        self.client = client
+        self.stream = stream
+        self.worker = worker
+
+        # Complete blocks that did not fit in the queue of the worker
+        self.pending = collections.deque()
+
+        # The buffer currently being filled and how much of it has arrived
+        self.__header = bytearray(HEADER_SIZE)
+        self.__target = memoryview(self.__header)
+        self.__offset = 0
+        self.__fields = None
+
+    def on_readable(self):
+        """Read everything available on the connection.
+
+        Raises:
+            ConnectionError if the server closed the connection
+
+        Returns:
+            List of complete blocks as tuples of
+            (data, package_length, time, game_time, sample_count)
+        """
+        blocks = []
+        while True:
+            try:
+                received = self.client.read_some(self.__target[self.__offset:])
+            except BlockingIOError:
+                return blocks
+            if received == 0:
+                raise ConnectionError("connection closed by server")
+            self.__offset += received
+            if self.__offset < len(self.__target):
+                continue
+
+            if self.__fields is None:
+                # header complete, payload is received into a new buffer
+                # since it is handed off to a parse worker
+                length, t, game_time, sample_count = struct.unpack("!IIfI", self.__header)
+                package_length = length - HEADER_SIZE
+                self.__fields = (package_length, t, game_time, sample_count)
+                buffer = self.stream.sensor.allocate_block(package_length)
+                if buffer is None:
+                    buffer = bytearray(package_length)
+                self.__target = memoryview(buffer)[:package_length]
+                self.__offset = 0
+                if len(self.__target) > 0:
+                    continue
+
+            # payload complete
+            blocks.append((self.__target,) + self.__fields)
+
+            self.__target = memoryview(self.__header)
+            self.__offset = 0
+            self.__fields = None
+
+
+class _ParseWorker(threading.Thread):
+    """Thread parsing the blocks handed off by a reactor and publishing the
+    assembled frames"""
+
+    def __init__(self, size: int, wakeup):
+        """Constructor.
+
+        Args:
+            size(int): The number of blocks the worker queues
+            wakeup(func): Function waking the reactor once a full queue has
+            room again
+        """
+        super().__init__(daemon=True)
+        self.blocks = queue.Queue(size)
+        self.__wakeup = wakeup
+
+        # Set by the reactor when a connection waits for room in the queue
+        self.full = False
+
+    def run(self):
+        """Parse blocks until `None` is queued"""
+        while True:
+            item = self.blocks.get()
+            if self.full:
+                self.full = False
+                self.__wakeup()
+            if item is None:
+                break
+            stream, data, package_length, t, game_time, sample_count = item
+            try:
+                stream.on_block(data, package_length, t, game_time, sample_count)
+            except Exception as e:
+                print("{0}: exception {1}".format(stream.sensor.id, str(e)))
+                traceback.print_exc()
+
+
+class SensorReactor(threading.Thread):
+    """Thread that reads every sensor connection through one selector and
+    hands complete blocks to a fixed pool of parse workers.
+
+    The number of threads no longer grows with the number of sensors. Frames
+    of one sensor are always parsed by the same worker so they are assembled
+    and published in order.
+
+    The queue of each worker is bounded. While it is full the connections of
+    the worker's sensors are not read, which pushes back on the simulator
+    through TCP instead of buffering without limit. Sensors of the other
+    workers keep being read.
+    """
+
+    def __init__(self, host: str, parse_workers: int = DEFAULT_PARSE_WORKERS, verbose: bool = False,
+                 worker_queue_size: int = DEFAULT_WORKER_QUEUE_SIZE):
+        """Constructor.
+
+        Args:
+            host(str): The IP address of the simulator
+            parse_workers(int): The number of threads parsing frames
+            verbose(bool): Do verbose logging
+            worker_queue_size(int): The number of received blocks a parse
+            worker queues
+        """
+        super().__init__()
+        self.__host = host
+        self.__verbose = verbose
+        self.__selector = selectors.DefaultSelector()
+        self.__workers = [
+            _ParseWorker(max(1, worker_queue_size), self._wakeup)
+            for _ in range(max(1, parse_workers))
+        ]
+        self.__connections = []
+        self.__running = False
+
+        # Connections not read until their worker has room for their blocks
+        self.__paused = set()
+
+        # Socket pair used to wake the selector when the reactor is stopped
+        self.__wakeup_reader, self.__wakeup_writer = socket.socketpair()
+        self.__selector.register(self.__wakeup_reader, selectors.EVENT_READ)
+
+    def add_sensor(self, sensor: Sensor) -> SensorStream:
+        """Connect to a sensor and read its data on this reactor. All sensors
+        must be added before the reactor is started.
+
+        Args:
+            sensor(Sensor): The configured sensor
+
+        Returns:
+            The stream that publishes the sensor's frames
+        """
+        if self.__running:
+            raise RuntimeError("Sensors cannot be added to a running reactor")
+        stream = SensorStream(sensor, verbose=self.__verbose)
+        client = Client(self.__host, sensor.listen_port)
+        client.connect()
+        client.set_blocking(False)
+        worker = self.__workers[len(self.__connections) % len(self.__workers)]
+        connection = _Connection(client, stream, worker)
+        self.__selector.register(client, selectors.EVENT_READ, connection)
+        self.__connections.append(connection)
+        return stream
+
+    def start(self):
+        """Start reading all sensor connections"""
+        if self.__verbose:
+            print("Starting reactor for {0} sensors on {1}".format(
+                len(self.__connections), self.name
+            ))
+        self.__running = True
+        for worker in self.__workers:
+            worker.start()
+        super().start()
+
+    def stop(self):
+        """Stop reading, disconnect all sensors and stop the parse workers"""
+        self.__running = False
+        self.__wakeup_writer.send(b'\0')
+        self.join()
+        for connection in self.__connections:
+            connection.client.disconnect()
+            connection.stream.stop_queue()
+        for worker in self.__workers:
+            worker.blocks.put(None)
+        for worker in self.__workers:
+            worker.join()
+        for connection in self.__connections:
+            connection.stream.stop_parse_pool()
+        self.__selector.close()
+        self.__wakeup_reader.close()
+        self.__wakeup_writer.close()
+
+    def _wakeup(self):
+        """Wake the selector loop, called from the parse workers"""
+        try:
+            self.__wakeup_writer.send(b'\0')
+        except OSError:
+            pass
+
+    def _hand_off(self, connection: _Connection):
+        """Queue the pending blocks of a connection to its worker, pausing
+        reads of the connection while the worker is full
+
+        Args:
+            connection(_Connection): The connection
+        """
+        worker = connection.worker
+        while connection.pending:
+            item = (connection.stream,) + connection.pending[0]
+            try:
+                worker.blocks.put_nowait(item)
+            except queue.Full:
+                # ask for a wakeup, then retry in case the worker emptied
+                # its queue before it saw the request
+                worker.full = True
+                try:
+                    worker.blocks.put_nowait(item)
+                except queue.Full:
+                    if connection not in self.__paused:
+                        self.__selector.unregister(connection.client)
+                        self.__paused.add(connection)
+                    return
+            connection.pending.popleft()
+        if connection in self.__paused:
+            self.__paused.discard(connection)
+            self.__selector.register(connection.client, selectors.EVENT_READ, connection)
+
+    def run(self):
+        """Overwrite the base Thread run to start the selector loop"""
+        while self.__running:
+            for key, _ in self.__selector.select(POLL_TIMEOUT):
+                connection = key.data
+                if connection is None:
+                    self.__wakeup_reader.recv(4096)
+                    continue
+                try:
+                    blocks = connection.on_readable()
+                except Exception as e:
+                    if not self.__running:
+                        break
+                    print("{0}: exception {1}".format(connection.stream.sensor.id, str(e)))
+                    traceback.print_exc()
+                    self.__selector.unregister(connection.client)
+                    continue
+
+                connection.pending.extend(blocks)
+                self._hand_off(connection)
+
+            # resume the connections whose workers caught up
+            for connection in list(self.__paused):
+                self._hand_off(connection)
+
+        if self.__verbose:
+            print("Reactor: disconnected")
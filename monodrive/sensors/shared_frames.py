@@ -0,0 +1,228 @@
+"""
+Shared memory frame publishing for consumers in other processes
+
+Camera images and lidar point clouds are written into a ring of slots in a
+`multiprocessing.shared_memory` segment, and a small metadata message for
+each frame is sent over a `multiprocessing.Queue`. A consumer process maps
+the frames without copying them and releases each slot when it is done:
+
+    reader = SharedFrameReader(simulator.get_shared_frames('Camera_8000'))
+    frame = reader.get()
+    detect(frame.array)
+    frame.release()
+
+Requires Python 3.8 or later.
+"""
+
+# lib
+import multiprocessing
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+
+# src
+from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.camera import Camera, CameraFrame
+from monodrive.sensors.lidar import Lidar, LidarFrame, BLOCKS_PER_PACKET, CHANNELS_PER_BLOCK
+
+DEFAULT_SLOTS = 4
+"""Default number of frames a ring holds at once"""
+
+SLOT_FREE = 0
+SLOT_IN_USE = 1
+
+
+def shared_slot_size(sensor: Sensor):
+    """
+    Get the size of the slots needed to share the frames of a sensor
+
+    Args:
+        sensor: The configured sensor
+
+    Returns:
+        The slot size in bytes, None if frames of the sensor cannot be shared
+    """
+    if isinstance(sensor, Camera):
+        return int(sensor.stream_dimensions.y * sensor.stream_dimensions.x * 3)
+    if isinstance(sensor, Lidar):
+        points = sensor.blocks_per_frame * BLOCKS_PER_PACKET * CHANNELS_PER_BLOCK
+        return points * 4 * np.dtype(np.float32).itemsize
+    return None
+
+
+def _frame_array(frame: DataFrame):
+    """Get the array of a frame that is published to the ring"""
+    if isinstance(frame, CameraFrame):
+        return frame.image
+    if isinstance(frame, LidarFrame):
+        return frame.point_cloud
+    return None
+
+
+class SharedFrameRing:
+    """Producer side of a ring of shared memory frame slots for one sensor.
+
+    A frame is dropped, never waited for, when every slot is still held by
+    consumers.
+    """
+
+    def __init__(self, sensor_id: str, slot_size: int, slots: int = DEFAULT_SLOTS):
+        """Constructor.
+
+        Args:
+            sensor_id(str): The id of the sensor publishing to the ring
+            slot_size(int): The size, in bytes, of each slot
+            slots(int): The number of slots in the ring
+        """
+        self.__sensor_id = sensor_id
+        self.__slot_size = slot_size
+        self.__slots = slots
+        self.__data = shared_memory.SharedMemory(create=True, size=max(1, slot_size * slots))
+        self.__flags = shared_memory.SharedMemory(create=True, size=slots)
+        self.__states = np.ndarray((slots,), dtype=np.uint8, buffer=self.__flags.buf)
+        self.__states[:] = SLOT_FREE
+        self.__metadata = multiprocessing.Queue()
+        self.__next = 0
+        self.dropped = 0
+
+    @property
+    def handle(self):
+        """Get the picklable description of the ring that consumer processes
+        attach to with `SharedFrameReader`
+
+        Returns:
+            Tuple of the segment names, slot layout and metadata queue
+        """
+        return (
+            self.__data.name,
+            self.__flags.name,
+            self.__slot_size,
+            self.__slots,
+            self.__metadata
+        )
+
+    def publish(self, frame: DataFrame):
+        """Copy the array of a frame into a free slot and announce it to
+        consumers.
+
+        Args:
+            frame(DataFrame): The parsed camera or lidar frame
+
+        Returns:
+            True if the frame was published, False if it was dropped
+        """
+        array = _frame_array(frame)
+        if array is None or array.nbytes > self.__slot_size:
+            self.dropped += 1
+            return False
+
+        for i in range(self.__slots):
+            slot = (self.__next + i) % self.__slots
+            if self.__states[slot] == SLOT_FREE:
+                break
+        else:
+            self.dropped += 1
+            return False
+        self.__next = (slot + 1) % self.__slots
+
+        offset = slot * self.__slot_size
+        target = np.ndarray(array.shape, dtype=array.dtype, buffer=self.__data.buf, offset=offset)
+        target[...] = array
+        self.__states[slot] = SLOT_IN_USE
+        self.__metadata.put({
+            'sensor_id': self.__sensor_id,
+            'timestamp': getattr(frame, 'timestamp', None),
+            'game_time': frame.game_time,
+            'slot': slot,
+            'shape': array.shape,
+            'dtype': array.dtype.str
+        })
+        return True
+
+    def close(self):
+        """Release and destroy the shared memory segments"""
+        del self.__states
+        self.__metadata.close()
+        for segment in (self.__data, self.__flags):
+            segment.close()
+            segment.unlink()
+
+
+class SharedFrame:
+    """Frame mapped from a shared memory ring"""
+
+    def __init__(self, metadata: dict, array: np.ndarray, reader: 'SharedFrameReader'):
+        self.sensor_id = metadata['sensor_id']
+        self.timestamp = metadata['timestamp']
+        self.game_time = metadata['game_time']
+        self.slot = metadata['slot']
+        # view of the frame in shared memory
+        self.array = array
+        self.__reader = reader
+
+    def release(self):
+        """Return the slot to the producer. The array must not be used
+        afterwards."""
+        if self.__reader is not None:
+            self.__reader.release(self.slot)
+        self.__reader = None
+        self.array = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class SharedFrameReader:
+    """Consumer side of a shared memory frame ring"""
+
+    def __init__(self, handle):
+        """Constructor.
+
+        Args:
+            handle: The `SharedFrameRing.handle` of the ring to attach to
+        """
+        data_name, flags_name, slot_size, slots, metadata = handle
+        self.__slot_size = slot_size
+        self.__data = shared_memory.SharedMemory(name=data_name)
+        self.__flags = shared_memory.SharedMemory(name=flags_name)
+        self.__states = np.ndarray((slots,), dtype=np.uint8, buffer=self.__flags.buf)
+        self.__metadata = metadata
+
+    def get(self, timeout: float = None):
+        """Wait for the next frame published to the ring.
+
+        Args:
+            timeout(float): The time, in seconds, to wait. None waits forever.
+
+        Returns:
+            The next SharedFrame, None if the timeout expired
+        """
+        try:
+            metadata = self.__metadata.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        array = np.ndarray(
+            metadata['shape'],
+            dtype=np.dtype(metadata['dtype']),
+            buffer=self.__data.buf,
+            offset=metadata['slot'] * self.__slot_size
+        )
+        return SharedFrame(metadata, array, self)
+
+    def release(self, slot: int):
+        """Return a slot to the producer.
+
+        Args:
+            slot(int): The slot of a frame returned by `get`
+        """
+        self.__states[slot] = SLOT_FREE
+
+    def close(self):
+        """Detach from the shared memory segments. All frames must have been
+        released."""
+        del self.__states
+        self.__data.close()
+        self.__flags.close()
@@ -3,11 +3,13 @@ State sensor module for monoDrive simulator python client
 """
 
 # lib
-import json
+import numpy as np
 import objectfactory
 
 # src
+from monodrive.common import codec
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import build_frame, keep_blocks, lazy_json_frame
 
 
 @objectfactory.Factory.register_class
@@ -41,6 +43,68 @@ class StateFrameData(objectfactory.Serializable):
     vehicles = objectfactory.List(field_type=StateFrameVehicle)
 
 
+def _vector(value, keys):
+    """Get the components of a vector dictionary, NaN where missing"""
+    if not value:
+        return [np.nan] * len(keys)
+    return [value.get(k, np.nan) for k in keys]
+
+
+class StateFrameArrays:
+    """Odometry of a list of actors as arrays, one row per actor in the order
+    of the list"""
+
+    def __init__(self, states: [StateFrameObject]):
+        """Constructor.
+
+        Args:
+            states: The states of the actors
+        """
+        columns = np.full((len(states), 10), np.nan)
+        for i, state in enumerate(states):
+            odometry = state.odometry or {}
+            pose = odometry.get('pose') or {}
+            columns[i, 0:3] = _vector(pose.get('position'), 'xyz')
+            columns[i, 3:7] = _vector(pose.get('orientation'), 'xyzw')
+            columns[i, 7:10] = _vector(odometry.get('linear_velocity'), 'xyz')
+        # (N, 3) x, y, z positions
+        self.positions = columns[:, 0:3]
+        # (N, 4) x, y, z, w orientation quaternions
+        self.orientations = columns[:, 3:7]
+        # (N, 3) x, y, z linear velocities
+        self.velocities = columns[:, 7:10]
+
+
+class StateFrameIndex:
+    """Name and tag indexes of the actors of a state frame"""
+
+    def __init__(self, data: StateFrameData):
+        """Constructor.
+
+        Args:
+            data: The actors of the frame
+        """
+        self.vehicles = data.vehicles if data is not None else []
+        self.objects = data.objects if data is not None else []
+        self.vehicle_states = [v.state for v in self.vehicles]
+
+        self.vehicles_by_name = dict()
+        self.vehicles_by_tag = dict()
+        for vehicle, state in zip(self.vehicles, self.vehicle_states):
+            if state is None:
+                continue
+            self.vehicles_by_name.setdefault(state.name, vehicle)
+            for tag in state.tags or []:
+                self.vehicles_by_tag.setdefault(tag, []).append(vehicle)
+
+        self.objects_by_name = dict()
+        self.objects_by_tag = dict()
+        for obj in self.objects:
+            self.objects_by_name.setdefault(obj.name, obj)
+            for tag in obj.tags or []:
+                self.objects_by_tag.setdefault(tag, []).append(obj)
+
+
 @objectfactory.Factory.register_class
 class StateFrame(DataFrame, objectfactory.Serializable):
     sensor_id = objectfactory.Field()
@@ -49,6 +113,93 @@ class StateFrame(DataFrame, objectfactory.Serializable):
     sample_count = objectfactory.Field()
     frame = objectfactory.Nested(field_type=StateFrameData)
 
+    # indexes and arrays, built on first access since frames are not
+    # modified after they are parsed
+    _index = None
+    _vehicle_arrays = None
+    _object_arrays = None
+
+    def _get_index(self) -> StateFrameIndex:
+        """Get the name and tag indexes of this frame"""
+        if self._index is None:
+            self._index = StateFrameIndex(self.frame)
+        return self._index
+
+    @property
+    def ego(self) -> StateFrameVehicle:
+        """Get the ego vehicle
+
+        Returns:
+            The first vehicle tagged 'ego', None if there is none
+        """
+        vehicles = self._get_index().vehicles_by_tag.get('ego')
+        return vehicles[0] if vehicles else None
+
+    def get_vehicle(self, name: str) -> StateFrameVehicle:
+        """Get a vehicle by name
+
+        Args:
+            name: The name of the vehicle
+
+        Returns:
+            The vehicle, None if there is none with this name
+        """
+        return self._get_index().vehicles_by_name.get(name)
+
+    def get_object(self, name: str) -> StateFrameObject:
+        """Get an object by name
+
+        Args:
+            name: The name of the object
+
+        Returns:
+            The object, None if there is none with this name
+        """
+        return self._get_index().objects_by_name.get(name)
+
+    def get_vehicles_with_tag(self, tag: str) -> [StateFrameVehicle]:
+        """Get the vehicles that have a tag
+
+        Args:
+            tag: The tag, e.g. 'ego' or 'dynamic'
+
+        Returns:
+            The vehicles in frame order
+        """
+        return list(self._get_index().vehicles_by_tag.get(tag, []))
+
+    def get_objects_with_tag(self, tag: str) -> [StateFrameObject]:
+        """Get the objects that have a tag
+
+        Args:
+            tag: The tag
+
+        Returns:
+            The objects in frame order
+        """
+        return list(self._get_index().objects_by_tag.get(tag, []))
+
+    @property
+    def vehicle_arrays(self) -> StateFrameArrays:
+        """Get the positions, orientations and velocities of all vehicles as
+        arrays, one row per vehicle in the order of `frame.vehicles`"""
+        if self._vehicle_arrays is None:
+            self._vehicle_arrays = StateFrameArrays(self._get_index().vehicle_states)
+        return self._vehicle_arrays
+
+    @property
+    def object_arrays(self) -> StateFrameArrays:
+        """Get the positions, orientations and velocities of all objects as
+        arrays, one row per object in the order of `frame.objects`"""
+        if self._object_arrays is None:
+            self._object_arrays = StateFrameArrays(self._get_index().objects)
+        return self._object_arrays
+
+
+# state frame whose body is decoded on first access, the sample count is
+# set from the sensor header
+LazyStateFrame = lazy_json_frame(StateFrame, ['time', 'game_time', 'frame'])
+
 
 @objectfactory.Factory.register_class
 class State(Sensor):
@@ -68,9 +219,26 @@ class State(Sensor):
             parsed StateFrame object
         """
         data = data[0]
-        json_raw = data.decode('utf8').replace("'", '"')
-        parsed_json = json.loads(json_raw)
-        frame = StateFrame()
-        frame.deserialize(parsed_json)
+        parsed_json = codec.decode_relaxed(data)
+        frame = build_frame(StateFrame, parsed_json)
+        frame.sensor_id = self.id
+        return frame
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from state sensor in a frame that decodes the actors on
+        first access
+
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
+
+        Returns:
+            LazyStateFrame object
+        """
+        frame = LazyStateFrame()
+        frame._blocks = keep_blocks(data)
         frame.sensor_id = self.id
         return frame
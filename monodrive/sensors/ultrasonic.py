@@ -3,11 +3,12 @@ Ultrasonic sensor module for monoDrive simulator python client
 """
 
 # lib
-import json
 import objectfactory
 
 # src
+from monodrive.common import codec
 from monodrive.sensors import Sensor, DataFrame
+from monodrive.sensors.base_sensor import build_frame, keep_blocks, lazy_json_frame
 
 
 @objectfactory.Factory.register_class
@@ -23,6 +24,10 @@ class UltrasonicFrame(DataFrame, objectfactory.Serializable):
     targets = objectfactory.List(field_type=UltrasonicFrameTarget)
 
 
+# ultrasonic frame whose targets are decoded on first access
+LazyUltrasonicFrame = lazy_json_frame(UltrasonicFrame, ['targets'])
+
+
 @objectfactory.Factory.register_class
 class Ultrasonic(Sensor):
     """Ultrasonic sensor"""
@@ -48,13 +53,37 @@ class Ultrasonic(Sensor):
         """
         data = data[0]
 
-        frame = UltrasonicFrame()
-
         if self.send_processed_data:
-            json_raw = data.decode('utf8').replace("'", '"')
-            parsed_json = json.loads(json_raw)
-            frame.deserialize(parsed_json)
+            parsed_json = codec.decode_relaxed(data)
+            frame = build_frame(UltrasonicFrame, parsed_json)
+        else:
+            frame = UltrasonicFrame()
+
+        frame.time = time
+        frame.game_time = game_time
+        frame.sensor_id = self.id
+
+        return frame
+
+    def parse_lazy(self, data: [bytes], package_length: int, time: int, game_time: int) -> DataFrame:
+        """
+        Wrap data from ultrasonic sensor in a frame that decodes the targets on
+        first access
+
+        Args:
+            data:
+            package_length:
+            time:
+            game_time:
+
+        Returns:
+            LazyUltrasonicFrame object
+        """
+        if not self.send_processed_data:
+            return self.parse(data, package_length, time, game_time)
 
+        frame = LazyUltrasonicFrame()
+        frame._blocks = keep_blocks(data)
         frame.time = time
         frame.game_time = game_time
         frame.sensor_id = self.id
@@ -1,4 +1,6 @@
 """
 Simulator module for monoDrive simulator python client
 """
-from .simulator import Simulator
+from .simulator import Simulator, Mode, Ingestion
+from .async_simulator import AsyncSimulator
+from .synchronizer import FrameSynchronizer, FrameBundle, SyncKey, Partial
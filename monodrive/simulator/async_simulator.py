@@ -0,0 +1,276 @@
+"""async_simulator.py
+asyncio equivalent of the simulator driver.
+"""
+
+# lib
+import asyncio
+import objectfactory
+
+# src
+from monodrive.common.async_client import AsyncClient
+from monodrive.sensors.async_stream import AsyncSensorStream
+from monodrive.sensors.frame_queue import QueuePolicy, DEFAULT_QUEUE_SIZE
+from monodrive.simulator.base_simulator import BaseSimulator, Mode, STEP_TEMPLATE, CONTROL_TEMPLATE, SAMPLE_TEMPLATE
+import monodrive.common.messaging as mmsg
+
+
+class AsyncSimulator(BaseSimulator):
+    """Simulator driver that connects and reads all sensors on the ego
+    vehicle from an asyncio event loop.
+
+    Commands are coroutines and sensor output is available as async
+    iterators:
+
+        await sim.start()
+        frames = sim.sensor_stream('Camera_8000')
+        await sim.step()
+        frame = await frames.__anext__()
+    """
+
+    def __init__(
+            self,
+            config,
+            scenario=None,
+            sensors=None,
+            weather=None,
+            ego=None,
+            verbose=False,
+            parse_executor=None
+    ):
+        """Constructor.
+
+        Args:
+            config(dict): The configuration JSON for this simulator instance
+            scenario(dict): The configuration JSON for the trajectory to replay
+            in Modes.MODE_REPLAY
+            sensors(dict): The configuration JSON for the suite of sensors for
+            this simulator instance.
+            weather(dict): The configuration JSON for weather conditions
+            ego(dict): The configuration JSON for the ego vehicle
+            verbose(bool):
+            parse_executor(concurrent.futures.Executor): The executor sensor
+            frames are parsed on, None to parse them on the event loop
+        """
+        super().__init__(config, scenario, sensors, weather, ego)
+        self.__config = config
+        self.__sensor_config = sensors
+        self.__verbose = verbose
+        self.__parse_executor = parse_executor
+        self.__sensors = dict()
+        self.__client = AsyncClient(config['server_ip'], config['server_port'])
+        self.__running = False
+        # Only one command may be in flight on the control connection, the
+        # lock is created on first use so it belongs to the running loop
+        self.__command_lock = None
+
+    async def configure(self):
+        """Configure the server with the current simulator settings"""
+        for message in self._configure_messages():
+            res = await self.send_command(message)
+            if self.__verbose:
+                print(res)
+
+    async def configure_weather(self, config, set_profile=None):
+        """Configure the weather from JSON representation.
+
+        Args:
+            config(dict): The configuration JSON to send to the server
+            set_profile(str): The profile id to be set
+
+        Returns:
+            The response message from the simulator for this configuration.
+        """
+        return await self.send_command(self._weather_message(config, set_profile))
+
+    async def configure_scenario(self, config):
+        """Configure the scenario from JSON representation.
+
+        Args:
+            config(dict): The scenario configuration to send to the server
+
+        Returns:
+            The response message from the simulator for this configuration.
+        """
+        return await self.send_command(self._scenario_message(config))
+
+    async def configure_sensors(self, config):
+        """Configure the sensor suite from JSON representation.
+
+        Args:
+            config(dict): The sensor config JSON to send to the server
+
+        Returns:
+            The response message from the simulator for this configuration.
+        """
+        return await self.send_command(self._sensors_message(config))
+
+    async def start(self, start_listening=True, initial_controls=(0, 0, 0, 1)):
+        """
+        Start the simulation
+
+        Args:
+            start_listening(bool): begin sensor streams for listening
+            initial_controls(tuple): initial controls to send if
+              closed loop mode. set None to skip.
+        """
+        self.__running = True
+        await self.configure()
+        if self.mode == Mode.MODE_CLOSED_LOOP.value and initial_controls is not None:
+            res = await self.send_control(*initial_controls)
+            if self.__verbose:
+                print(res)
+        if start_listening:
+            await self.start_sensor_listening()
+
+    async def step(self, steps=1):
+        """Step the simulation the specified number of steps.
+
+        Args:
+            steps(int): The number of steps to move the simulation
+
+        Raises:
+            Exception if the simulator is not currently running
+
+        Returns:
+            dict: The response message from the simulator
+        """
+        if not self.__running:
+            raise Exception("Simulator is not running")
+
+        return await self.send_command(STEP_TEMPLATE.message(steps))
+
+    async def send_state(self, frame):
+        """Set the state of the simulator and step
+
+        Args:
+            frame(dict): The desired state of the simulator
+
+        Raises:
+            Exception if the simulator is not currently running
+
+        Returns:
+            dict: The response message from the simulator
+        """
+        if not self.__running:
+            raise Exception("Simulator is not running")
+
+        return await self.send_command(self._state_message(frame))
+
+    async def stop(self):
+        """Stop the simulation and all attached sensors."""
+        for sensor_id in self.__sensors.keys():
+            await self.__sensors[sensor_id].stop()
+        await self.__client.disconnect()
+        self.__running = False
+
+    async def send_command(self, command):
+        """Send the command to the connected simulator client.
+
+        Args:
+            command(ApiMessage): The command to send to the server.
+
+        Returns:
+            dict: The command response message from the simulator
+        """
+        if self.__command_lock is None:
+            self.__command_lock = asyncio.Lock()
+        async with self.__command_lock:
+            if not self.__client.connected:
+                await self.__client.connect()
+            await self.__client.write(command.encode())
+            return await mmsg.ApiMessage.read_async(self.__client)
+
+    async def start_sensor_listening(self):
+        """Start all sensors"""
+        for sc in self.__sensor_config:
+            sc['_type'] = sc['type']
+            sensor = objectfactory.Factory.create_object(sc)
+            sensor.configure()
+            if not sensor.enable_streaming:
+                continue
+            stream = AsyncSensorStream(
+                self.__config['server_ip'],
+                sensor,
+                verbose=self.__verbose,
+                executor=self.__parse_executor
+            )
+            await stream.start()
+            self.__sensors[sensor.id] = stream
+
+    @property
+    def sensors_ids(self):
+        """Get the current list of all sensor ids.
+
+        Returns:
+            The list of all sensor ids.
+        """
+        return self.__sensors.keys()
+
+    def sensor_stream(self, uid, size=DEFAULT_QUEUE_SIZE, policy=QueuePolicy.BLOCK):
+        """Get an async iterator over a single sensor's data output. Frames
+        published after this call are delivered even if iteration starts
+        later.
+
+        Args:
+            uid(str): The uid of the sensor to iterate
+            size(int): The number of frames the iterator queues
+            policy(QueuePolicy): What to do with a new frame when the queue
+            is full, BLOCK holds back the sensor until the iterator catches up
+
+        Returns:
+            Async iterator of parsed frames
+        """
+        return self.__sensors[uid].frames(size, policy)
+
+    def subscribe_to_sensor(self, uid, callback):
+        """Subscribe to a single sensor's data ouput in the simulator. The
+        callback is called on the event loop thread.
+
+        Args:
+            uid(str): The uid of the sensor to subscribe to.
+            callback(func): The function that will be called when the sensor's
+            data arrives. Should be of the format:
+                def my_callback(data):
+        """
+        self.__sensors[uid].subscribe(callback)
+
+    def get_sensor(self, uid):
+        """Get copy of a single sensor configuration by uid
+
+        Args:
+            uid(str): The uid of the sensor
+
+        Returns:
+            Sensor object
+        """
+        return self.__sensors[uid].get_sensor()
+
+    async def send_control(self, forward: float, right: float, brake: float = 0.0, mode: int = 1):
+        """Send controls to ego vehicle
+
+        Args:
+            forward:
+            right:
+            brake:
+            mode:
+
+        Returns:
+            dict: The command response message from the simulator
+        """
+        message = CONTROL_TEMPLATE.message(forward, right, brake, mode)
+        return await self.send_command(message)
+
+    async def sample_sensors(self):
+        """Send command to sample all sensors
+
+        Raises:
+            Exception if the simulator is not currently running
+
+        Returns:
+            dict: The command response message from the simulator
+        """
+        if not self.__running:
+            raise Exception("Simulator is not running")
+
+        message = SAMPLE_TEMPLATE.message()
+        return await self.send_command(message)
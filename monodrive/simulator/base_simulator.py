@@ -0,0 +1,237 @@
+"""base_simulator.py
+Settings and command messages shared by the simulator drivers.
+"""
+
+# lib
+import json
+from enum import Enum
+
+# src
+import monodrive.common.messaging as mmsg
+
+
+# Templates of the commands sent on every simulation tick
+STEP_TEMPLATE = mmsg.MessageTemplate(
+    mmsg.ID_REPLAY_STEP_SIMULATION_COMMAND,
+    [u'amount']
+)
+CONTROL_TEMPLATE = mmsg.MessageTemplate(
+    mmsg.ID_EGO_CONTROL,
+    [u'forward_amount', u'right_amount', u'brake_amount', u'drive_mode']
+)
+SAMPLE_TEMPLATE = mmsg.MessageTemplate(
+    mmsg.ID_SAMPLE_SENSORS_COMMAND,
+    []
+)
+
+
+class Mode(Enum):
+    """Enumeration of all simulator modes"""
+    # Closed loop control of the ego vehicle
+    MODE_CLOSED_LOOP = 0
+    # Replay of recorded trajectory
+    MODE_REPLAY = 1
+    # PXI mode
+    MODE_PXI = 2
+
+
+class BaseSimulator:
+    """Base class of the simulator drivers, which holds the simulation
+    settings and builds the messages that configure the server. The drivers
+    only differ in how the messages are sent and sensors are read."""
+
+    def __init__(
+            self,
+            config,
+            scenario=None,
+            sensors=None,
+            weather=None,
+            ego=None
+    ):
+        """Constructor.
+
+        Args:
+            config(dict): The configuration JSON for this simulator instance
+            scenario(dict): The configuration JSON for the trajectory to replay
+            in Modes.MODE_REPLAY
+            sensors(dict): The configuration JSON for the suite of sensors for
+            this simulator instance.
+            weather(dict): The configuration JSON for weather conditions
+            ego(dict): The configuration JSON for the ego vehicle
+        """
+        self.__config = config
+        self.__scenario = scenario
+        self.__sensor_config = sensors
+        self.__weather = weather
+        self.__ego = ego
+
+    @property
+    def mode(self):
+        """Get the current simulation mode.
+
+        Returns:
+            The current `Mode` that the
+        """
+        return self.__config['simulation_mode']
+
+    @mode.setter
+    def mode(self, mode):
+        """Change the current simulation mode.
+
+        Args:
+            mode(Enum): One of the `Mode` to switch to.
+            """
+        self.__config['simulation_mode'] = mode
+
+    @property
+    def map(self):
+        """Get the current simulator map name
+
+        Returns:
+            str: simulator map name
+        """
+        return self.__config['map']
+
+    @map.setter
+    def map(self, map_name):
+        """Set the simulator config map name
+
+        Args:
+            map_name(str): new simulator config map name
+        """
+        self.__config['map'] = map_name
+
+    @property
+    def num_steps(self):
+        """Get number of steps in trajectory"""
+        if self.mode == Mode.MODE_CLOSED_LOOP.value:
+            return 0
+        if self.__scenario is None:
+            return 0
+        return len(self.__scenario)
+
+    def _configure_messages(self):
+        """Build the messages that configure the server with the current
+        simulator settings, in the order they are sent
+
+        Returns:
+            [ApiMessage] of the simulator config followed by the scenario,
+            sensor and weather configs that are set
+        """
+        # include vehicle config if available
+        if self.__ego:
+            self.__config['ego_config'] = self.__ego
+
+        messages = [mmsg.ApiMessage(mmsg.ID_SIMULATOR_CONFIG, self.__config)]
+        if self.__scenario:
+            messages.append(self._scenario_message(self.__scenario))
+        if self.__sensor_config:
+            messages.append(self._sensors_message(self.__sensor_config))
+        if self.__weather:
+            messages.append(self._weather_message(self.__weather))
+        return messages
+
+    @staticmethod
+    def _weather_message(config, set_profile=None):
+        """Build the message that configures the weather
+
+        Args:
+            config(dict): The weather configuration JSON
+            set_profile(str): The profile id to be set
+
+        Returns:
+            ApiMessage of the weather config
+        """
+        if set_profile:
+            config['set_profile'] = set_profile
+        return mmsg.ApiMessage(
+            mmsg.ID_WEATHER_CONFIG_COMMAND,
+            config
+        )
+
+    def _scenario_message(self, config):
+        """Build the message that configures the scenario of the current
+        mode
+
+        Args:
+            config(dict): The scenario configuration JSON
+
+        Returns:
+            ApiMessage of the closed loop or replay trajectory config
+        """
+        if self.mode == Mode.MODE_CLOSED_LOOP.value:
+            return mmsg.ApiMessage(
+                mmsg.ID_CLOSED_LOOP_CONFIG_COMMAND,
+                config
+            )
+        return mmsg.ApiMessage(
+            mmsg.ID_REPLAY_CONFIGURE_TRAJECTORY_COMMAND,
+            config
+        )
+
+    @staticmethod
+    def _sensors_message(config):
+        """Build the message that configures the sensor suite
+
+        Args:
+            config(dict): The sensor config JSON
+
+        Returns:
+            ApiMessage of the sensor config
+        """
+        return mmsg.ApiMessage(
+            mmsg.ID_REPLAY_CONFIGURE_SENSORS_COMMAND,
+            config
+        )
+
+    @staticmethod
+    def _state_message(frame):
+        """Build the message that sets the state of the simulator and steps
+
+        Args:
+            frame(dict): The desired state of the simulator
+
+        Returns:
+            ApiMessage of the state
+        """
+        return mmsg.ApiMessage(
+            mmsg.ID_REPLAY_STATE_SIMULATION_COMMAND,
+            frame
+        )
+
+    @classmethod
+    def from_file(
+            cls,
+            simulator: str,
+            scenario: str = None,
+            sensors: str = None,
+            weather: str = None,
+            ego: str = None,
+            **kwargs
+    ):
+        """Helper method to construct simulator object from config file paths
+
+        Args:
+            simulator(str): Path of the simulator configuration
+            scenario(str): Path of the scenario configuration
+            sensors(str): Path of the sensor configuration
+            weather(str): Path of the weather configuration
+            ego(str): Path of the ego vehicle configuration
+            **kwargs: The other arguments of the driver's constructor, e.g.
+            verbose
+
+        Returns:
+            The simulator driver
+        """
+        configs = {}
+        for name, path in [
+            ('config', simulator),
+            ('scenario', scenario),
+            ('sensors', sensors),
+            ('weather', weather),
+            ('ego', ego)
+        ]:
+            if path:
+                with open(path) as file:
+                    configs[name] = json.load(file)
+        return cls(**configs, **kwargs)
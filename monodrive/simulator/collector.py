@@ -0,0 +1,105 @@
+"""collector.py
+Collects the frames of a set of sensors produced by a single simulator step.
+"""
+
+# lib
+import threading
+
+
+class FrameCollector:
+    """Waits for the next frame of every sensor in a set.
+
+    The collector is armed with the sensors to wait for before the command
+    that triggers them is sent, then `wait` blocks on a condition variable
+    until each of them has delivered a frame.
+
+    Each sensor only has frames with a sample count above the largest one
+    it delivered before the collector was armed collected, so a late frame
+    of an earlier step does not complete the current one. The sample counts
+    of different sensors are not compared, they need not move in lockstep.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__expected = set()
+        self.__frames = dict()
+
+        # The largest sample count delivered by each sensor, and the ones
+        # when the collector was armed, keyed by sensor id
+        self.__latest = dict()
+        self.__armed_at = dict()
+
+    def arm(self, sensor_ids):
+        """Start collecting the next frame of each sensor
+
+        Args:
+            sensor_ids([str]): The ids of the sensors to wait for
+        """
+        with self.__condition:
+            self.__expected = set(sensor_ids)
+            self.__frames = dict()
+            self.__armed_at = dict(self.__latest)
+
+    def reset(self, sensor_id=None):
+        """Forget the sample counts delivered so far, e.g. when the sensors
+        are restarted or reconfigured and their sample counts start over
+
+        Args:
+            sensor_id(str): The sensor to forget the sample count of, None
+            for all sensors
+        """
+        with self.__condition:
+            if sensor_id is None:
+                self.__latest = dict()
+                self.__armed_at = dict()
+            else:
+                self.__latest.pop(sensor_id, None)
+                self.__armed_at.pop(sensor_id, None)
+
+    def on_frame(self, sensor_id, frame):
+        """Record a delivered frame, called from the sensor threads
+
+        Args:
+            sensor_id(str): The id of the sensor that produced the frame
+            frame(DataFrame): The frame
+        """
+        sample_count = getattr(frame, 'sample_count', None)
+        with self.__condition:
+            if sample_count is not None:
+                latest = self.__latest.get(sensor_id)
+                if latest is None or sample_count > latest:
+                    self.__latest[sensor_id] = sample_count
+                armed_at = self.__armed_at.get(sensor_id)
+                if armed_at is not None and sample_count <= armed_at:
+                    # late frame of an earlier step
+                    return
+            if sensor_id not in self.__expected or sensor_id in self.__frames:
+                return
+            self.__frames[sensor_id] = frame
+            if len(self.__frames) == len(self.__expected):
+                self.__condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until every armed sensor has delivered a frame
+
+        Args:
+            timeout(float): The time, in seconds, to wait. None waits forever.
+
+        Raises:
+            TimeoutError if some sensors did not deliver a frame in time
+
+        Returns:
+            dict: The frames keyed by sensor id
+        """
+        with self.__condition:
+            complete = self.__condition.wait_for(
+                lambda: len(self.__frames) == len(self.__expected),
+                timeout
+            )
+            missing = self.__expected.difference(self.__frames)
+            frames = self.__frames
+            self.__expected = set()
+            self.__frames = dict()
+        if not complete:
+            raise TimeoutError('No frame received from: {}'.format(', '.join(sorted(missing))))
+        return frames
@@ -3,27 +3,30 @@ A simple simulator that will read all sensor values from the connected sensors.
 """
 
 # lib
-import json
+import traceback
 from enum import Enum
 import objectfactory
 
 # src
 from monodrive.common.client import Client
-from monodrive.sensors import SensorThread
+from monodrive.common.command_channel import CommandChannel
+from monodrive.sensors import SensorThread, SensorReactor, QueuePolicy, ParseExecutor
+from monodrive.sensors.parse_pool import create_parse_pool
+from monodrive.simulator.base_simulator import BaseSimulator, Mode, STEP_TEMPLATE, CONTROL_TEMPLATE, SAMPLE_TEMPLATE
+from monodrive.simulator.collector import FrameCollector
+from monodrive.simulator.synchronizer import FrameSynchronizer, SyncKey, Partial
 import monodrive.common.messaging as mmsg
 
 
-class Mode(Enum):
-    """Enumeration of all simulator modes"""
-    # Closed loop control of the ego vehicle
-    MODE_CLOSED_LOOP = 0
-    # Replay of recorded trajectory
-    MODE_REPLAY = 1
-    # PXI mode
-    MODE_PXI = 2
+class Ingestion(Enum):
+    """Enumeration of the engines that receive sensor data"""
+    # One thread and connection loop per sensor
+    THREADS = 'threads'
+    # One selector thread for every sensor plus a pool of parse workers
+    REACTOR = 'reactor'
 
 
-class Simulator:
+class Simulator(BaseSimulator):
     """Simulator driver that will connect and read all sensors on the
     ego vehicle."""
 
@@ -34,7 +37,14 @@ class Simulator:
             sensors=None,
             weather=None,
             ego=None,
-            verbose=False
+            verbose=False,
+            ingestion=Ingestion.THREADS,
+            shared_frames=False,
+            queue_size=None,
+            queue_policy=QueuePolicy.BLOCK,
+            parse_executors=None,
+            parse_processes=None,
+            lazy_frames=False
     ):
         """Constructor.
 
@@ -47,78 +57,64 @@ class Simulator:
             weather(dict): The configuration JSON for weather conditions
             ego(dict): The configuration JSON for the ego vehicle
             verbose(bool):
+            ingestion(Ingestion): The engine used to receive sensor data
+            shared_frames(bool): Also publish camera and lidar frames to
+            shared memory rings for consumers in other processes, see
+            `get_shared_frames`
+            queue_size(int): Deliver the frames of each sensor from its own
+            thread through a queue of this many frames, see
+            `get_frame_queue`. None delivers them on the receiving thread.
+            queue_policy(QueuePolicy): What a full frame queue does with a
+            new frame
+            parse_executors(dict): The ParseExecutor for each sensor type
+            that is not parsed inline, e.g. {'Lidar': ParseExecutor.PROCESS}.
+            Camera frames cannot be parsed in worker processes.
+            parse_processes(int): The number of worker processes parsing
+            frames, the number of CPUs by default
+            lazy_frames(bool): Deliver frames that decode their field groups,
+            e.g. the image or the points, on first access. Frames parsed in
+            worker processes are parsed eagerly.
+
+        Raises:
+            ValueError if a sensor type parsed in worker processes is
+            unknown or its frames cannot be parsed there
         """
+        super().__init__(config, scenario, sensors, weather, ego)
         self.__config = config
-        self.__scenario = scenario
         self.__sensor_config = sensors
-        self.__weather = weather
-        self.__ego = ego
         self.__verbose = verbose
         self.__sensors = dict()
         self.__client = Client(config['server_ip'], config['server_port'])
+        self.__channel = CommandChannel(self.__client, verbose=verbose)
         self.__running = False
-
-    @property
-    def mode(self):
-        """Get the current simulation mode.
-
-        Returns:
-            The current `Mode` that the
-        """
-        return self.__config['simulation_mode']
-
-    @mode.setter
-    def mode(self, mode):
-        """Change the current simulation mode.
-
-        Args:
-            mode(Enum): One of the `Mode` to switch to.
-            """
-        self.__config['simulation_mode'] = mode
-
-    @property
-    def map(self):
-        """Get the current simulator map name
-
-        Returns:
-            str: simulator map name
-        """
-        return self.__config['map']
-
-    @map.setter
-    def map(self, map_name):
-        """Set the simulator config map name
-
-        Args:
-            map_name(str): new simulator config map name
-        """
-        self.__config['map'] = map_name
+        self.__ingestion = Ingestion(ingestion)
+        self.__reactor = None
+        self.__shared_frames = shared_frames
+        self.__shared_rings = dict()
+        self.__queue_size = queue_size
+        self.__queue_policy = QueuePolicy(queue_policy)
+        self.__parse_executors = {
+            sensor_type: ParseExecutor(executor)
+            for sensor_type, executor in (parse_executors or {}).items()
+        }
+        for sensor_type, executor in self.__parse_executors.items():
+            if executor != ParseExecutor.PROCESS:
+                continue
+            sensor_class = objectfactory.Factory.registry.get(sensor_type)
+            if sensor_class is None:
+                raise ValueError('Unknown sensor type: {}'.format(sensor_type))
+            if not sensor_class.parse_in_process:
+                raise ValueError('Frames of {} sensors cannot be parsed in worker processes'.format(sensor_type))
+        self.__parse_processes = parse_processes
+        self.__parse_pool = None
+        self.__lazy_frames = lazy_frames
+        self.__collector = FrameCollector()
+        self.__synchronizers = []
 
     def configure(self):
         """Configure the server with the current simulator settings"""
-
-        # include vehicle config if available
-        if self.__ego:
-            self.__config['ego_config'] = self.__ego
-
-        # do simulator config
-        res = self.send_command(
-            mmsg.ApiMessage(mmsg.ID_SIMULATOR_CONFIG, self.__config)
-        )
-        if self.__verbose:
-            print(res)
-
-        # configure other options if set
-        if self.__scenario:
-            res = self.configure_scenario(self.__scenario)
-            if self.__verbose:
-                print(res)
-        if self.__sensor_config:
-            res = self.configure_sensors(self.__sensor_config)
-            if self.__verbose:
-                print(res)
-        if self.__weather:
-            res = self.configure_weather(self.__weather)
+        for message in self._configure_messages():
+            res = self.send_command(message)
             if self.__verbose:
                 print(res)
 
@@ -132,13 +128,7 @@ class Simulator:
         Returns:
             The response message from the simulator for this configuration.
         """
-        if set_profile:
-            config['set_profile'] = set_profile
-        message = mmsg.ApiMessage(
-            mmsg.ID_WEATHER_CONFIG_COMMAND,
-            config
-        )
-        return self.send_command(message)
+        return self.send_command(self._weather_message(config, set_profile))
 
     def configure_scenario(self, config):
         """Configure the scenario from JSON representation.
@@ -149,17 +139,7 @@ class Simulator:
         Returns:
             The response message from the simulator for this configuration.
         """
-        if self.mode == Mode.MODE_CLOSED_LOOP.value:
-            message = mmsg.ApiMessage(
-                mmsg.ID_CLOSED_LOOP_CONFIG_COMMAND,
-                config
-            )
-        else:
-            message = mmsg.ApiMessage(
-                mmsg.ID_REPLAY_CONFIGURE_TRAJECTORY_COMMAND,
-                config
-            )
-        return self.send_command(message)
+        return self.send_command(self._scenario_message(config))
 
     def configure_sensors(self, config):
         """Configure the sensor suite from JSON representation.
@@ -170,11 +150,7 @@ class Simulator:
         Returns:
             The response message from the simulator for this configuration.
         """
-        message = mmsg.ApiMessage(
-            mmsg.ID_REPLAY_CONFIGURE_SENSORS_COMMAND,
-            config
-        )
-        return self.send_command(message)
+        return self.send_command(self._sensors_message(config))
 
     def reconfigure_sensor(self, config):
         """Re-Configure the sensor included in the config file.
@@ -202,6 +178,8 @@ class Simulator:
                 )
 
             self.__sensors[sensor.id].set_sensor(sensor)
+            # the sensor may count its samples from the start again
+            self.__collector.reset(sensor.id)
 
         message = mmsg.ApiMessage(
             mmsg.ID_REPLAY_RECONFIGURE_SENSOR_COMMAND,
@@ -242,14 +220,29 @@ class Simulator:
         if not self.__running:
             raise Exception("Simulator is not running")
 
-        response = self.send_command(
-            mmsg.ApiMessage(
-                mmsg.ID_REPLAY_STEP_SIMULATION_COMMAND,
-                {u'amount': steps}
-            )
-        )
+        response = self.send_command(STEP_TEMPLATE.message(steps))
         return response
 
+    def step_and_collect(self, steps=1, sensor_ids=None, timeout=None):
+        """Step the simulation and block until every streaming sensor has
+        delivered its frame for the step to all subscribers.
+
+        Args:
+            steps(int): The number of steps to move the simulation
+            sensor_ids([str]): The sensors to wait for, all streaming
+            sensors by default
+            timeout(float): The time, in seconds, to wait for the frames.
+            None waits forever.
+
+        Raises:
+            Exception if the simulator is not currently running
+            TimeoutError if a sensor did not deliver a frame in time
+
+        Returns:
+            dict: The frames keyed by sensor id
+        """
+        return self._collect(lambda: self.step(steps), sensor_ids, timeout)
+
     def send_state(self, frame):
         """Set the state of the simulator and step
 
@@ -265,17 +258,51 @@ class Simulator:
         if not self.__running:
             raise Exception("Simulator is not running")
 
-        message = mmsg.ApiMessage(
-            mmsg.ID_REPLAY_STATE_SIMULATION_COMMAND,
-            frame
-        )
-        return self.send_command(message)
+        return self.send_command(self._state_message(frame))
+
+    def send_state_and_collect(self, frame, sensor_ids=None, timeout=None):
+        """Set the state of the simulator, step and block until every
+        streaming sensor has delivered its frame for the step to all
+        subscribers.
+
+        Args:
+            frame(dict): The desired state of the simulator
+            sensor_ids([str]): The sensors to wait for, all streaming
+            sensors by default
+            timeout(float): The time, in seconds, to wait for the frames.
+            None waits forever.
+
+        Raises:
+            Exception if the simulator is not currently running
+            TimeoutError if a sensor did not deliver a frame in time
+
+        Returns:
+            dict: The frames keyed by sensor id
+        """
+        return self._collect(lambda: self.send_state(frame), sensor_ids, timeout)
 
     def stop(self):
         """Stop the simulation and all attached sensors."""
-        for sensor_id in self.__sensors.keys():
-            self.__sensors[sensor_id].stop()
-        self.__client.disconnect()
+        if self.__reactor is not None:
+            self.__reactor.stop()
+            self.__reactor = None
+        else:
+            for sensor_id in self.__sensors.keys():
+                try:
+                    self.__sensors[sensor_id].stop()
+                except Exception as e:
+                    print("{0}: failed to stop {1}".format(sensor_id, str(e)))
+                    traceback.print_exc()
+        if self.__parse_pool is not None:
+            self.__parse_pool.shutdown()
+            self.__parse_pool = None
+        for ring in self.__shared_rings.values():
+            ring.close()
+        self.__shared_rings = dict()
+        for synchronizer in self.__synchronizers:
+            synchronizer.close()
+        self.__synchronizers = []
+        self.__channel.close()
         self.__running = False
 
     def send_command(self, command):
@@ -287,26 +314,193 @@ class Simulator:
         Returns:
             dict: The command response message from the simulator
         """
-        if not self.__client.connected:
-            self.__client.connect()
-        command.write(self.__client)
-        return command.read(self.__client)
+        return self.submit_command(command).result()
+
+    def send_commands(self, commands):
+        """Send several commands to the connected simulator client with a
+        single write, e.g. a control command followed by a sample command,
+        and wait for all of their responses.
+
+        Args:
+            commands([ApiMessage]): The commands to send to the server.
+
+        Returns:
+            [dict]: The command response messages from the simulator, in the
+            order of `commands`
+        """
+        futures = self.__channel.submit_all(commands)
+        return [future.result() for future in futures]
+
+    def submit_command(self, command):
+        """Send the command to the connected simulator client without
+        waiting for the response, so several commands can be in flight at
+        once:
+
+            control = simulator.submit_command(control_message)
+            sample = simulator.submit_command(sample_message)
+            control.result(), sample.result()
+
+        Args:
+            command(ApiMessage): The command to send to the server.
+
+        Returns:
+            Future resolved with the command response message dictionary
+        """
+        return self.__channel.submit(command)
 
     def start_sensor_listening(self):
         """Start all sensors"""
+        self.__collector.reset()
+        if self.__ingestion == Ingestion.REACTOR:
+            self.__reactor = SensorReactor(
+                self.__config['server_ip'],
+                verbose=self.__verbose
+            )
+
+        # the streams started, and those parsing frames in worker processes
+        streams = []
+        pooled = []
         for sc in self.__sensor_config:
             sc['_type'] = sc['type']
             sensor = objectfactory.Factory.create_object(sc)
             sensor.configure()
             if not sensor.enable_streaming:
                 continue
-            sensor_thread = SensorThread(
-                self.__config['server_ip'],
-                sensor,
-                verbose=self.__verbose
+            executor = self.__parse_executors.get(sensor.sensor_type, ParseExecutor.INLINE)
+            if self.__reactor is not None:
+                stream = self.__reactor.add_sensor(sensor)
+            else:
+                stream = SensorThread(
+                    self.__config['server_ip'],
+                    sensor,
+                    verbose=self.__verbose
+                )
+            if self.__shared_frames:
+                stream.shared_ring = self._create_shared_ring(sensor)
+            stream.on_delivered = lambda frame, uid=sensor.id: self._on_frame(uid, frame)
+            if self.__queue_size is not None:
+                stream.start_queue(self.__queue_size, self.__queue_policy)
+            if executor == ParseExecutor.PROCESS:
+                pooled.append(stream)
+            else:
+                stream.lazy_frames = self.__lazy_frames
+            streams.append(stream)
+            self.__sensors[sensor.id] = stream
+
+        if pooled:
+            # the pool gets the sensors once, so it is created after all
+            # of them are configured
+            self.__parse_pool = create_parse_pool(
+                [stream.sensor for stream in pooled],
+                self.__parse_processes
             )
-            sensor_thread.start()
-            self.__sensors[sensor.id] = sensor_thread
+            for stream in pooled:
+                stream.start_parse_pool(self.__parse_pool)
+
+        if self.__reactor is not None:
+            self.__reactor.start()
+        else:
+            for stream in streams:
+                stream.start()
+
+    def _on_frame(self, sensor_id, frame):
+        """Hand a frame delivered to all subscribers to the collector and the
+        synchronizers
+
+        Args:
+            sensor_id(str): The id of the sensor that produced the frame
+            frame(DataFrame): The frame
+        """
+        self.__collector.on_frame(sensor_id, frame)
+        for synchronizer in self.__synchronizers:
+            synchronizer.on_frame(sensor_id, frame)
+
+    def synchronize(
+            self,
+            sensor_ids=None,
+            key=SyncKey.SAMPLE_COUNT,
+            tolerance=0.0,
+            timeout=None,
+            partial=Partial.DROP
+    ):
+        """Bundle the frames of several sensors that belong to the same
+        sample. Subscribe to the returned synchronizer to get the bundles:
+
+            simulator.synchronize(['Camera_8000', 'Lidar_8200']).subscribe(fuse)
+
+        Args:
+            sensor_ids([str]): The sensors to bundle, all streaming sensors by
+            default
+            key(SyncKey): The frame value bundles are keyed by
+            tolerance(float): The largest difference, in seconds, between the
+            game times of frames in one bundle when keyed by game time
+            timeout(float): The time, in seconds, to wait for the rest of a
+            bundle after its first frame arrived. None waits until the bundle
+            can no longer complete.
+            partial(Partial): What to do with bundles that cannot complete
+
+        Raises:
+            ValueError if no sensor ids are given and the sensors are not
+            listening yet, see `start_sensor_listening`
+
+        Returns:
+            FrameSynchronizer, closed when the simulator is stopped
+        """
+        if sensor_ids is None:
+            sensor_ids = self.__sensors.keys()
+            if not sensor_ids:
+                raise ValueError('No sensors are listening, start them or pass the sensor ids to synchronize')
+        synchronizer = FrameSynchronizer(
+            sensor_ids,
+            key=key,
+            tolerance=tolerance,
+            timeout=timeout,
+            partial=partial
+        )
+        self.__synchronizers.append(synchronizer)
+        return synchronizer
+
+    def _create_shared_ring(self, sensor):
+        """Create the shared memory ring a sensor's frames are published to
+
+        Args:
+            sensor(Sensor): The configured sensor
+
+        Returns:
+            SharedFrameRing, None if the sensor's frames cannot be shared
+        """
+        from monodrive.sensors.shared_frames import SharedFrameRing, shared_slot_size
+        slot_size = shared_slot_size(sensor)
+        if slot_size is None:
+            return None
+        ring = SharedFrameRing(sensor.id, slot_size)
+        self.__shared_rings[sensor.id] = ring
+        return ring
+
+    def get_shared_frames(self, uid):
+        """Get the handle of the shared memory ring a sensor's frames are
+        published to. Pass it to a consumer process and attach with
+        `monodrive.sensors.shared_frames.SharedFrameReader`.
+
+        Args:
+            uid(str): The uid of the camera or lidar sensor
+
+        Returns:
+            Picklable handle of the ring
+        """
+        return self.__shared_rings[uid].handle
+
+    def get_frame_queue(self, uid):
+        """Get the queue of frames waiting for delivery to the subscribers of
+        a sensor, which holds its depth and drop counters.
+
+        Args:
+            uid(str): The uid of the sensor
+
+        Returns:
+            FrameQueue, None if the simulator was created without queues
+        """
+        return self.__sensors[uid].queue
 
     @property
     def sensors_ids(self):
@@ -317,16 +511,7 @@ class Simulator:
         """
         return self.__sensors.keys()
 
-    @property
-    def num_steps(self):
-        """Get number of steps in trajectory"""
-        if self.mode == Mode.MODE_CLOSED_LOOP.value:
-            return 0
-        if self.__scenario is None:
-            return 0
-        return len(self.__scenario)
-
-    def subscribe_to_sensor(self, uid, callback):
+    def subscribe_to_sensor(self, uid, callback, executor=None):
         """Subscribe to a single sensor's data ouput in the simulator.
 
         Args:
@@ -334,8 +519,26 @@ class Simulator:
             callback(func): The function that will be called when the sensor's
             data arrives. Should be of the format:
                 def my_callback(data):
+            executor(concurrent.futures.Executor): The executor the callback
+            is run on, None to call it on the thread delivering frames
+
+        Returns:
+            The Subscription, which can be disposed to unsubscribe
         """
-        self.__sensors[uid].subscribe(callback)
+        return self.__sensors[uid].subscribe(callback, executor)
+
+    def subscribe_raw(self, uid, callback):
+        """Subscribe to a single sensor's undecoded frames, e.g. to record
+        them. A sensor that only has raw subscribers is not parsed.
+
+        Args:
+            uid(str): The uid of the sensor to subscribe to.
+            callback(func): The function that will be called with the header
+            fields and payload blocks of each frame. Should be of the format:
+                def my_callback(raw_frame):
+            See `monodrive.sensors.RawFrame`.
+        """
+        self.__sensors[uid].subscribe_raw(callback)
 
     def get_sensor(self, uid):
         """Get copy of a single sensor configuration by uid
@@ -360,15 +563,7 @@ class Simulator:
         Returns:
             dict: The command response message from the simulator
         """
-        message = mmsg.ApiMessage(
-            mmsg.ID_EGO_CONTROL,
-            {
-                u'forward_amount': forward,
-                u'right_amount': right,
-                u'brake_amount': brake,
-                u'drive_mode': mode
-            }
-        )
+        message = CONTROL_TEMPLATE.message(forward, right, brake, mode)
         return self.send_command(message)
 
     def sample_sensors(self):
@@ -383,36 +578,41 @@ class Simulator:
         if not self.__running:
             raise Exception("Simulator is not running")
 
-        message = mmsg.ApiMessage(
-            mmsg.ID_SAMPLE_SENSORS_COMMAND,
-            {}
-        )
+        message = SAMPLE_TEMPLATE.message()
         return self.send_command(message)
 
-    @classmethod
-    def from_file(
-            cls,
-            simulator: str,
-            scenario: str = None,
-            sensors: str = None,
-            weather: str = None,
-            ego: str = None,
-            verbose: bool = False
-    ):
-        """Helper method to construct simulator object from config file paths"""
-        with open(simulator) as file:
-            config = json.load(file)
-            simulator = cls(config, verbose=verbose)
-        if scenario:
-            with open(scenario) as file:
-                simulator.__scenario = json.load(file)
-        if sensors:
-            with open(sensors) as file:
-                simulator.__sensor_config = json.load(file)
-        if weather:
-            with open(weather) as file:
-                simulator.__weather = json.load(file)
-        if ego:
-            with open(ego) as file:
-                simulator.__ego = json.load(file)
-        return simulator
+    def sample_and_collect(self, sensor_ids=None, timeout=None):
+        """Sample all sensors and block until every streaming sensor has
+        delivered its frame to all subscribers.
+
+        Args:
+            sensor_ids([str]): The sensors to wait for, all streaming
+            sensors by default
+            timeout(float): The time, in seconds, to wait for the frames.
+            None waits forever.
+
+        Raises:
+            Exception if the simulator is not currently running
+            TimeoutError if a sensor did not deliver a frame in time
+
+        Returns:
+            dict: The frames keyed by sensor id
+        """
+        return self._collect(self.sample_sensors, sensor_ids, timeout)
+
+    def _collect(self, command, sensor_ids, timeout):
+        """Send a command and collect the frames it triggers
+
+        Args:
+            command(func): Function sending the command
+            sensor_ids([str]): The sensors to wait for, None for all
+            timeout(float): The time, in seconds, to wait for the frames
+
+        Returns:
+            dict: The frames keyed by sensor id
+        """
+        if sensor_ids is None:
+            sensor_ids = self.__sensors.keys()
+        self.__collector.arm(sensor_ids)
+        command()
+        return self.__collector.wait(timeout)
@@ -0,0 +1,304 @@
+"""synchronizer.py
+Groups the frames of several sensors that belong to the same simulator sample.
+"""
+
+# lib
+import collections
+import threading
+import time
+from enum import Enum
+
+DEFAULT_MAX_PENDING = 8
+"""Default number of incomplete bundles a synchronizer holds at once"""
+
+
+class SyncKey(Enum):
+    """Enumeration of the frame values bundles are keyed by"""
+    # The sample count from the sensor header
+    SAMPLE_COUNT = 'sample_count'
+    # The game time of the frame, matched within a tolerance
+    GAME_TIME = 'game_time'
+
+
+class Partial(Enum):
+    """Enumeration of what is done with bundles that cannot complete"""
+    # Discard the bundle
+    DROP = 'drop'
+    # Deliver the bundle with the frames that did arrive
+    EMIT = 'emit'
+
+
+class FrameBundle:
+    """Frames of a set of sensors for one simulator sample"""
+
+    def __init__(self, key, sensor_ids, deadline=None):
+        """Constructor.
+
+        Args:
+            key: The sample count or game time of the frames
+            sensor_ids(frozenset): The ids of the sensors in the bundle
+            deadline(float): The monotonic time the bundle expires at, None
+            if it never expires
+        """
+        self.key = key
+        self.frames = dict()
+        self.deadline = deadline
+        self.__sensor_ids = sensor_ids
+
+    @property
+    def complete(self) -> bool:
+        """Get whether every sensor delivered its frame"""
+        return len(self.frames) == len(self.__sensor_ids)
+
+    @property
+    def missing(self) -> set:
+        """Get the ids of the sensors whose frame is missing"""
+        return set(self.__sensor_ids).difference(self.frames)
+
+    def __getitem__(self, sensor_id):
+        return self.frames[sensor_id]
+
+    def __contains__(self, sensor_id):
+        return sensor_id in self.frames
+
+
+class FrameSynchronizer:
+    """Bundles the frames of several sensors by sample count, or by game time
+    within a tolerance, and delivers each bundle once all of its sensors
+    reported.
+
+    A bundle that can no longer complete is resolved as soon as that is
+    known: when a newer bundle completes, when one of its missing sensors
+    already delivered a later frame, when it times out, or when too many
+    bundles are pending. It is then dropped or delivered partially depending
+    on the `Partial` policy. Bundles are always delivered in key order.
+
+    Callbacks are called without holding the lock frames are added under,
+    so a slow callback does not hold up the sensor threads.
+    """
+
+    def __init__(
+            self,
+            sensor_ids,
+            key=SyncKey.SAMPLE_COUNT,
+            tolerance=0.0,
+            timeout=None,
+            partial=Partial.DROP,
+            max_pending=DEFAULT_MAX_PENDING
+    ):
+        """Constructor.
+
+        Args:
+            sensor_ids([str]): The ids of the sensors to bundle
+            key(SyncKey): The frame value bundles are keyed by
+            tolerance(float): The largest difference, in seconds, between the
+            game times of frames in one bundle
+            timeout(float): The time, in seconds, to wait for the frames of a
+            bundle after its first frame arrived. None waits until the bundle
+            can no longer complete.
+            partial(Partial): What to do with bundles that cannot complete
+            max_pending(int): The number of incomplete bundles to hold before
+            the oldest is resolved
+
+        Raises:
+            ValueError if there are no sensors to bundle
+        """
+        self.__sensor_ids = frozenset(sensor_ids)
+        if not self.__sensor_ids:
+            raise ValueError('No sensors to synchronize')
+        self.__key = SyncKey(key)
+        self.__tolerance = tolerance
+        self.__timeout = timeout
+        self.__partial = Partial(partial)
+        self.__max_pending = max_pending
+
+        self.__condition = threading.Condition(threading.RLock())
+        self.__callbacks = []
+
+        # Resolved bundles waiting to be delivered to the callbacks, and the
+        # lock of the thread delivering them
+        self.__ready = collections.deque()
+        self.__delivering = threading.Lock()
+
+        # Incomplete bundles ordered by key
+        self.__pending = []
+        # Latest key delivered by each sensor and key of the last resolved bundle
+        self.__latest = dict()
+        self.__resolved = None
+
+        self.emitted = 0
+        self.dropped = 0
+        self.late = 0
+
+        # Thread that resolves bundles when they time out
+        self.__running = True
+        self.__timer = None
+        if timeout is not None:
+            self.__timer = threading.Thread(target=self._expire, daemon=True)
+            self.__timer.start()
+
+    @property
+    def sensor_ids(self) -> frozenset:
+        """Get the ids of the sensors that are bundled"""
+        return self.__sensor_ids
+
+    def subscribe(self, callback):
+        """Subscribe to the bundles of this synchronizer.
+
+        Args:
+            callback(func): The function that will be called with each
+            FrameBundle, from the thread of the sensor that completed it or
+            of the timeout, one bundle at a time. Should be of the format:
+                def my_callback(bundle):
+        """
+        with self.__condition:
+            self.__callbacks.append(callback)
+
+    def on_frame(self, sensor_id, frame):
+        """Add a delivered frame to its bundle, called from the sensor
+        threads
+
+        Args:
+            sensor_id(str): The id of the sensor that produced the frame
+            frame(DataFrame): The frame
+        """
+        if sensor_id not in self.__sensor_ids:
+            return
+        key = getattr(frame, self.__key.value, None)
+        if key is None:
+            return
+
+        with self.__condition:
+            if self.__resolved is not None and not self._after(key, self.__resolved):
+                self.late += 1
+                return
+
+            bundle = self._find(sensor_id, key)
+            if bundle is None:
+                deadline = None
+                if self.__timeout is not None:
+                    deadline = time.monotonic() + self.__timeout
+                bundle = FrameBundle(key, self.__sensor_ids, deadline)
+                self._insert(bundle)
+                self.__condition.notify()
+            bundle.frames[sensor_id] = frame
+            self.__latest[sensor_id] = key
+            self._resolve()
+        self._deliver()
+
+    def flush(self):
+        """Resolve every pending bundle now, according to the partial policy"""
+        with self.__condition:
+            while self.__pending:
+                self._emit(self.__pending.pop(0))
+        self._deliver()
+
+    def close(self):
+        """Stop the timeout thread and discard pending bundles"""
+        with self.__condition:
+            self.__running = False
+            self.__pending = []
+            self.__condition.notify()
+        if self.__timer is not None:
+            self.__timer.join()
+            self.__timer = None
+
+    def _matches(self, a, b) -> bool:
+        """Check whether two keys belong to the same bundle"""
+        if self.__key == SyncKey.GAME_TIME:
+            return abs(a - b) <= self.__tolerance
+        return a == b
+
+    def _after(self, a, b) -> bool:
+        """Check whether key `a` belongs to a later bundle than key `b`"""
+        return a > b and not self._matches(a, b)
+
+    def _find(self, sensor_id, key):
+        """Get the pending bundle a frame belongs to
+
+        Args:
+            sensor_id(str): The id of the sensor that produced the frame
+            key: The key of the frame
+
+        Returns:
+            The matching FrameBundle, None if a new bundle is needed
+        """
+        for bundle in self.__pending:
+            if sensor_id not in bundle and self._matches(bundle.key, key):
+                return bundle
+        return None
+
+    def _insert(self, bundle):
+        """Add a new bundle to the pending bundles, keeping them ordered"""
+        index = len(self.__pending)
+        while index > 0 and self.__pending[index - 1].key > bundle.key:
+            index -= 1
+        self.__pending.insert(index, bundle)
+
+    def _stale(self, bundle) -> bool:
+        """Check whether a missing sensor of a bundle already moved past it"""
+        for sensor_id in bundle.missing:
+            latest = self.__latest.get(sensor_id)
+            if latest is not None and self._after(latest, bundle.key):
+                return True
+        return False
+
+    def _resolve(self):
+        """Deliver complete and expired bundles, with every older bundle
+        before them, and resolve the oldest bundles that can no longer
+        complete"""
+        now = time.monotonic()
+        last = -1
+        for i, bundle in enumerate(self.__pending):
+            if bundle.complete or (bundle.deadline is not None and bundle.deadline <= now):
+                last = i
+        for _ in range(last + 1):
+            self._emit(self.__pending.pop(0))
+
+        while self.__pending and (
+                len(self.__pending) > self.__max_pending or self._stale(self.__pending[0])):
+            self._emit(self.__pending.pop(0))
+
+    def _emit(self, bundle):
+        """Queue a resolved bundle for delivery, or drop it"""
+        self.__resolved = bundle.key
+        if not bundle.complete and self.__partial == Partial.DROP:
+            self.dropped += 1
+            return
+        self.emitted += 1
+        self.__ready.append((bundle, tuple(self.__callbacks)))
+
+    def _deliver(self):
+        """Call the callbacks with the queued bundles, in order. Called
+        without the lock held; if another thread is delivering, it also
+        delivers the bundles queued meanwhile."""
+        while self.__ready:
+            if not self.__delivering.acquire(blocking=False):
+                return
+            try:
+                while self.__ready:
+                    bundle, callbacks = self.__ready.popleft()
+                    for callback in callbacks:
+                        try:
+                            callback(bundle)
+                        except Exception as e:
+                            print("synchronizer: exception in callback {0}".format(str(e)))
+            finally:
+                self.__delivering.release()
+
+    def _expire(self):
+        """Timeout loop resolving bundles as their deadlines pass"""
+        while True:
+            with self.__condition:
+                if not self.__running:
+                    return
+                deadlines = [b.deadline for b in self.__pending]
+                if not deadlines:
+                    self.__condition.wait()
+                    continue
+                remaining = min(deadlines) - time.monotonic()
+                if remaining > 0:
+                    self.__condition.wait(remaining)
+                    continue
+                self._resolve()
+            self._deliver()
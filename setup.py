@@ -19,8 +19,11 @@ setuptools.setup(
         'Operating System :: OS Independent',
     ),
     install_requires=[
-        'Rx>=1.6,<3',
         'numpy>=1.17.4',
         'objectfactory>=0.0.3,<1'
-    ]
+    ],
+    extras_require={
+        'json': ['orjson'],
+        'rx': ['Rx>=1.6']
+    }
 )
@@ -0,0 +1,88 @@
+"""Fake simulator sensor server for the tests"""
+
+# lib
+import json
+import socket
+import struct
+import threading
+import time
+
+# src
+from monodrive.common.messaging import HEADER_CONTROL
+
+
+def make_block(payload: bytes, sample_count: int = 0) -> bytes:
+    """Prefix a payload with the sensor header"""
+    return struct.pack('!IIfI', len(payload) + 16, 1, 0.5, sample_count) + payload
+
+
+def serve(blocks: [bytes]) -> int:
+    """Serve blocks to the first connection on a local port
+
+    Returns:
+        The port
+    """
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+
+    def run():
+        connection, _ = server.accept()
+        connection.sendall(b''.join(blocks))
+        time.sleep(0.5)
+        connection.close()
+        server.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return server.getsockname()[1]
+
+
+class CommandConnection:
+    """Connection of the client to a `CommandServer`"""
+
+    def __init__(self, connection: socket.socket):
+        self.__connection = connection
+
+    def __read(self, length: int) -> bytes:
+        data = b''
+        while len(data) < length:
+            received = self.__connection.recv(length - len(data))
+            if not received:
+                raise ConnectionError('connection closed by client')
+            data += received
+        return data
+
+    def receive(self) -> dict:
+        """Read the next command"""
+        magic, size = struct.unpack('!II', self.__read(8))
+        assert magic == HEADER_CONTROL
+        return json.loads(self.__read(size - 8))
+
+    def respond(self, response: dict):
+        """Send a response"""
+        data = json.dumps(response).encode('utf8')
+        self.__connection.sendall(struct.pack('!II', HEADER_CONTROL, len(data) + 8) + data)
+
+    def close(self):
+        self.__connection.close()
+
+
+class CommandServer:
+    """Fake simulator command server, driven by the test"""
+
+    def __init__(self, port: int = 0):
+        self.__server = socket.socket()
+        self.__server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__server.bind(('127.0.0.1', port))
+        self.__server.listen(1)
+        self.__server.settimeout(5)
+        self.port = self.__server.getsockname()[1]
+
+    def accept(self) -> CommandConnection:
+        """Accept the next connection of the client"""
+        connection, _ = self.__server.accept()
+        connection.settimeout(5)
+        return CommandConnection(connection)
+
+    def close(self):
+        self.__server.close()
@@ -0,0 +1,82 @@
+"""Tests for receiving sensor frames on an AsyncSensorStream"""
+
+# lib
+import asyncio
+import struct
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import objectfactory
+
+# src
+from monodrive.sensors import IMU, QueuePolicy
+from monodrive.sensors.async_stream import AsyncSensorStream
+from tests.fake_server import make_block, serve
+
+COUNT = 50
+
+
+def make_imu() -> IMU:
+    """Create an IMU served COUNT frames by a fake server"""
+    imu = objectfactory.Factory.create_object({'_type': 'IMU', 'type': 'IMU', 'listen_port': 0})
+    imu.configure()
+    payload = b'\0' + struct.pack('>ffffffih', 1, 2, 3, 4, 5, 6, 7, 0)
+    imu.listen_port = serve([make_block(payload, i) for i in range(COUNT)])
+    return imu
+
+
+class TestAsyncSensorStream(unittest.TestCase):
+
+    def test_blocking_iterator(self):
+        """A slow iterator with a small blocking queue gets every frame"""
+        async def run():
+            stream = AsyncSensorStream('127.0.0.1', make_imu())
+            frames = stream.frames(size=2, policy=QueuePolicy.BLOCK)
+            await stream.start()
+            samples = []
+            async for frame in frames:
+                await asyncio.sleep(0.001)
+                samples.append(frame.sample_count)
+                if len(samples) == COUNT:
+                    break
+            await stream.stop()
+            return samples
+
+        self.assertEqual(asyncio.run(run()), list(range(COUNT)))
+
+    def test_dropping_iterator(self):
+        """An iterator that is not consumed holds at most its size"""
+        async def run():
+            stream = AsyncSensorStream('127.0.0.1', make_imu())
+            frames = stream.frames(size=3, policy=QueuePolicy.DROP_OLDEST)
+            delivered = []
+            stream.subscribe(lambda frame: delivered.append(frame.sample_count))
+            await stream.start()
+            while len(delivered) < COUNT:
+                await asyncio.sleep(0.01)
+            samples = [(await frames.__anext__()).sample_count for _ in range(3)]
+            await stream.stop()
+            return samples
+
+        self.assertEqual(asyncio.run(run()), [COUNT - 3, COUNT - 2, COUNT - 1])
+
+    def test_executor(self):
+        """Frames parsed on an executor are delivered in order on the loop"""
+        async def run():
+            with ThreadPoolExecutor(1) as executor:
+                stream = AsyncSensorStream('127.0.0.1', make_imu(), executor=executor)
+                threads = set()
+                stream.subscribe(lambda frame: threads.add(threading.current_thread()))
+                frames = stream.frames()
+                await stream.start()
+                samples = [(await frames.__anext__()).sample_count for _ in range(COUNT)]
+                await stream.stop()
+            return samples, threads
+
+        samples, threads = asyncio.run(run())
+        self.assertEqual(samples, list(range(COUNT)))
+        self.assertEqual(threads, {threading.main_thread()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the JSON codec"""
+
+# lib
+import math
+import unittest
+
+# src
+from monodrive.common import codec
+
+
+class TestDecodeRelaxed(unittest.TestCase):
+
+    def test_single_quoted(self):
+        self.assertEqual(codec.decode_relaxed(b"{'a': [1, 'b'], 'c': {'d': 2.5}}"), {'a': [1, 'b'], 'c': {'d': 2.5}})
+
+    def test_in_place(self):
+        """A single quoted document in a writable buffer is normalized in
+        place"""
+        data = bytearray(b"{'a': 'b'}")
+        self.assertEqual(codec.decode_relaxed(memoryview(data)), {'a': 'b'})
+        self.assertEqual(data, bytearray(b'{"a": "b"}'))
+
+    def test_read_only(self):
+        """A single quoted document in a read only buffer is left as is"""
+        data = b"{'a': 'b'}"
+        self.assertEqual(codec.decode_relaxed(memoryview(data)), {'a': 'b'})
+        self.assertEqual(data, b"{'a': 'b'}")
+
+    def test_apostrophes(self):
+        """Apostrophes inside double quoted strings are kept"""
+        self.assertEqual(codec.decode_relaxed(b'{"name": "driver\'s car"}'), {'name': "driver's car"})
+        self.assertEqual(
+            codec.decode_relaxed(bytearray(b'{\'a\': "it\'s", \'b\': \'say "hi"\'}')),
+            {'a': "it's", 'b': 'say "hi"'}
+        )
+
+    def test_escaped_quote(self):
+        data = bytearray(b"{'name': 'driver\\'s car'}")
+        self.assertEqual(codec.decode_relaxed(data), {'name': "driver's car"})
+
+    def test_mixed_quotes(self):
+        """A double quoted document with single quoted strings later on"""
+        self.assertEqual(codec.decode_relaxed(b'{"a": 1, "b": \'c\'}'), {'a': 1, 'b': 'c'})
+
+    def test_empty(self):
+        for data in [b'', b'  \r\n', bytearray(b' ')]:
+            with self.assertRaises(ValueError):
+                codec.decode_relaxed(data)
+
+    @unittest.skipUnless(codec.NAME == 'orjson', 'orjson is not installed')
+    def test_nan_orjson(self):
+        """orjson rejects NaN, which is decoded by the standard library"""
+        decoded = codec.decode_relaxed(bytearray(b"{'a': NaN, 'b': [Infinity]}"))
+        self.assertTrue(math.isnan(decoded['a']))
+        self.assertEqual(decoded['b'], [math.inf])
+        self.assertTrue(math.isnan(codec.decode(memoryview(b'{"a": NaN}'))['a']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for collecting the frames of a simulator step"""
+
+# lib
+import unittest
+
+# src
+from monodrive.sensors import DataFrame
+from monodrive.simulator.collector import FrameCollector
+
+
+def make_frame(sample_count: int) -> DataFrame:
+    """Create a frame with a sample count"""
+    frame = DataFrame()
+    frame.sample_count = sample_count
+    return frame
+
+
+class TestFrameCollector(unittest.TestCase):
+
+    def test_collect(self):
+        collector = FrameCollector()
+        collector.arm(['a', 'b'])
+        a, b = make_frame(1), make_frame(1)
+        collector.on_frame('a', a)
+        collector.on_frame('b', b)
+        self.assertEqual(collector.wait(0), {'a': a, 'b': b})
+
+    def test_late_frame(self):
+        """A frame of a step that timed out does not complete the next step"""
+        collector = FrameCollector()
+        collector.arm(['a', 'b'])
+        collector.on_frame('a', make_frame(1))
+        with self.assertRaises(TimeoutError):
+            collector.wait(0)
+        collector.on_frame('b', make_frame(1))
+
+        collector.arm(['a', 'b'])
+        collector.on_frame('b', make_frame(1))
+        collector.on_frame('a', make_frame(2))
+        with self.assertRaises(TimeoutError):
+            collector.wait(0)
+
+        collector.arm(['a', 'b'])
+        a, b = make_frame(3), make_frame(3)
+        collector.on_frame('a', a)
+        collector.on_frame('b', b)
+        self.assertEqual(collector.wait(0), {'a': a, 'b': b})
+
+    def test_offset_counters(self):
+        """Sensors whose sample counts differ are collected"""
+        collector = FrameCollector()
+        for step in range(3):
+            collector.arm(['a', 'b'])
+            a, b = make_frame(100 + step), make_frame(step)
+            collector.on_frame('a', a)
+            collector.on_frame('b', b)
+            self.assertEqual(collector.wait(0), {'a': a, 'b': b})
+
+    def test_counter_reset(self):
+        """A sensor whose sample count starts over, e.g. once reconfigured,
+        is collected after it is reset"""
+        collector = FrameCollector()
+        collector.arm(['a', 'b'])
+        collector.on_frame('a', make_frame(10))
+        collector.on_frame('b', make_frame(10))
+        collector.wait(0)
+
+        collector.reset('b')
+        collector.arm(['a', 'b'])
+        a, b = make_frame(11), make_frame(0)
+        collector.on_frame('a', a)
+        collector.on_frame('b', b)
+        self.assertEqual(collector.wait(0), {'a': a, 'b': b})
+
+        collector.arm(['a', 'b'])
+        collector.on_frame('a', make_frame(10))
+        collector.on_frame('b', make_frame(0))
+        with self.assertRaises(TimeoutError):
+            collector.wait(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
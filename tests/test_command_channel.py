@@ -0,0 +1,109 @@
+"""Tests for pipelining commands over a CommandChannel"""
+
+# lib
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# src
+from monodrive.common.client import Client
+from monodrive.common.command_channel import CommandChannel
+from monodrive.common.messaging import ApiMessage
+from monodrive.simulator import Simulator
+from tests.fake_server import CommandServer
+
+
+def make_command(i: int) -> ApiMessage:
+    """Create a command carrying a number"""
+    return ApiMessage('TestCommand', {'i': i})
+
+
+class TestCommandChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CommandServer()
+        self.channel = CommandChannel(Client('127.0.0.1', self.server.port))
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.close()
+
+    def test_out_of_order(self):
+        """Responses are matched to their commands by reference"""
+        commands = [make_command(i) for i in range(3)]
+        futures = [self.channel.submit(command) for command in commands]
+        connection = self.server.accept()
+        received = [connection.receive() for _ in commands]
+        for message in reversed(received):
+            connection.respond({'reference': message['reference'], 'i': message['message']['i']})
+        self.assertEqual([future.result(5)['i'] for future in futures], [0, 1, 2])
+
+    def test_no_reference(self):
+        """A response without a reference answers the oldest command"""
+        futures = [self.channel.submit(make_command(i)) for i in range(2)]
+        connection = self.server.accept()
+        for i in range(2):
+            connection.receive()
+            connection.respond({'i': i})
+        self.assertEqual([future.result(5)['i'] for future in futures], [0, 1])
+
+    def test_batch(self):
+        """A batch is sent in order and each command gets its response"""
+        commands = [make_command(i) for i in range(3)]
+        futures = self.channel.submit_all(commands)
+        connection = self.server.accept()
+        received = [connection.receive() for _ in commands]
+        self.assertEqual([message['reference'] for message in received], [command.uid for command in commands])
+        for message in received:
+            connection.respond({'reference': message['reference'], 'i': message['message']['i']})
+        self.assertEqual([future.result(5)['i'] for future in futures], [0, 1, 2])
+
+    def test_dropped_connection(self):
+        """A dropped connection fails the outstanding commands, and the next
+        command connects again"""
+        futures = [self.channel.submit(make_command(i)) for i in range(2)]
+        connection = self.server.accept()
+        connection.receive()
+        connection.close()
+        for future in futures:
+            with self.assertRaises(ConnectionError):
+                future.result(5)
+
+        future = self.channel.submit(make_command(2))
+        connection = self.server.accept()
+        message = connection.receive()
+        connection.respond({'reference': message['reference'], 'i': 2})
+        self.assertEqual(future.result(5)['i'], 2)
+
+    def test_connect_failure(self):
+        """A command fails with a clear error while the simulator cannot be
+        connected to, and is sent once it can"""
+        port = self.server.port
+        self.server.close()
+        with self.assertRaises(ConnectionError):
+            self.channel.submit(make_command(0))
+
+        self.server = CommandServer(port)
+        future = self.channel.submit(make_command(1))
+        connection = self.server.accept()
+        message = connection.receive()
+        connection.respond({'reference': message['reference'], 'i': 1})
+        self.assertEqual(future.result(5)['i'], 1)
+
+    def test_send_commands(self):
+        """Simulator.send_commands waits for the responses of a batch"""
+        simulator = Simulator({'server_ip': '127.0.0.1', 'server_port': self.server.port})
+        executor = ThreadPoolExecutor(1)
+        try:
+            responses = executor.submit(simulator.send_commands, [make_command(i) for i in range(2)])
+            connection = self.server.accept()
+            received = [connection.receive() for _ in range(2)]
+            for message in reversed(received):
+                connection.respond({'reference': message['reference'], 'i': message['message']['i']})
+            self.assertEqual([response['i'] for response in responses.result(5)], [0, 1])
+        finally:
+            simulator.stop()
+            executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
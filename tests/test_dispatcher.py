@@ -0,0 +1,46 @@
+"""Tests for delivering frames to subscribers"""
+
+# lib
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# src
+from monodrive.sensors import FrameDispatcher
+
+
+class TestFrameDispatcher(unittest.TestCase):
+
+    def test_delivered_after_executor_subscribers(self):
+        """A frame is delivered once the subscribers run on executors
+        returned, not when they are submitted"""
+        dispatcher = FrameDispatcher()
+        release = threading.Event()
+        calls = []
+        delivered = threading.Event()
+
+        def on_delivered(frame):
+            calls.append(('delivered', frame))
+            delivered.set()
+
+        executor = ThreadPoolExecutor(1)
+        dispatcher.subscribe(lambda frame: calls.append(('inline', frame)))
+        dispatcher.subscribe(lambda frame: (release.wait(5), calls.append(('executor', frame))), executor)
+        try:
+            dispatcher.publish(1, on_delivered)
+            self.assertEqual(calls, [('inline', 1)])
+            release.set()
+            self.assertTrue(delivered.wait(5))
+        finally:
+            executor.shutdown()
+        self.assertEqual(calls, [('inline', 1), ('executor', 1), ('delivered', 1)])
+
+    def test_delivered_without_subscribers(self):
+        dispatcher = FrameDispatcher()
+        delivered = []
+        dispatcher.publish(1, delivered.append)
+        self.assertEqual(delivered, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
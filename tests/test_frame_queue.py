@@ -0,0 +1,118 @@
+"""Tests for queueing parsed frames for delivery"""
+
+# lib
+import threading
+import unittest
+import objectfactory
+
+# src
+from monodrive.sensors import DataFrame, FrameQueue, QueuePolicy, SensorThread
+
+
+class Frame(DataFrame):
+    """Frame that counts its releases"""
+
+    def __init__(self, i: int):
+        self.i = i
+        self.released = 0
+
+    def release(self):
+        self.released += 1
+
+
+class TestFrameQueue(unittest.TestCase):
+
+    def test_block(self):
+        """A full queue blocks the producer until a frame is taken"""
+        queue = FrameQueue(2, QueuePolicy.BLOCK)
+        frames = [Frame(i) for i in range(3)]
+        queue.put(frames[0])
+        queue.put(frames[1])
+        producer = threading.Thread(target=queue.put, args=(frames[2],))
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+
+        self.assertIs(queue.get(), frames[0])
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([queue.get(), queue.get()], frames[1:])
+        self.assertEqual((queue.dropped, queue.high_water), (0, 2))
+        self.assertEqual([f.released for f in frames], [0, 0, 0])
+
+    def test_drop_oldest(self):
+        """A full queue releases its oldest frame for a new one"""
+        queue = FrameQueue(2, QueuePolicy.DROP_OLDEST)
+        frames = [Frame(i) for i in range(4)]
+        for frame in frames:
+            queue.put(frame)
+        self.assertEqual([queue.get(), queue.get()], frames[2:])
+        self.assertEqual(queue.dropped, 2)
+        self.assertEqual([f.released for f in frames], [1, 1, 0, 0])
+
+    def test_keep_latest(self):
+        """The queue only holds the newest frame, whatever its size"""
+        queue = FrameQueue(4, QueuePolicy.KEEP_LATEST)
+        self.assertEqual(queue.size, 1)
+        frames = [Frame(i) for i in range(3)]
+        for frame in frames:
+            queue.put(frame)
+        self.assertEqual(queue.depth, 1)
+        self.assertIs(queue.get(), frames[2])
+        self.assertEqual([f.released for f in frames], [1, 1, 0])
+
+    def test_close(self):
+        """Closing wakes a blocked producer and consumer and releases the
+        frames that were not delivered"""
+        queue = FrameQueue(1, QueuePolicy.BLOCK)
+        frames = [Frame(i) for i in range(2)]
+        queue.put(frames[0])
+        producer = threading.Thread(target=queue.put, args=(frames[1],))
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+
+        queue.close()
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertIsNone(queue.get())
+        self.assertEqual([f.released for f in frames], [1, 1])
+
+        consumer_queue = FrameQueue(1)
+        got = []
+        consumer = threading.Thread(target=lambda: got.append(consumer_queue.get()))
+        consumer.start()
+        consumer_queue.close()
+        consumer.join(5)
+        self.assertEqual(got, [None])
+
+    def test_stop_stream_queue(self):
+        """Stopping the queue of a stream wakes the receiving thread blocked
+        on it while a subscriber is busy"""
+        sensor = objectfactory.Factory.create_object({'_type': 'GPS', 'type': 'GPS', 'listen_port': 1})
+        sensor.configure()
+        stream = SensorThread('127.0.0.1', sensor)
+        stream.start_queue(1, QueuePolicy.BLOCK)
+        entered = threading.Event()
+        release = threading.Event()
+        stream.subscribe(lambda frame: (entered.set(), release.wait(5)))
+
+        frames = [Frame(i) for i in range(3)]
+        producer = threading.Thread(target=lambda: [stream._publish(frame, frame.i) for frame in frames])
+        producer.start()
+        self.assertTrue(entered.wait(5))
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+
+        stopping = threading.Thread(target=stream.stop_queue)
+        stopping.start()
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        release.set()
+        stopping.join(5)
+        self.assertFalse(stopping.is_alive())
+        self.assertEqual([f.released for f in frames], [0, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
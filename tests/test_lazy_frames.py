@@ -0,0 +1,101 @@
+"""Tests for frames decoded on first access"""
+
+# lib
+import json
+import unittest
+import numpy as np
+import objectfactory
+
+# src
+from monodrive.common.buffer_pool import PooledBuffer
+from monodrive.sensors import Camera, Radar, State
+
+
+class CountingPool:
+    """Buffer pool that records the buffers released to it"""
+
+    def __init__(self):
+        self.released = []
+
+    def release(self, buffer):
+        self.released.append(buffer)
+
+
+def create_sensor(cls, config: dict):
+    """Create a configured sensor of a class"""
+    sensor = objectfactory.Factory.create_object(dict(config, type=cls.__name__, _type=cls.__name__))
+    sensor.configure()
+    return sensor
+
+
+class TestLazyFrames(unittest.TestCase):
+
+    def check_serialize(self, sensor, body: dict):
+        """A lazy frame serializes like the eagerly parsed frame, before
+        and after its fields are accessed"""
+        payload = memoryview(json.dumps(body).replace('"', "'").encode('utf8'))
+        eager = sensor.parse([payload], len(payload), 10, 1.5)
+        lazy = sensor.parse_lazy([payload], len(payload), 10, 1.5)
+        self.assertIsNot(type(lazy), type(eager))
+        self.assertEqual(lazy.serialize(), eager.serialize())
+        self.assertEqual(lazy.serialize(), eager.serialize())
+        copy = objectfactory.Factory.create_object(lazy.serialize())
+        self.assertIs(type(copy), type(eager))
+
+    def test_serialize(self):
+        self.check_serialize(create_sensor(State, {'listen_port': 8700}), {
+            'sensor_id': 'State_8700',
+            'time': 10,
+            'game_time': 1.5,
+            'frame': {
+                'vehicles': [{'state': {'name': 'ego', 'tags': ['ego'], 'odometry': None, 'oobbs': []}, 'wheels': []}],
+                'objects': []
+            }
+        })
+        self.check_serialize(create_sensor(Radar, {'listen_port': 8301}), {
+            'target_list': [{'range': 1.0, 'aoa': 2.0, 'velocity': 3.0, 'rcs': 4.0, 'target_ids': ['a']}],
+            'gt_targets': []
+        })
+
+    def create_camera_frame(self):
+        """Parse a lazy camera frame received into a pooled buffer
+
+        Returns:
+            The frame, the pool and the buffer
+        """
+        camera = create_sensor(Camera, {
+            'listen_port': 0,
+            'stream_dimensions': {'x': 4.0, 'y': 2.0},
+            'channels': 'bgra'
+        })
+        pool = CountingPool()
+        buffer = PooledBuffer(32, pool)
+        buffer[:] = bytes(range(32))
+        frame = camera.parse_lazy([memoryview(buffer)], 32, 1, 0.5)
+        return frame, pool, buffer
+
+    def test_release_before_decode(self):
+        """A camera frame released before its image is decoded returns the
+        buffer once"""
+        frame, pool, buffer = self.create_camera_frame()
+        self.assertNotIn('image', frame.__dict__)
+        frame.release()
+        frame.release()
+        self.assertEqual(len(pool.released), 1)
+        self.assertIs(pool.released[0], buffer)
+        self.assertIsNone(frame.image)
+
+    def test_release_after_decode(self):
+        """A camera frame released after its image is decoded returns the
+        buffer the image is a view of, once"""
+        frame, pool, buffer = self.create_camera_frame()
+        np.testing.assert_array_equal(frame.image[0, 0], [0, 1, 2])
+        self.assertIs(frame.buffer, buffer)
+        frame.release()
+        frame.release()
+        self.assertEqual(len(pool.released), 1)
+        self.assertIs(pool.released[0], buffer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Tests for parsing lidar sweeps"""
+
+# lib
+import math
+import struct
+import unittest
+import numpy as np
+import objectfactory
+
+# src
+from monodrive.sensors.lidar import BLOCKS_PER_PACKET, CHANNELS_PER_BLOCK, PACKET_SIZE
+
+
+def create_lidar(n_lasers: int, horizontal_resolution: float):
+    """Create a configured lidar"""
+    lidar = objectfactory.Factory.create_object({
+        '_type': 'Lidar',
+        'type': 'Lidar',
+        'listen_port': 1,
+        'n_lasers': n_lasers,
+        'horizontal_resolution': horizontal_resolution
+    })
+    lidar.configure()
+    return lidar
+
+
+def make_packets(lidar, seed: int, valid_blocks: int) -> [bytes]:
+    """Build the packets of a sweep with random returns, some of them empty.
+    The last packet only has its first `valid_blocks` blocks filled, the
+    others carry the azimuth that ends the sweep."""
+    rng = np.random.default_rng(seed)
+    packets = []
+    for p in range(lidar.blocks_per_frame):
+        data = bytearray()
+        for b in range(BLOCKS_PER_PACKET):
+            last = p == lidar.blocks_per_frame - 1 and b >= valid_blocks
+            azimuth = 36000 + int(rng.integers(0, 100)) if last else int(rng.integers(0, 36000))
+            data += struct.pack('<HH', 0xeeff, azimuth)
+            for _ in range(CHANNELS_PER_BLOCK):
+                distance = 0 if rng.random() < 0.2 else int(rng.integers(1, 60000))
+                data += struct.pack('<HB', distance, int(rng.integers(0, 256)))
+        data += struct.pack('<IH', p, 0x3722)
+        assert len(data) == PACKET_SIZE
+        packets.append(bytes(data))
+    return packets
+
+
+def reference_points(lidar, packets: [bytes]) -> np.ndarray:
+    """Parse a sweep point by point, as the lidar parser originally did
+
+    Returns:
+        (N, 4) array of x, y, z, intensity
+    """
+    laser_angles = lidar._get_laser_angles()
+    points = []
+    for packet in packets:
+        values = struct.unpack('<' + 12 * ('HH' + 32 * 'HB') + 'IH', packet)
+        stride = 2 + 32 * 2
+        for b in range(BLOCKS_PER_PACKET):
+            azimuth = values[b * stride + 1]
+            if azimuth >= 36000:
+                continue
+            for i in range(CHANNELS_PER_BLOCK):
+                distance = values[b * stride + 2 + 2 * i] * 2.0
+                intensity = values[b * stride + 3 + 2 * i]
+                angle = azimuth / 100.0
+                if i < CHANNELS_PER_BLOCK / 2:
+                    angle += lidar.horizontal_resolution
+                if distance == 0:
+                    x, y, z = 0, 0, 0
+                else:
+                    omega = math.radians(laser_angles[i % lidar.n_lasers])
+                    alpha = math.radians(angle)
+                    x = distance * math.cos(omega) * math.sin(alpha)
+                    y = distance * math.cos(omega) * math.cos(alpha)
+                    z = distance * math.sin(omega)
+                points.append([x, y, z, intensity])
+    return np.array(points).reshape(-1, 4)
+
+
+class TestLidar(unittest.TestCase):
+
+    def check(self, frame, reference: np.ndarray):
+        """Check the points of a frame against the reference points"""
+        self.assertEqual(frame.point_cloud.shape, reference.shape)
+        np.testing.assert_allclose(frame.point_cloud, reference, rtol=1e-5, atol=1e-2)
+        np.testing.assert_array_equal(frame.valid, reference[:, 0:3].any(axis=1))
+        self.assertEqual(len(frame.points), len(reference))
+        first = frame.points[0]
+        np.testing.assert_allclose([first.x, first.y, first.z, first.intensity], reference[0], rtol=1e-5, atol=1e-2)
+
+    def test_parse(self):
+        """The eager, streaming and lazy parses match the point by point
+        parse, with empty returns and a partially filled last packet"""
+        for n_lasers, horizontal_resolution in [(16, 0.4), (32, 0.2)]:
+            with self.subTest(n_lasers=n_lasers):
+                lidar = create_lidar(n_lasers, horizontal_resolution)
+                packets = make_packets(lidar, n_lasers, valid_blocks=5)
+                reference = reference_points(lidar, packets)
+                self.assertEqual(
+                    len(reference),
+                    ((len(packets) - 1) * BLOCKS_PER_PACKET + 5) * CHANNELS_PER_BLOCK
+                )
+
+                views = [memoryview(packet) for packet in packets]
+                self.check(lidar.parse(views, PACKET_SIZE, 1, 2.0), reference)
+
+                state = lidar.begin_frame()
+                for i, view in enumerate(views):
+                    lidar.parse_block(state, i, view)
+                self.check(lidar.finish_frame(state, PACKET_SIZE, 1, 2.0), reference)
+
+                lazy = lidar.parse_lazy(views, PACKET_SIZE, 1, 2.0)
+                self.assertNotIn('point_cloud', lazy.__dict__)
+                self.check(lazy, reference)
+
+    def test_columns(self):
+        """The azimuth and laser of every point"""
+        lidar = create_lidar(16, 0.4)
+        packets = make_packets(lidar, 0, valid_blocks=BLOCKS_PER_PACKET)
+        frame = lidar.parse([memoryview(packets[0])], PACKET_SIZE, 1, 2.0)
+        azimuth = struct.unpack_from('<H', packets[0], 2)[0] / 100.0
+        np.testing.assert_allclose(frame.azimuth[:CHANNELS_PER_BLOCK], [azimuth + 0.4] * 16 + [azimuth] * 16, rtol=1e-6)
+        np.testing.assert_array_equal(frame.laser[:CHANNELS_PER_BLOCK], list(range(16)) * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
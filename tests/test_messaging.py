@@ -0,0 +1,86 @@
+"""Tests for encoding messages from templates"""
+
+# lib
+import json
+import struct
+import sys
+import threading
+import unittest
+
+# src
+from monodrive.common.messaging import HEADER_CONTROL, ID_EGO_CONTROL, TEMPLATE_FIELD_WIDTH, MessageTemplate
+
+
+def decode(message) -> dict:
+    """Check the header of an encoded message and decode its JSON"""
+    data = message.encode()
+    header, size = struct.unpack('!II', data[:8])
+    assert (header, size) == (HEADER_CONTROL, len(data))
+    return json.loads(data[8:].decode('utf8'))
+
+
+class TestMessageTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.template = MessageTemplate(
+            ID_EGO_CONTROL,
+            [u'forward_amount', u'right_amount'],
+            {u'drive_mode': 1}
+        )
+
+    def test_message(self):
+        message = self.template.message(0.5, 1)
+        self.assertEqual(decode(message), {
+            u'type': ID_EGO_CONTROL,
+            u'message': {u'drive_mode': 1, u'forward_amount': 0.5, u'right_amount': 1},
+            u'reference': message.uid
+        })
+
+    def test_negative(self):
+        """Negative floats, including the longest ones, fit their slots and
+        every message has the same size"""
+        size = len(self.template.message(0, 0).encode())
+        for values in [(-0.5, -1), (-1e-300, -sys.float_info.max), (-2.2250738585072014e-308, -1.0)]:
+            with self.subTest(values=values):
+                message = self.template.message(*values)
+                self.assertEqual(len(message.encode()), size)
+                decoded = decode(message)[u'message']
+                self.assertEqual((decoded[u'forward_amount'], decoded[u'right_amount']), values)
+
+    def test_overflow(self):
+        """A value longer than its slot raises instead of being cut"""
+        too_long = 10 ** TEMPLATE_FIELD_WIDTH
+        for values in [(too_long, 0), (0, -too_long)]:
+            with self.subTest(values=values):
+                with self.assertRaises(ValueError):
+                    self.template.message(*values)
+        with self.assertRaises(ValueError):
+            self.template.message(0.5)
+
+    def test_references_monotonic(self):
+        """References are unique and increase within every thread, with
+        messages built from several threads at once"""
+        references = [[] for _ in range(8)]
+        start = threading.Barrier(len(references))
+
+        def build(uids):
+            start.wait()
+            for _ in range(2000):
+                uids.append(self.template.message(0.5, 0.0).uid)
+
+        threads = [threading.Thread(target=build, args=(uids,)) for uids in references]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for uids in references:
+            self.assertEqual(uids, sorted(uids))
+            self.assertEqual(len(set(uids)), len(uids))
+        everything = [uid for uids in references for uid in uids]
+        self.assertEqual(len(set(everything)), len(everything))
+        self.assertGreater(self.template.message(0, 0).uid, max(everything))
+
+
+if __name__ == '__main__':
+    unittest.main()
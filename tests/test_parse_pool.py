@@ -0,0 +1,67 @@
+"""Tests for parsing sensor frames in worker processes"""
+
+# lib
+import json
+import threading
+import unittest
+import objectfactory
+
+# src
+from monodrive.sensors import SensorThread
+from monodrive.sensors.parse_pool import create_parse_pool
+from monodrive.simulator import Simulator
+from tests.fake_server import make_block, serve
+
+
+def create_sensor(config: dict):
+    """Create a configured sensor"""
+    sensor = objectfactory.Factory.create_object(dict(config, _type=config['type']))
+    sensor.configure()
+    return sensor
+
+
+class TestParsePool(unittest.TestCase):
+
+    def test_parse_in_pool(self):
+        """Frames are parsed with the sensor the pool was created with"""
+        state = create_sensor({'type': 'State', 'listen_port': 0})
+        payloads = [
+            json.dumps({'sensor_id': state.id, 'frame': {'objects': [], 'vehicles': []}}).encode('utf8')
+            for _ in range(2)
+        ]
+        state.listen_port = serve([make_block(payloads[i], i) for i in range(2)])
+
+        frames = []
+        received = threading.Event()
+
+        def on_frame(frame):
+            frames.append((frame.sensor_id, frame.sample_count))
+            if len(frames) == 2:
+                received.set()
+
+        pool = create_parse_pool([state], 1)
+        stream = SensorThread('127.0.0.1', state)
+        stream.start_parse_pool(pool)
+        stream.subscribe(on_frame)
+        stream.start()
+        try:
+            self.assertTrue(received.wait(30))
+        finally:
+            stream.stop()
+            pool.shutdown()
+        self.assertEqual(frames, [(state.id, 0), (state.id, 1)])
+
+    def test_camera_rejected(self):
+        """Camera frames are views of pooled buffers, which cannot be sent
+        back from a worker process"""
+        camera = create_sensor({'type': 'Camera', 'listen_port': 1, 'stream_dimensions': {'x': 4.0, 'y': 2.0}})
+        with self.assertRaises(ValueError):
+            create_parse_pool([camera])
+        with self.assertRaises(ValueError):
+            SensorThread('127.0.0.1', camera).start_parse_pool(None)
+        with self.assertRaises(ValueError):
+            Simulator({'server_ip': '127.0.0.1', 'server_port': 1}, parse_executors={'SemanticCamera': 'process'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Tests for parsing radar sensor frames"""
+
+# lib
+import json
+import unittest
+import numpy as np
+import objectfactory
+
+# src
+from monodrive.sensors import merge_radar_frames
+
+
+def make_target(i: int) -> dict:
+    """Build a radar target as sent by the simulator"""
+    return {'range': 10.0 + i, 'aoa': -5.0 + i, 'velocity': 2.5 * i, 'rcs': 0.25 * i, 'target_ids': ['actor_{}'.format(i)]}
+
+
+def parse(port: int, targets: [dict], groundtruth: [dict]):
+    """Parse a radar frame with a configured radar"""
+    sensor = objectfactory.Factory.create_object({'_type': 'Radar', 'type': 'Radar', 'listen_port': port})
+    sensor.configure()
+    body = {'target_list': targets, 'gt_targets': groundtruth}
+    payload = memoryview(json.dumps(body).replace('"', "'").encode('utf8'))
+    return sensor.parse([payload], len(payload), 10, 1.5)
+
+
+class TestRadarFrame(unittest.TestCase):
+
+    def check(self, arrays, targets: [dict]):
+        """Check target arrays against the targets in dict form"""
+        self.assertEqual(len(arrays), len(targets))
+        for name in ('range', 'aoa', 'velocity', 'rcs'):
+            np.testing.assert_array_equal(getattr(arrays, name), [t[name] for t in targets])
+
+    def test_arrays(self):
+        targets = [make_target(i) for i in range(3)]
+        groundtruth = [make_target(i) for i in range(5, 7)]
+        frame = parse(8301, targets, groundtruth)
+        self.assertEqual(frame.targets[1].target_ids, ['actor_1'])
+        self.check(frame.target_arrays, targets)
+        self.check(frame.groundtruth_arrays, groundtruth)
+
+    def test_empty(self):
+        frame = parse(8301, [], [])
+        self.check(frame.target_arrays, [])
+        self.check(frame.groundtruth_arrays, [])
+
+    def test_merge(self):
+        a = parse(8301, [make_target(i) for i in range(2)], [])
+        b = parse(8302, [], [make_target(9)])
+        c = parse(8303, [make_target(4)], [])
+
+        table = merge_radar_frames([a, b, c])
+        self.assertEqual(list(table['sensor_id']), [a.sensor_id, a.sensor_id, c.sensor_id])
+        np.testing.assert_array_equal(table['range'], [10.0, 11.0, 14.0])
+        np.testing.assert_array_equal(table['rcs'], [0.0, 0.25, 1.0])
+
+        table = merge_radar_frames([a, b, c], groundtruth=True)
+        self.assertEqual(list(table['sensor_id']), [b.sensor_id])
+        np.testing.assert_array_equal(table['velocity'], [22.5])
+
+        self.assertEqual(len(merge_radar_frames([])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Tests for receiving sensor frames on a SensorReactor"""
+
+# lib
+import struct
+import threading
+import time
+import unittest
+import objectfactory
+
+# src
+from monodrive.sensors import SensorReactor
+from tests.fake_server import make_block, serve
+
+
+class TestSensorReactor(unittest.TestCase):
+
+    def test_slow_subscriber(self):
+        """Frames are delivered in order when parsing falls behind and the
+        worker queue fills up"""
+        imu = objectfactory.Factory.create_object({'_type': 'IMU', 'type': 'IMU', 'listen_port': 0})
+        imu.configure()
+        count = 200
+        payload = b'\0' + struct.pack('>ffffffih', 1, 2, 3, 4, 5, 6, 7, 0)
+        imu.listen_port = serve([make_block(payload, i) for i in range(count)])
+
+        samples = []
+        received = threading.Event()
+
+        def on_frame(frame):
+            time.sleep(0.001)
+            samples.append(frame.sample_count)
+            if len(samples) == count:
+                received.set()
+
+        reactor = SensorReactor('127.0.0.1', parse_workers=1, worker_queue_size=4)
+        reactor.add_sensor(imu).subscribe(on_frame)
+        reactor.start()
+        try:
+            self.assertTrue(received.wait(10))
+        finally:
+            reactor.stop()
+        self.assertEqual(samples, list(range(count)))
+
+
+if __name__ == '__main__':
+    unittest.main()
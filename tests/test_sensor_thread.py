@@ -0,0 +1,81 @@
+"""Tests for receiving sensor frames on a SensorThread"""
+
+# lib
+import json
+import threading
+import unittest
+import numpy as np
+import objectfactory
+
+# src
+from monodrive.sensors import DataFrame, SensorThread
+from monodrive.simulator import Simulator
+from tests.fake_server import make_block, serve
+
+
+class TestSensorThread(unittest.TestCase):
+
+    def test_annotated_camera(self):
+        """An image received into a pooled buffer followed by an annotation
+        received into a receive buffer"""
+        camera = objectfactory.Factory.create_object({
+            '_type': 'Camera',
+            'type': 'Camera',
+            'listen_port': 0,
+            'stream_dimensions': {'x': 4.0, 'y': 2.0},
+            'channels': 'bgra',
+            'annotation': {'include_annotation': True, 'desired_tags': []}
+        })
+        camera.configure()
+        self.assertEqual(camera.blocks_per_frame, 2)
+
+        images = [np.full(32, i, dtype=np.uint8).tobytes() for i in range(2)]
+        annotations = [json.dumps({'frame': i}).encode('utf8') for i in range(2)]
+        blocks = []
+        for i in range(2):
+            blocks += [make_block(images[i], i), make_block(annotations[i], i)]
+        camera.listen_port = serve(blocks)
+
+        frames = []
+        received = threading.Event()
+
+        def on_frame(frame):
+            frames.append((int(frame.image[0, 0, 0]), frame.annotation))
+            frame.release()
+            if len(frames) == 2:
+                received.set()
+
+        stream = SensorThread('127.0.0.1', camera)
+        stream.subscribe(on_frame)
+        stream.start()
+        try:
+            self.assertTrue(received.wait(5))
+        finally:
+            stream.stop()
+        self.assertEqual(frames, [(0, {'frame': 0}), (1, {'frame': 1})])
+
+    def test_stop_not_started(self):
+        """Stopping the sensors after starting them failed partway stops
+        every sensor, including those whose threads never started"""
+        sensors = [
+            {'type': 'IMU', 'listen_port': 8500},
+            {'type': 'GPS', 'listen_port': 8501},
+            {'type': 'NotASensor', 'listen_port': 8502}
+        ]
+        simulator = Simulator({'server_ip': '127.0.0.1', 'server_port': 1}, sensors=sensors, queue_size=1)
+        with self.assertRaises(KeyError):
+            simulator.start_sensor_listening()
+        queues = [simulator.get_frame_queue(uid) for uid in ['IMU_8500', 'GPS_8501']]
+        simulator.stop()
+        for queue in queues:
+            # the queue of a stopped stream is closed and drops new frames
+            queue.put(DataFrame())
+            self.assertEqual((queue.depth, queue.dropped), (0, 1))
+
+    def test_stop_not_started_stream(self):
+        gps = objectfactory.Factory.create_object({'_type': 'GPS', 'type': 'GPS', 'listen_port': 1})
+        gps.configure()
+        SensorThread('127.0.0.1', gps).stop()
+
+if __name__ == '__main__':
+    unittest.main()
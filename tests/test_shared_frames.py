@@ -0,0 +1,108 @@
+"""Tests for publishing frames to other processes through shared memory"""
+
+# lib
+import unittest
+from multiprocessing import shared_memory
+import numpy as np
+import objectfactory
+
+# src
+from monodrive.sensors.lidar import LidarFrame
+from monodrive.sensors.shared_frames import SharedFrameReader, SharedFrameRing
+from monodrive.simulator import Simulator
+
+POINTS = 8
+SLOT_SIZE = POINTS * 4 * 4
+
+
+def make_frame(i: int) -> LidarFrame:
+    """Create a lidar frame whose points are all `i`"""
+    frame = LidarFrame()
+    frame.timestamp = i
+    frame.game_time = float(i)
+    frame.point_cloud = np.full((POINTS, 4), i, dtype=np.float32)
+    return frame
+
+
+class TestSharedFrameRing(unittest.TestCase):
+
+    def create(self, slots: int) -> (SharedFrameRing, SharedFrameReader):
+        """Create a ring of lidar frames and a reader attached to it"""
+        ring = SharedFrameRing('Lidar_8200', SLOT_SIZE, slots)
+        self.addCleanup(ring.close)
+        reader = SharedFrameReader(ring.handle)
+        self.addCleanup(reader.close)
+        return ring, reader
+
+    def test_wraparound(self):
+        """Released slots are reused in order around the ring"""
+        ring, reader = self.create(3)
+        slots = []
+        for i in range(7):
+            self.assertTrue(ring.publish(make_frame(i)))
+            frame = reader.get(5)
+            self.assertEqual((frame.sensor_id, frame.timestamp, frame.game_time), ('Lidar_8200', i, float(i)))
+            np.testing.assert_array_equal(frame.array, make_frame(i).point_cloud)
+            slots.append(frame.slot)
+            frame.release()
+        self.assertEqual(slots, [0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual(ring.dropped, 0)
+
+    def test_overrun(self):
+        """Frames are dropped while a reader holds every slot, without
+        overwriting the frames it holds"""
+        ring, reader = self.create(2)
+        self.assertTrue(ring.publish(make_frame(1)))
+        self.assertTrue(ring.publish(make_frame(2)))
+        held = [reader.get(5), reader.get(5)]
+
+        self.assertFalse(ring.publish(make_frame(3)))
+        self.assertFalse(ring.publish(make_frame(4)))
+        self.assertEqual(ring.dropped, 2)
+        self.assertIsNone(reader.get(0.05))
+        for i, frame in enumerate(held, 1):
+            np.testing.assert_array_equal(frame.array, make_frame(i).point_cloud)
+
+        # the slot released first is written next
+        held[1].release()
+        self.assertTrue(ring.publish(make_frame(5)))
+        frame = reader.get(5)
+        self.assertEqual(frame.slot, 1)
+        np.testing.assert_array_equal(frame.array, make_frame(5).point_cloud)
+        np.testing.assert_array_equal(held[0].array, make_frame(1).point_cloud)
+        frame.release()
+        held[0].release()
+
+    def test_too_large(self):
+        ring, reader = self.create(2)
+        frame = LidarFrame()
+        frame.game_time = 0.0
+        frame.point_cloud = np.zeros((POINTS + 1, 4), dtype=np.float32)
+        self.assertFalse(ring.publish(frame))
+        self.assertEqual(ring.dropped, 1)
+
+    def test_unlink_on_stop(self):
+        """Stopping the simulator destroys the segments of its rings"""
+        lidar = objectfactory.Factory.create_object({
+            '_type': 'Lidar',
+            'type': 'Lidar',
+            'listen_port': 8200,
+            'n_lasers': 16,
+            'horizontal_resolution': 0.4
+        })
+        lidar.configure()
+        simulator = Simulator({'server_ip': '127.0.0.1', 'server_port': 1})
+        ring = simulator._create_shared_ring(lidar)
+        data_name, flags_name = ring.handle[:2]
+        self.assertTrue(ring.publish(make_frame(1)))
+
+        simulator.stop()
+        for name in (data_name, flags_name):
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+        with self.assertRaises(KeyError):
+            simulator.get_shared_frames(lidar.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
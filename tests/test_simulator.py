@@ -0,0 +1,101 @@
+"""Tests for configuring the server from the simulator drivers"""
+
+# lib
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# src
+import monodrive.common.messaging as mmsg
+from monodrive.simulator import AsyncSimulator, Mode, Simulator
+from tests.fake_server import CommandServer
+
+CONFIGS = {
+    'scenario': [{'frame': 0}, {'frame': 1}],
+    'sensors': [{'type': 'IMU', 'listen_port': 8500}],
+    'weather': {'profiles': []},
+    'ego': {'body': 'sedan'}
+}
+
+
+class TestConfigure(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CommandServer()
+        self.addCleanup(self.server.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        configs = dict(CONFIGS, simulator={
+            'server_ip': '127.0.0.1',
+            'server_port': self.server.port,
+            'simulation_mode': Mode.MODE_REPLAY.value,
+            'map': 'Straightaway5k'
+        })
+        self.paths = {}
+        for name, config in configs.items():
+            self.paths[name] = os.path.join(directory.name, name + '.json')
+            with open(self.paths[name], 'w') as file:
+                json.dump(config, file)
+
+    def receive(self) -> [dict]:
+        """Receive and answer the configure messages of a driver"""
+        connection = self.server.accept()
+        messages = []
+        for _ in range(4):
+            message = connection.receive()
+            connection.respond({'reference': message['reference']})
+            messages.append(message)
+        connection.close()
+        return [(message['type'], message['message']) for message in messages]
+
+    def test_drivers_send_same_messages(self):
+        simulator = Simulator.from_file(**self.paths)
+        self.assertEqual((simulator.mode, simulator.map), (Mode.MODE_REPLAY.value, 'Straightaway5k'))
+        self.assertEqual(simulator.num_steps, 2)
+        with ThreadPoolExecutor(1) as executor:
+            configured = executor.submit(simulator.configure)
+            messages = self.receive()
+            configured.result(5)
+        simulator.stop()
+
+        self.assertEqual([message[0] for message in messages], [
+            mmsg.ID_SIMULATOR_CONFIG,
+            mmsg.ID_REPLAY_CONFIGURE_TRAJECTORY_COMMAND,
+            mmsg.ID_REPLAY_CONFIGURE_SENSORS_COMMAND,
+            mmsg.ID_WEATHER_CONFIG_COMMAND
+        ])
+        self.assertEqual(messages[0][1]['ego_config'], CONFIGS['ego'])
+
+        async_simulator = AsyncSimulator.from_file(**self.paths)
+        self.assertEqual(async_simulator.num_steps, 2)
+
+        async def configure():
+            await async_simulator.configure()
+            await async_simulator.stop()
+
+        with ThreadPoolExecutor(1) as executor:
+            configured = executor.submit(asyncio.run, configure())
+            async_messages = self.receive()
+            configured.result(5)
+        self.assertEqual(async_messages, messages)
+
+    def test_closed_loop_scenario(self):
+        simulator = Simulator.from_file(self.paths['simulator'])
+        simulator.mode = Mode.MODE_CLOSED_LOOP.value
+        self.assertEqual(simulator.num_steps, 0)
+        with ThreadPoolExecutor(1) as executor:
+            configured = executor.submit(simulator.configure_scenario, CONFIGS['scenario'])
+            connection = self.server.accept()
+            message = connection.receive()
+            connection.respond({'reference': message['reference']})
+            configured.result(5)
+            connection.close()
+        simulator.stop()
+        self.assertEqual(message['type'], mmsg.ID_CLOSED_LOOP_CONFIG_COMMAND)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for parsing state sensor frames"""
+
+# lib
+import json
+import unittest
+import numpy as np
+import objectfactory
+
+
+def make_actor(name: str, tags: [str], x: float) -> dict:
+    """Build the state of an actor as sent by the simulator"""
+    return {
+        'name': name,
+        'tags': tags,
+        'odometry': {
+            'pose': {
+                'position': {'x': x, 'y': 2 * x, 'z': 0.5},
+                'orientation': {'x': 0.0, 'y': 0.0, 'z': 0.6, 'w': 0.8}
+            },
+            'linear_velocity': {'x': x / 10, 'y': 0.0, 'z': -1.0},
+            'angular_velocity': {'x': 0.0, 'y': 0.0, 'z': 0.1}
+        },
+        'oobbs': []
+    }
+
+
+def make_payload(frame: dict) -> memoryview:
+    """Encode a state frame with single quotes, as sent by the simulator"""
+    body = {'sensor_id': 'State_8700', 'time': 10, 'game_time': 1.5, 'frame': frame}
+    return memoryview(json.dumps(body).replace('"', "'").encode('utf8'))
+
+
+def parse(frame: dict):
+    """Parse a state frame with a configured state sensor"""
+    sensor = objectfactory.Factory.create_object({'_type': 'State', 'type': 'State', 'listen_port': 8700})
+    sensor.configure()
+    payload = make_payload(frame)
+    return sensor.parse([payload], len(payload), 10, 1.5)
+
+
+class TestStateFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.body = {
+            'vehicles': [
+                {'state': make_actor('ego', ['vehicle', 'dynamic', 'ego'], 1.0), 'wheels': []},
+                {'state': make_actor('car_1', ['vehicle', 'dynamic'], 2.0), 'wheels': []},
+                {'state': make_actor('car_1', ['vehicle'], 3.0), 'wheels': []},
+                {'state': {'name': 'parked', 'tags': None, 'odometry': None, 'oobbs': []}, 'wheels': []}
+            ],
+            'objects': [
+                make_actor('sign', ['static', 'sign'], 4.0),
+                make_actor('tree', ['static'], 5.0)
+            ]
+        }
+        self.frame = parse(self.body)
+
+    def test_indexes(self):
+        frame = self.frame
+        vehicles = frame.frame.vehicles
+        self.assertIs(frame.ego, vehicles[0])
+        self.assertEqual(frame.ego.state.name, 'ego')
+        # the first of several vehicles with a name
+        self.assertIs(frame.get_vehicle('car_1'), vehicles[1])
+        self.assertIsNone(frame.get_vehicle('nobody'))
+        self.assertEqual(frame.get_vehicles_with_tag('dynamic'), vehicles[0:2])
+        self.assertEqual(frame.get_vehicles_with_tag('vehicle'), vehicles[0:3])
+        self.assertEqual(frame.get_vehicles_with_tag('bicycle'), [])
+
+        objects = frame.frame.objects
+        self.assertIs(frame.get_object('tree'), objects[1])
+        self.assertEqual(frame.get_objects_with_tag('static'), objects)
+        self.assertEqual(frame.get_objects_with_tag('sign'), objects[0:1])
+
+    def test_arrays(self):
+        """The arrays hold the values of the dict form, NaN where missing"""
+        arrays = self.frame.vehicle_arrays
+        self.assertEqual(arrays.positions.shape, (4, 3))
+        for i, vehicle in enumerate(self.body['vehicles'][:3]):
+            odometry = vehicle['state']['odometry']
+            pose = odometry['pose']
+            np.testing.assert_array_equal(arrays.positions[i], [pose['position'][k] for k in 'xyz'])
+            np.testing.assert_array_equal(arrays.orientations[i], [pose['orientation'][k] for k in 'xyzw'])
+            np.testing.assert_array_equal(arrays.velocities[i], [odometry['linear_velocity'][k] for k in 'xyz'])
+        self.assertTrue(np.isnan(arrays.positions[3]).all())
+        self.assertTrue(np.isnan(arrays.velocities[3]).all())
+
+        objects = self.frame.object_arrays
+        np.testing.assert_array_equal(objects.positions, [[4.0, 8.0, 0.5], [5.0, 10.0, 0.5]])
+
+    def test_empty(self):
+        frame = parse({'vehicles': [], 'objects': []})
+        self.assertIsNone(frame.ego)
+        self.assertEqual(frame.get_vehicles_with_tag('vehicle'), [])
+        self.assertEqual(frame.vehicle_arrays.positions.shape, (0, 3))
+        self.assertEqual(frame.object_arrays.velocities.shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Tests for bundling the frames of several sensors"""
+
+# lib
+import threading
+import unittest
+
+# src
+from monodrive.sensors import DataFrame
+from monodrive.simulator import Simulator
+from monodrive.simulator.synchronizer import FrameSynchronizer, Partial, SyncKey
+
+
+def make_frame(sample_count: int, game_time: float = None) -> DataFrame:
+    """Create a frame with a sample count and game time"""
+    frame = DataFrame()
+    frame.sample_count = sample_count
+    frame.game_time = game_time
+    return frame
+
+
+class TestFrameSynchronizer(unittest.TestCase):
+
+    def create(self, **kwargs) -> (FrameSynchronizer, list):
+        """Create a synchronizer of sensors 'a' and 'b' and the list its
+        bundles are appended to"""
+        synchronizer = FrameSynchronizer(['a', 'b'], **kwargs)
+        self.addCleanup(synchronizer.close)
+        bundles = []
+        synchronizer.subscribe(bundles.append)
+        return synchronizer, bundles
+
+    def test_sample_count(self):
+        synchronizer, bundles = self.create()
+        a1, b1, a2, b2 = make_frame(1), make_frame(1), make_frame(2), make_frame(2)
+        synchronizer.on_frame('a', a1)
+        synchronizer.on_frame('a', a2)
+        synchronizer.on_frame('c', make_frame(1))
+        self.assertEqual(bundles, [])
+        synchronizer.on_frame('b', b1)
+        synchronizer.on_frame('b', b2)
+        self.assertEqual([(b.key, b['a'], b['b']) for b in bundles], [(1, a1, b1), (2, a2, b2)])
+
+    def test_game_time(self):
+        synchronizer, bundles = self.create(key=SyncKey.GAME_TIME, tolerance=0.01)
+        synchronizer.on_frame('a', make_frame(1, 1.0))
+        synchronizer.on_frame('b', make_frame(7, 1.005))
+        synchronizer.on_frame('a', make_frame(2, 2.0))
+        synchronizer.on_frame('b', make_frame(8, 2.5))
+        self.assertEqual([(b['a'].sample_count, b['b'].sample_count) for b in bundles], [(1, 7)])
+
+    def test_drop(self):
+        """A bundle a sensor moved past is dropped, and late frames of it
+        are ignored"""
+        synchronizer, bundles = self.create(partial=Partial.DROP)
+        synchronizer.on_frame('a', make_frame(1))
+        synchronizer.on_frame('b', make_frame(2))
+        synchronizer.on_frame('a', make_frame(2))
+        synchronizer.on_frame('b', make_frame(1))
+        self.assertEqual([b.key for b in bundles], [2])
+        self.assertEqual((synchronizer.emitted, synchronizer.dropped, synchronizer.late), (1, 1, 1))
+
+    def test_emit(self):
+        """A bundle a sensor moved past is delivered with the frames that
+        arrived"""
+        synchronizer, bundles = self.create(partial=Partial.EMIT)
+        synchronizer.on_frame('a', make_frame(1))
+        synchronizer.on_frame('b', make_frame(2))
+        self.assertEqual([(b.key, b.missing) for b in bundles], [(1, {'b'})])
+
+    def test_timeout(self):
+        """The timeout thread resolves a bundle that never completes"""
+        synchronizer = FrameSynchronizer(['a', 'b'], timeout=0.05, partial=Partial.EMIT)
+        self.addCleanup(synchronizer.close)
+        delivered = threading.Event()
+        bundles = []
+        synchronizer.subscribe(lambda bundle: (bundles.append(bundle), delivered.set()))
+        synchronizer.on_frame('a', make_frame(1))
+        self.assertTrue(delivered.wait(5))
+        self.assertEqual([(b.key, b.missing) for b in bundles], [(1, {'b'})])
+
+    def test_slow_callback(self):
+        """Frames are added while a callback is running"""
+        synchronizer = FrameSynchronizer(['a', 'b'])
+        self.addCleanup(synchronizer.close)
+        entered = threading.Event()
+        release = threading.Event()
+        keys = []
+
+        def callback(bundle):
+            entered.set()
+            release.wait(5)
+            keys.append(bundle.key)
+
+        synchronizer.subscribe(callback)
+        synchronizer.on_frame('a', make_frame(1))
+        delivering = threading.Thread(target=synchronizer.on_frame, args=('b', make_frame(1)))
+        delivering.start()
+        self.assertTrue(entered.wait(5))
+
+        # not blocked by the callback, the bundle is delivered by the
+        # thread already delivering
+        synchronizer.on_frame('a', make_frame(2))
+        synchronizer.on_frame('b', make_frame(2))
+        self.assertEqual(keys, [])
+        release.set()
+        delivering.join(5)
+        self.assertEqual(keys, [1, 2])
+
+    def test_no_sensors(self):
+        with self.assertRaises(ValueError):
+            FrameSynchronizer([])
+        simulator = Simulator({'server_ip': '127.0.0.1', 'server_port': 1})
+        with self.assertRaises(ValueError):
+            simulator.synchronize()
+
+
+if __name__ == '__main__':
+    unittest.main()